@@ -53,6 +53,17 @@ CHAR_QMARK   = u'\u003F'
 #   5 = All Debug Events (most verbose)
 DEBUG_LEVEL = 5  # ...default - debug everthing, changed by config
 
+# Query Timing Setting for wx Trace Page
+#   When True, the time of each query stage (header, write, wait, read, parse, decode) is collected
+#   per command and a timing table is sent to the Trace Page when it is shown.
+DEBUG_TIMING = False  # ...default - no timing, changed by config
+
+# List Capacity for the wx Trace and DTC Pages
+#   The Trace and DTC lists are virtual lists that keep only the newest rows, so memory and repaint
+#   costs stay bounded however long the program runs.
+TRACE_ROWS = 10000
+DTC_ROWS = 1000
+
 STR_HELP_TEXT = \
     "Onboard Diagnostics II Advanced:  pyOBDA  Version " + VERSION + "\n" + \
     "  (C) 2021-2023 Keven L. Ates (atescomp@gmail.com)\n" + \
@@ -77,9 +88,15 @@ STR_HELP_TEXT = \
     "  CHECKVOLTS - validate the ELM connection voltage\n" + \
     "  TIMEOUT - the (fractional) seconds to wait for the connection response\n" + \
     "  RECONNECTS - the number of times to try a connection before giving up\n" + \
-    "  DELAY - the (fractional) seconds to wait between page updates for sensors (1.0 sec min)\n" + \
+    "  DELAY - the (fractional) seconds between sensor updates (for sensors without their own rate,\n" + \
+    "          the key gauges poll at 10 Hz) and between other page updates (1.0 sec min)\n" + \
     "Debug configuration items are:\n" + \
     "  LEVEL - a debugging verbosity level from 0 (None) to 5 (most verbose)\n" + \
+    "  TIMING - collect query stage timings (milliseconds) and show them on the Trace page\n" + \
+    "Cache configuration items are command names with the (fractional) seconds to reuse their\n" + \
+    "response before querying again (0 = always query). Slowly changing PIDs are cached by default:\n" + \
+    "  STATUS, STATUS_DRIVE_CYCLE (30 sec), PIDS_A, PIDS_B, PIDS_C, OBD_COMPLIANCE, FUEL_TYPE (1 hour)\n" + \
+    "Clearing the DTCs empties the cache.\n" + \
     "\n" + \
     "To setup a configuration for pyOBDA:\n" + \
     "  Linux: create a config file in the pyOBDA configuration directory\n" + \
@@ -101,6 +118,9 @@ STR_HELP_TEXT = \
     "DELAY=1.0\n" + \
     "[DEBUG]\n" + \
     "LEVEL=1\n" + \
+    "TIMING=False\n" + \
+    "[CACHE]\n" + \
+    "STATUS=30.0\n" + \
     "---------------------------------------------\n" + \
     "\n" + \
     "\n" + \
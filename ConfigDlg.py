@@ -129,6 +129,15 @@ class ConfigDlg(wx.Dialog):
             self.connection.RECONNECTS = self.config.getint("OBD", "RECONNECTS", fallback=3)
             self.connection.DELAY = self.config.getfloat("OBD", "DELAY", fallback=1.0)
             AppSettings.DEBUG_LEVEL = self.config.getint("DEBUG", "LEVEL", fallback=5)
+            AppSettings.DEBUG_TIMING = self.config.getboolean("DEBUG", "TIMING", fallback=False)
+            if self.config.has_section("CACHE") :
+                # ...command name = cache seconds (the option names are lower case)
+                for strName, strTTL in self.config.items("CACHE") :
+                    try :
+                        self.connection.CACHE[strName.upper()] = float(strTTL)
+                    except ValueError :
+                        # NOTE: The dialog has no EventDebug handler, so log it...
+                        OBD2Device.logger.warning("Invalid CACHE seconds for " + strName.upper() + ": " + strTTL)
             OBD2Device.setLogging()
 
         # Serial Ports Input RadioBox...
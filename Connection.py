@@ -32,6 +32,18 @@ class Connection():
     strPortNameDefault:str = "/dev/ttyUSB0"
     iDebugLevelDefault:int = 5
 
+    # Response cache time to live (fractional seconds) per command name for the slowly changing PIDs.
+    #   Commands not listed (or 0) are always queried. See OBD2Port.
+    dictCacheDefault:dict = {
+        "PIDS_A"             : 3600.0,
+        "PIDS_B"             : 3600.0,
+        "PIDS_C"             : 3600.0,
+        "STATUS"             :   30.0,  # ...monitor readiness changes over minutes
+        "STATUS_DRIVE_CYCLE" :   30.0,
+        "OBD_COMPLIANCE"     : 3600.0,
+        "FUEL_TYPE"          : 3600.0,
+    }
+
     def __init__(self, connect) : # connect is a Connection object
         self.setConnection(connect)
 
@@ -44,7 +56,9 @@ class Connection():
         self.TIMEOUT:float = 10.0
         self.RECONNECTS:int = 3
         self.DELAY:float = 1.0
+        self.CACHE:dict = dict(Connection.dictCacheDefault)
         AppSettings.DEBUG_LEVEL = Connection.iDebugLevelDefault
+        AppSettings.DEBUG_TIMING = False
 
         OBD2Device.setLogging()
 
@@ -57,6 +71,7 @@ class Connection():
             self.TIMEOUT = connect.TIMEOUT
             self.RECONNECTS = connect.RECONNECTS
             self.DELAY = connect.DELAY
+            self.CACHE = dict(connect.CACHE)
 
     def resetConnection(self):
         self.PROTOCOL = "6"
@@ -67,6 +82,8 @@ class Connection():
         self.TIMEOUT = 10.0
         self.RECONNECTS = 3
         self.DELAY = 1.0
+        self.CACHE = dict(Connection.dictCacheDefault)
         AppSettings.DEBUG_LEVEL = Connection.iDebugLevelDefault
+        AppSettings.DEBUG_TIMING = False
 
         OBD2Device.setLogging()
@@ -24,13 +24,14 @@
 ############################################################################
 
 import wx
+import time
 from typing import Callable
 
 import AppSettings
 from ListCtrl import ListCtrl
 from EventDebug import EventDebug
 from EventDTC import EventDTC
-from EventSensor import EventSensor
+from EventSensorBatch import EventSensorBatch
 from EventConnection import EventConnection
 from EventTest import EventTest
 
@@ -39,6 +40,10 @@ class EventHandler(wx.EvtHandler):
     The pyOBDA Event Handler Class.
     """
 
+    # The frequent events (sensors, tests) are counted and summarized on the Trace Page once per interval
+    # (seconds) instead of posting a debug event for each...
+    DEBUG_SUMMARY_INTERVAL = 5.0
+
     def __init__(self, funcShutdownConnection: Callable, funcUpdateConnection: Callable):
         wx.EvtHandler.__init__(self)
         self.shutdownConnection = funcShutdownConnection
@@ -50,13 +55,16 @@ class EventHandler(wx.EvtHandler):
         self.listctrlDTC = None
         self.listctrlDebug = None
 
+        self.dictDebugCounts = {}  # ...event name: [ events, items ] since the last summary
+        self.fDebugSummary = time.monotonic()
+
         # ====================
         # Connect Process Event Handlers
         # ====================
 
         self.Connect(-1, -1, EventConnection.ID, self.onConnection)
         self.Connect(-1, -1, EventTest.ID,   self.onTests)
-        self.Connect(-1, -1, EventSensor.ID, self.onSensor)
+        self.Connect(-1, -1, EventSensorBatch.ID, self.onSensorBatch)
         self.Connect(-1, -1, EventDTC.ID,    self.onDTC)
         self.Connect(-1, -1, EventDebug.ID,  self.onDebug)
 
@@ -85,12 +93,20 @@ class EventHandler(wx.EvtHandler):
             self.updateConnection(event.data)
 
     def onTests(self, event) :
-        wx.PostEvent( self, EventDebug([2, "OnTests..."]) )
+        self.countDebug("OnTests")
         self.listctrlTests.SetItem(event.data[0], event.data[1], event.data[2])
 
-    def onSensor(self, event) :
-        wx.PostEvent( self, EventDebug([2, "OnSensor..."]) )
-        self.listctrlSensors[ event.data[0] ].SetItem(event.data[1], event.data[2], event.data[3])
+    def onSensorBatch(self, event) :
+        # Apply all the changed rows of a sensor page with a single repaint...
+        iSensorPage, listRows = event.data
+        self.countDebug("OnSensorBatch", len(listRows))
+        listctrlSensors = self.listctrlSensors[iSensorPage]
+        listctrlSensors.Freeze()
+        try:
+            for iRow, iColumn, strValue in listRows:
+                listctrlSensors.SetItem(iRow, iColumn, strValue)
+        finally:
+            listctrlSensors.Thaw()
 
     def onDTC(self, event) :
         wx.PostEvent( self, EventDebug([2, "OnDTC..."]) )
@@ -99,6 +115,23 @@ class EventHandler(wx.EvtHandler):
         else:
             self.listctrlDTC.Append(event.data)
 
+    def countDebug(self, strName: str, iItems: int = 1) :
+        # Count a frequent event and post a summary of the counts once per interval...
+        if AppSettings.DEBUG_LEVEL < 2:
+            return
+        listCounts = self.dictDebugCounts.setdefault(strName, [0, 0])
+        listCounts[0] += 1
+        listCounts[1] += iItems
+
+        fNow = time.monotonic()
+        fElapsed = fNow - self.fDebugSummary
+        if fElapsed < self.DEBUG_SUMMARY_INTERVAL:
+            return
+        for strCounted, (iEvents, iCounted) in sorted( self.dictDebugCounts.items() ):
+            wx.PostEvent( self, EventDebug( [2, "%s... %d events, %d items in %.1f sec" % (strCounted, iEvents, iCounted, fElapsed)] ) )
+        self.dictDebugCounts = {}
+        self.fDebugSummary = fNow
+
     def onDebug(self, event) :
         if AppSettings.DEBUG_LEVEL >= event.data[0]:
             self.listctrlDebug.Append([str(event.data[0]), event.data[1]])
@@ -2,7 +2,7 @@
 #
 # Python Onboard Diagnostics II Advanced
 #
-# EventResult.py
+# EventSensorBatch.py
 #
 # Copyright 2021-2023 Keven L. Ates (atescomp@gmail.com)
 #
@@ -25,15 +25,15 @@
 
 import wx
 
-class EventSensor(wx.PyEvent):
+class EventSensorBatch(wx.PyEvent):
     """
-    Event Class for Sensor result data.
+    Event Class for a batch of Sensor result data: [ sensor page, [ [row, column, value], ... ] ].
     """
 
-    ID = 1000
+    ID = 1004
 
     def __init__(self, data):
         # Init Result Event...
         wx.PyEvent.__init__(self)
-        self.SetEventType(EventSensor.ID)
+        self.SetEventType(EventSensorBatch.ID)
         self.data = data
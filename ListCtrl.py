@@ -24,16 +24,81 @@
 ############################################################################
 
 import wx
+from collections import deque
 
 from wx.lib.mixins.listctrl import ListCtrlAutoWidthMixin
 
 class ListCtrl(wx.ListCtrl, ListCtrlAutoWidthMixin):
     """
     An extended wx.ListCtrl Class that auto-resizes the column boxes on resize...
+
+    With a capacity, the list is virtual (owner data): the rows are kept in a fixed capacity ring
+    (the oldest rows are dropped) and wx only asks for the text of the visible rows, so memory is
+    bounded and a repaint costs the same regardless of the history. A virtual list supports Append()
+    and DeleteAllItems() and can be filtered with setFilter().
     """
 
     def __init__(
         self, parent, id, pos = wx.DefaultPosition,
-        size = wx.DefaultSize, style = 0):
+        size = wx.DefaultSize, style = 0, iCapacity = 0):
+        if iCapacity > 0:
+            style |= wx.LC_VIRTUAL
         wx.ListCtrl.__init__(self, parent, id, pos, size, style)
         ListCtrlAutoWidthMixin.__init__(self)
+
+        self.iCapacity = iCapacity
+        self.dequeRows = deque(maxlen=iCapacity) if iCapacity > 0 else None   # ...all rows
+        self.dequeShown = deque(maxlen=iCapacity) if iCapacity > 0 else None  # ...rows passing the filter
+        self.funcFilter = None
+        self.bRefresh = False  # ...a refresh is pending
+
+    def isVirtual(self) -> bool:
+        return self.iCapacity > 0
+
+    def Append(self, listRow):
+        if not self.isVirtual():
+            return wx.ListCtrl.Append(self, listRow)
+
+        self.dequeRows.append(listRow)
+        if self.funcFilter is None or self.funcFilter(listRow):
+            self.dequeShown.append(listRow)
+            self.refreshLater()
+        return len(self.dequeShown) - 1
+
+    def DeleteAllItems(self):
+        if not self.isVirtual():
+            return wx.ListCtrl.DeleteAllItems(self)
+
+        self.dequeRows.clear()
+        self.dequeShown.clear()
+        self.SetItemCount(0)
+        self.Refresh()
+        return True
+
+    def setFilter(self, funcFilter):
+        # Show only the rows for which funcFilter(row) is True (None shows all rows)...
+        self.funcFilter = funcFilter
+        if funcFilter is None:
+            self.dequeShown = deque(self.dequeRows, maxlen=self.iCapacity)
+        else:
+            self.dequeShown = deque( (listRow for listRow in self.dequeRows if funcFilter(listRow)), maxlen=self.iCapacity )
+        self.refreshLater()
+
+    def refreshLater(self):
+        # Coalesce the refreshes of many appends into one...
+        if not self.bRefresh:
+            self.bRefresh = True
+            wx.CallAfter(self.refreshNow)
+
+    def refreshNow(self):
+        self.bRefresh = False
+        if not self:  # ...destroyed
+            return
+        self.SetItemCount( len(self.dequeShown) )
+        self.Refresh()  # ...the visible rows only
+
+    def OnGetItemText(self, iItem, iColumn):
+        if iItem >= len(self.dequeShown):  # ...cleared or filtered before the refresh
+            return ""
+        listRow = self.dequeShown[iItem]
+        return str(listRow[iColumn]) if iColumn < len(listRow) else ""
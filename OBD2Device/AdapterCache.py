@@ -0,0 +1,125 @@
+############################################################################
+#
+# Python Onboard Diagnostics II Advanced
+#
+# AdapterCache.py
+#
+# Copyright 2021-2023 Keven L. Ates (atescomp@gmail.com)
+#
+# This file is part of the Onboard Diagnostics II Advanced (pyOBDA) system.
+#
+# pyOBDA is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# pyOBDA is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyOBDA; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+############################################################################
+
+import os
+import time
+import threading
+import logging
+
+from .Utility import Utility
+
+logger = logging.getLogger(__name__)
+
+
+class AdapterCache:
+    """
+    Persistent last-known-good adapter settings for the ELM327 auto detection fast path.
+
+    Stores "adapters.json" under the configuration directory with two maps:
+        ports    - per port name: the last working baud rate (known before the adapter can be asked
+                   anything) and the adapter identifier last seen on the port
+        adapters - per adapter identifier ("AT @2", or the port name when the adapter has none): the
+                   last working protocol and baud rate, and the last detection timings
+
+    Cached values are only hints. ELM327 tries them first and falls back to the full search.
+    """
+
+    VERSION = 1
+    FILE_NAME = "adapters.json"
+
+    __lock = threading.Lock()  # ...serialize file access between connectors
+
+    def __init__(self, strPath:str = None):
+        self.strPath = strPath if strPath else Utility.getConfigPath()
+        self.strFile = os.path.join(self.strPath, self.FILE_NAME)
+
+    def __readAll(self) -> dict:
+        dictCache = Utility.readJSON(self.strFile)
+        if dictCache.get("version") != self.VERSION:
+            return { "ports" : {}, "adapters" : {} }
+        dictCache.setdefault("ports", {})
+        dictCache.setdefault("adapters", {})
+        return dictCache
+
+    @classmethod
+    def getAdapterID(cls, strPortName:str, strIdentifier:str) -> str:
+        """
+        Return the adapter key: the "AT @2" identifier, or the port name when the adapter has none.
+        """
+
+        if strIdentifier and strIdentifier != "?":
+            return strIdentifier
+        return "port:" + strPortName
+
+    def getBaudRate(self, strPortName:str) -> int:
+        with self.__lock:
+            dictPort = self.__readAll()["ports"].get(strPortName, {})
+        return dictPort.get("baud", 0)
+
+    def getProtocol(self, strAdapterID:str) -> str:
+        with self.__lock:
+            dictAdapter = self.__readAll()["adapters"].get(strAdapterID, {})
+        return dictAdapter.get("protocol")
+
+    def getTimings(self, strAdapterID:str) -> dict:
+        with self.__lock:
+            dictAdapter = self.__readAll()["adapters"].get(strAdapterID, {})
+        return dictAdapter.get("timings", {})
+
+    def store(self, strPortName:str, strAdapterID:str, iBaudRate:int, strProtocolID:str, dictTimings:dict):
+        """
+        Store the working settings and the detection timings.
+        """
+
+        with self.__lock:
+            dictCache = self.__readAll()
+            dictCache["version"] = self.VERSION
+            dictCache["ports"][strPortName] = {
+                "baud"     : iBaudRate,
+                "adapter"  : strAdapterID,
+                "time"     : time.time(),
+            }
+            dictCache["adapters"][strAdapterID] = {
+                "protocol" : strProtocolID,
+                "baud"     : iBaudRate,
+                "timings"  : dictTimings,
+                "time"     : time.time(),
+            }
+            Utility.writeJSON(self.strFile, dictCache)
+
+    def invalidate(self, strPortName:str = None):
+        """
+        Drop the cached settings for a port (and its adapter), or everything.
+        """
+
+        with self.__lock:
+            dictCache = self.__readAll()
+            if strPortName is None:
+                dictCache = { "ports" : {}, "adapters" : {} }
+            else:
+                dictPort = dictCache["ports"].pop(strPortName, {})
+                dictCache["adapters"].pop(dictPort.get("adapter"), None)
+            dictCache["version"] = self.VERSION
+            Utility.writeJSON(self.strFile, dictCache)
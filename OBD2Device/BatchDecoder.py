@@ -0,0 +1,170 @@
+############################################################################
+#
+# Python Onboard Diagnostics II Advanced
+#
+# BatchDecoder.py
+#
+# Copyright 2021-2023 Keven L. Ates (atescomp@gmail.com)
+#
+# This file is part of the Onboard Diagnostics II Advanced (pyOBDA) system.
+#
+# pyOBDA is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# pyOBDA is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyOBDA; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+############################################################################
+
+from .Command import Command
+from .UnitAndScale import UAS, UAS_IDS, LinearSpec
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BatchDecoder:
+    """
+    Vectorized decoding of recorded responses with NumPy (optional, see README).
+
+    All payloads of one command (for example, every logged 010C response) are decoded together with
+    array operations using the command's linear spec. The specs come from the Decoders and the UAS
+    table, so the batch results match Command decoding.
+
+    A payload is the message data including the mode and PID bytes (Message.baData). Payloads can be
+    given as a sequence of bytes-like objects or as a 2-D uint8 array with one payload per row.
+
+    Use:
+        fValues, fTimes = BatchDecoder.decode(CommandList().RPM, listPayloads, listTimes)
+    """
+
+    __numpy = None
+
+    @classmethod
+    def numpy(cls):
+        """
+        Import NumPy on first use.
+        """
+
+        if cls.__numpy is None:
+            try:
+                import numpy
+            except ImportError as err:
+                raise ImportError("BatchDecoder requires NumPy: pip install numpy") from err
+            cls.__numpy = numpy
+        return cls.__numpy
+
+    @classmethod
+    def toArray(cls, payloads, iBytes:int):
+        """
+        Return the payloads as an N x iBytes uint8 array.
+
+        Like Command decoding, each payload is trimmed or zero padded to the command's byte count.
+        """
+
+        np = cls.numpy()
+        if isinstance(payloads, np.ndarray):
+            arrPayloads = payloads.astype(np.uint8, copy=False).reshape(len(payloads), -1)
+            iWidth = arrPayloads.shape[1]
+            if iWidth > iBytes:
+                return arrPayloads[:, :iBytes]
+            if iWidth < iBytes:
+                return np.pad(arrPayloads, ((0, 0), (0, iBytes - iWidth)))
+            return arrPayloads
+
+        bsData = b"".join( [ bytes(payload[:iBytes]).ljust(iBytes, b"\x00") for payload in payloads ] )
+        return np.frombuffer(bsData, dtype=np.uint8).reshape(-1, iBytes)
+
+    @classmethod
+    def decodeSpec(cls, spec:LinearSpec, arrPayloads):
+        """
+        Apply a linear spec to an N x W uint8 payload array.
+
+        Return a float64 array of N values.
+        """
+
+        np = cls.numpy()
+        arrBytes = arrPayloads[:, spec.iStart:spec.iEnd].astype(np.int64)
+        iWidth = arrBytes.shape[1]
+
+        # Combine the big-endian bytes into integers...
+        arrValues = np.zeros(len(arrBytes), dtype=np.int64)
+        for iIndex in range(iWidth):
+            arrValues = (arrValues << 8) | arrBytes[:, iIndex]
+
+        # Apply the 2's compliment...
+        if spec.bSigned and iWidth > 0:
+            iBits = iWidth * 8
+            arrValues = np.where(arrValues >= (1 << (iBits - 1)), arrValues - (1 << iBits), arrValues)
+
+        # Scale, divide and offset in the spec's order (see LinearSpec.decode())...
+        arrValues = arrValues * float(spec.fScale)
+        if spec.iDivisor != 1:
+            arrValues = arrValues / float(spec.iDivisor)
+        return arrValues + float(spec.fOffset)
+
+    @classmethod
+    def decode(cls, cmd:Command, payloads, timestamps = None):
+        """
+        Decode all payloads of a command with a linear spec.
+
+        Return a 2-tuple ( Values (float64 array), Timestamps (float64 array or None) ).
+        The values' unit is cmd.spec.strUnit.
+        """
+
+        if cmd.spec is None:
+            raise ValueError("Command %s has no linear spec for batch decoding" % cmd.strName)
+
+        np = cls.numpy()
+        arrValues = cls.decodeSpec(cmd.spec, cls.toArray(payloads, cmd.iBytes))
+        arrTimes = None if timestamps is None else np.asarray(timestamps, dtype=np.float64)
+        return (arrValues, arrTimes)
+
+    @classmethod
+    def decodeUAS(cls, iID:int, payloads, timestamps = None, iStart:int = 0, iEnd:int = None):
+        """
+        Decode all payloads with a Unit and Scale ID (see UAS_IDS).
+
+        The byte slice defaults to the whole payload (limited to 4 bytes).
+        Return a 2-tuple ( Values (float64 array), Timestamps (float64 array or None) ).
+        """
+
+        uas = UAS_IDS[iID]
+        if not isinstance(uas, UAS):
+            raise ValueError("UAS ID 0x%02X is not a linear conversion" % iID)
+
+        np = cls.numpy()
+        spec = uas.toSpec(iStart, iEnd)
+        if isinstance(payloads, np.ndarray):
+            arrPayloads = payloads.astype(np.uint8, copy=False)
+        else:
+            # Size the rows by the longest payload so short values are not zero padded on the right...
+            payloads = list(payloads)
+            iWidth = max( [ len(payload) for payload in payloads ], default=0 )
+            arrPayloads = cls.toArray(payloads, min(iWidth, spec.iEnd))
+        arrValues = cls.decodeSpec(spec, arrPayloads)
+        arrTimes = None if timestamps is None else np.asarray(timestamps, dtype=np.float64)
+        return (arrValues, arrTimes)
+
+    @classmethod
+    def decodeResponses(cls, cmd:Command, responses:list):
+        """
+        Decode the first message of each recorded Response of a command.
+
+        Return a 2-tuple ( Values (float64 array), Timestamps (float64 array) ).
+        """
+
+        responses = [ response for response in responses if response.messages ]
+        return cls.decode(
+            cmd,
+            [ response.messages[0].baData for response in responses ],
+            [ response.time for response in responses ],
+        )
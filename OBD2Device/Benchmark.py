@@ -0,0 +1,565 @@
+############################################################################
+#
+# Python Onboard Diagnostics II Advanced
+#
+# Benchmark.py
+#
+# Copyright 2021-2023 Keven L. Ates (atescomp@gmail.com)
+#
+# This file is part of the Onboard Diagnostics II Advanced (pyOBDA) system.
+#
+# pyOBDA is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# pyOBDA is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyOBDA; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+############################################################################
+
+import gc
+import sys
+import random
+import time
+import json
+import platform
+import tempfile
+import threading
+import tracemalloc
+import functools
+import logging
+
+from .ELM327 import ELM327
+from .BusMonitor import BusMonitor
+from .ELM327Emulator import ELM327Emulator
+from .Command import Command
+from .Protocols.Message import Message
+from .CommandList import CommandList
+from .OBD2Connector import OBD2Connector
+from .OBD2ConnectorAsync import OBD2ConnectorAsync
+from .FleetManager import FleetManager
+from .CapabilityCache import CapabilityCache
+from .AdapterCache import AdapterCache
+
+logger = logging.getLogger(__name__)
+
+
+class Benchmark:
+    """
+    Throughput and latency benchmarks for the OBD stack, run against the ELM327 emulator.
+
+    Groups:
+        parse     - Protocol parsing (__call__) of CAN 11 bit, CAN 29 bit and legacy responses
+        decode    - Command decoding for every command the emulated vehicle answers:
+                    raw (linear spec numbers), value (raw + Quantity) and pint (decoder function),
+                    after checking every linear spec against its decoder function (see checkDecode())
+        elm       - ELM327.send_and_parse() round trips
+        connector - OBD2Connector connect (cold and cached), query() and query_many()
+        async     - OBD2ConnectorAsync sweep over the number of watched commands
+        fleet     - FleetManager sweep over the number of adapters
+        memory    - memory and objects per retained response (with and without the raw frame strings)
+        monitor   - monitor mode ("AT MA") batch parsing and end to end frames/s from the adapter to a
+                    BusMonitor consumer, CAN 11 bit and 29 bit
+
+    Each timed result has the operation count, the p50 / p95 / p99 / mean times (microseconds),
+    ops/s, and (unless disabled) the mean transient peak and the retained memory per operation in
+    bytes (tracemalloc). Sweeps report achieved rates. All results are collected as JSON.
+
+    Run:
+        python -m OBD2Device.Benchmark --latency 0.002 --output bench.json
+    """
+
+    GROUPS = ["parse", "decode", "elm", "connector", "async", "fleet", "memory", "monitor"]
+
+    def __init__(self, fLatency:float = 0.0, iIterations:int = 2000, iIOIterations:int = 200,
+                 fDuration:float = 2.0, bAllocations:bool = True):
+        self.fLatency = fLatency
+        self.iIterations = iIterations
+        self.iIOIterations = iIOIterations
+        self.fDuration = fDuration
+        self.bAllocations = bAllocations
+        # Keep the user's caches clean (the directory is removed by close() or when the suite is collected)...
+        self.__dirCache = tempfile.TemporaryDirectory(prefix="pyobda-bench-")
+        self.strCachePath = self.__dirCache.name
+        self.listResults : list[dict] = []
+
+    #
+    # Measurement
+    #
+
+    @classmethod
+    def percentile(cls, listSorted:list, fPercent:float):
+        if not listSorted:
+            return None
+        iIndex = min( int( round( fPercent / 100.0 * (len(listSorted) - 1) ) ), len(listSorted) - 1 )
+        return listSorted[iIndex]
+
+    def record(self, strGroup:str, strName:str, dictValues:dict) -> dict:
+        dictResult = { "group" : strGroup, "name" : strName }
+        dictResult.update(dictValues)
+        self.listResults.append(dictResult)
+        return dictResult
+
+    def measure(self, strGroup:str, strName:str, func, iIterations:int = None, iWarmup:int = 10,
+                bAllocations:bool = None, **dictExtra) -> dict:
+        """
+        Time func() iIterations times and record the statistics.
+        """
+
+        iIterations = self.iIterations if iIterations is None else iIterations
+        bAllocations = self.bAllocations if bAllocations is None else bAllocations
+
+        for _ in range(iWarmup):
+            func()
+
+        listTimes = [0] * iIterations
+        perf_counter_ns = time.perf_counter_ns
+        for iIndex in range(iIterations):
+            iStart = perf_counter_ns()
+            func()
+            listTimes[iIndex] = perf_counter_ns() - iStart
+        listTimes.sort()
+        iTotal = sum(listTimes)
+
+        dictValues = {
+            "ops"     : iIterations,
+            "p50_us"  : self.percentile(listTimes, 50) / 1000.0,
+            "p95_us"  : self.percentile(listTimes, 95) / 1000.0,
+            "p99_us"  : self.percentile(listTimes, 99) / 1000.0,
+            "mean_us" : iTotal / iIterations / 1000.0,
+            "ops_s"   : (iIterations * 1e9 / iTotal) if iTotal else None,
+        }
+
+        # Allocations are measured in a separate (slower) pass...
+        if bAllocations:
+            iAllocOps = max( min(iIterations // 10, 200), 1 )
+            tracemalloc.start()
+            iPeak = 0
+            iStartCurrent, _ = tracemalloc.get_traced_memory()
+            for _ in range(iAllocOps):
+                iBefore, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                func()
+                _, iOpPeak = tracemalloc.get_traced_memory()
+                iPeak += iOpPeak - iBefore
+            iEndCurrent, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            dictValues["alloc_peak_bytes"] = iPeak / iAllocOps
+            dictValues["alloc_retained_bytes"] = (iEndCurrent - iStartCurrent) / iAllocOps
+
+        dictValues.update(dictExtra)
+        return self.record(strGroup, strName, dictValues)
+
+    #
+    # Helpers
+    #
+
+    @classmethod
+    def responseLines(cls, emulator:ELM327Emulator, bsCmd:bytes) -> list[str]:
+        """
+        Return the response lines for a command as ELM327.send_and_parse() gives them to a protocol.
+        """
+
+        listLines = ELM327.splitLines( emulator.handle(bsCmd) )
+        return [ strLine for strLine in listLines if strLine != ">" and strLine != "SEARCHING..." ]
+
+    def newEmulator(self, strProtocol:str = "6") -> ELM327Emulator:
+        dictVehicle = dict(ELM327Emulator.VEHICLE_DEFAULT)
+        dictVehicle["protocol"] = strProtocol
+        return ELM327Emulator(dictVehicle, fLatency=self.fLatency)
+
+    def newConnector(self, strPort:str, funcConnector = OBD2Connector, **dictArgs):
+        return funcConnector(
+            strPort, 0, "", True, 0.1, True, False,
+            cache=CapabilityCache(self.strCachePath), adapterCache=AdapterCache(self.strCachePath), **dictArgs
+        )
+
+    def newProtocol(self, emulator:ELM327Emulator):
+        emulator.handle(b"ATE0")
+        emulator.handle(b"ATH1")
+        listLines = self.responseLines(emulator, b"0100")
+        return ELM327._SUPPORTED_PROTOCOLS[ emulator.strActive ](listLines)
+
+    #
+    # Groups
+    #
+
+    def runParse(self):
+        for strProtocol, strLabel in [ ("6", "can11"), ("7", "can29"), ("3", "legacy") ]:
+            emulator = self.newEmulator(strProtocol)
+            protocol = self.newProtocol(emulator)
+            for bsCmd, strKind in [ (b"010C", "single"), (b"0902", "multi"), (b"0100", "multi_ecu") ]:
+                listLines = self.responseLines(emulator, bsCmd)
+                self.measure(
+                    "parse", "%s_%s" % (strLabel, strKind), functools.partial(protocol, listLines),
+                    frames = len(listLines)
+                )
+
+    def checkDecode(self, iSamples:int = 500) -> dict:
+        """
+        Check that every linear spec decodes exactly as its decoder function: the same str() of the
+        value and the same number type. Single byte payloads are checked exhaustively, longer ones on
+        iSamples random payloads.
+
+        Return the check result (also recorded). The mismatches are logged.
+        """
+
+        randomData = random.Random(0)  # ...repeatable
+        iChecked = 0
+        listMismatches = []
+        listCmds = [ cmd for listMode in CommandList().modes for cmd in listMode
+                     if cmd is not None and cmd.spec is not None ]
+        for cmd in listCmds:
+            iPayload = cmd.iBytes - 2
+            if iPayload == 1:
+                listPayloads = [ iValue.to_bytes(iPayload, "big") for iValue in range(1 << (iPayload * 8)) ]
+            else:
+                listPayloads = [ bytes( randomData.getrandbits(8) for _ in range(iPayload) ) for _ in range(iSamples) ]
+            baHeader = bytes( [ cmd.mode + 0x40 ] ) + bytes.fromhex( cmd.bsCmdID[2:].decode() )
+            funcDecoder = cmd.funcDecoder
+            for bsPayload in listPayloads:
+                message = Message([])
+                message.iECU = cmd.iECU
+                message.baData = bytearray(baHeader + bsPayload)
+                valueSpec = cmd([message]).value
+                valueFunc = funcDecoder([message])
+                iChecked += 1
+                if str(valueSpec) != str(valueFunc) or type(valueSpec.magnitude) != type(valueFunc.magnitude):
+                    listMismatches.append( (cmd.strName, bsPayload.hex(), str(valueSpec), str(valueFunc)) )
+
+        for tupMismatch in listMismatches[:20]:
+            logger.error("Linear spec mismatch: %s payload %s: spec %s, decoder %s" % tupMismatch)
+        return self.record("decode", "spec_check", {
+            "commands" : len(listCmds), "checked" : iChecked, "mismatches" : len(listMismatches)
+        })
+
+    def runDecode(self):
+        self.checkDecode()
+        emulator = self.newEmulator("6")
+        protocol = self.newProtocol(emulator)
+        CMDS = CommandList()
+        iIterations = max(self.iIterations // 4, 1)
+
+        for listMode in CMDS.modes:
+            for cmd in listMode:
+                if cmd is None or cmd.mode == 2 or cmd.mode == 4:
+                    continue  # ...Mode 2 is not decoded and Mode 4 changes the vehicle
+                listMessages = [ message for message in protocol( self.responseLines(emulator, cmd.bsCmdID) )
+                                 if message.isParsed() ]
+                if not listMessages or cmd(listMessages).isNull():
+                    continue
+
+                funcDecoder = getattr(cmd.funcDecoder, "func", cmd.funcDecoder)
+                strDecoder = getattr(funcDecoder, "__name__", str(funcDecoder))
+
+                def decodeRaw(cmd = cmd, listMessages = listMessages):
+                    return cmd(listMessages)
+
+                def decodeValue(cmd = cmd, listMessages = listMessages):
+                    return cmd(listMessages).value
+
+                def decodePint(cmd = cmd, listMessages = listMessages):
+                    Command.RAW_DECODE = False
+                    try:
+                        return cmd(listMessages).value
+                    finally:
+                        Command.RAW_DECODE = True
+
+                dictExtra = { "decoder" : strDecoder, "linear" : cmd.spec is not None }
+                if cmd.spec is not None:
+                    self.measure("decode", cmd.strName + ".raw", decodeRaw, iIterations, **dictExtra)
+                self.measure("decode", cmd.strName + ".value", decodeValue, iIterations, **dictExtra)
+                if cmd.spec is not None:
+                    self.measure("decode", cmd.strName + ".pint", decodePint, iIterations, **dictExtra)
+
+    def runELM(self):
+        emulator = self.newEmulator("6")
+        strPort = emulator.startPTY()
+        try:
+            elm = ELM327(strPort, 0, "", 0.1, True)
+            for bsCmd in [b"010C", b"0902", b"010C0D05"]:
+                self.measure(
+                    "elm", "send_and_parse." + bsCmd.decode(), functools.partial(elm.send_and_parse, bsCmd),
+                    self.iIOIterations, bAllocations=False
+                )
+            elm.close()
+        finally:
+            emulator.stop()
+
+    def runConnector(self):
+        emulator = self.newEmulator("6")
+        emulator.fSearchDelay = 0.2  # ...make the cached protocol path visible
+        strPort = emulator.startPTY()
+        try:
+            # Connect: cold caches, then warm (cached adapter settings and capabilities)...
+            for strName in ["connect.cold", "connect.cached"]:
+                if strName == "connect.cold":
+                    CapabilityCache(self.strCachePath).invalidate()
+                    AdapterCache(self.strCachePath).invalidate()
+                fStart = time.perf_counter()
+                conn = self.newConnector(strPort)
+                fSeconds = time.perf_counter() - fStart
+                self.record("connector", strName, {
+                    "ops" : 1, "p50_us" : fSeconds * 1e6, "mean_us" : fSeconds * 1e6, "ops_s" : 1.0 / fSeconds,
+                    "status" : str(conn.status()),
+                })
+                if strName == "connect.cold":
+                    conn.close()
+
+            CMDS = conn.CMDS
+            self.measure("connector", "query.RPM", functools.partial(conn.query, CMDS.RPM, True),
+                         self.iIOIterations, bAllocations=False)
+            # The cost of the per-stage timing (see QueryTimer)...
+            conn.enableTiming()
+            self.measure("connector", "query.RPM.timed", functools.partial(conn.query, CMDS.RPM, True),
+                         self.iIOIterations, bAllocations=False)
+            conn.enableTiming(False)
+            listCmds = [CMDS.ENGINE_LOAD, CMDS.COOLANT_TEMP, CMDS.RPM, CMDS.SPEED, CMDS.INTAKE_TEMP, CMDS.THROTTLE_POS]
+            self.measure("connector", "query_many.6", functools.partial(conn.query_many, listCmds, True),
+                         self.iIOIterations, bAllocations=False, pids = len(listCmds))
+            conn.close()
+        finally:
+            emulator.stop()
+
+    def runAsync(self, listCounts:list[int] = None):
+        emulator = self.newEmulator("6")
+        strPort = emulator.startPTY()
+        CMDS = CommandList()
+        listAll = [ CMDS.ENGINE_LOAD, CMDS.COOLANT_TEMP, CMDS.RPM, CMDS.SPEED, CMDS.INTAKE_TEMP, CMDS.THROTTLE_POS,
+                    CMDS.MAF, CMDS.TIMING_ADVANCE, CMDS.SHORT_FUEL_TRIM_1, CMDS.LONG_FUEL_TRIM_1, CMDS.INTAKE_PRESSURE,
+                    CMDS.FUEL_LEVEL, CMDS.BAROMETRIC_PRESSURE, CMDS.CONTROL_MODULE_VOLTAGE, CMDS.AMBIANT_AIR_TEMP,
+                    CMDS.RUN_TIME ]
+        try:
+            conn = self.newConnector(strPort, OBD2ConnectorAsync, fDelayCmds=0.001)
+            for iCount in (listCounts or [1, 2, 4, 8, 16]):
+                listLatencies = []
+                lockLatencies = threading.Lock()
+
+                def callback(response):
+                    with lockLatencies:
+                        listLatencies.append( time.time() - response.time )
+
+                conn.unwatch_all()
+                for cmd in listAll[:iCount]:
+                    conn.watch(cmd, callback, force=True, fRate=1000.0)
+                iRequests = emulator.iRequests
+                conn.start()
+                time.sleep(self.fDuration)
+                conn.stop()
+                iRequests = emulator.iRequests - iRequests
+
+                listLatencies.sort()
+                dictRates = conn.getRates()
+                listAchieved = [ fAchieved for _, fAchieved in dictRates.values() if fAchieved ]
+                self.record("async", "watch.%d" % iCount, {
+                    "commands"          : iCount,
+                    "responses"         : len(listLatencies),
+                    "responses_s"       : len(listLatencies) / self.fDuration,
+                    "requests_s"        : iRequests / self.fDuration,
+                    "achieved_hz_min"   : min(listAchieved) if listAchieved else None,
+                    "callback_p50_us"   : (self.percentile(listLatencies, 50) or 0.0) * 1e6,
+                    "callback_p99_us"   : (self.percentile(listLatencies, 99) or 0.0) * 1e6,
+                })
+            conn.close()
+        finally:
+            emulator.stop()
+
+    def runFleet(self, listCounts:list[int] = None):
+        CMDS = CommandList()
+        for iCount in (listCounts or [1, 2, 4, 8]):
+            listEmulators = [ self.newEmulator("6") for _ in range(iCount) ]
+            listPorts = [ emulator.startPTY() for emulator in listEmulators ]
+            funcConnector = functools.partial(
+                OBD2Connector, cache=CapabilityCache(self.strCachePath), adapterCache=AdapterCache(self.strCachePath)
+            )
+            fleet = FleetManager(listPorts, fDelayCmds=0.001, iStreamSize=100000, funcConnector=funcConnector)
+            fleet.watch(CMDS.RPM, fRate=1000.0)
+            fleet.watch(CMDS.SPEED, fRate=1000.0)
+            try:
+                fleet.start()
+                # Wait for the adapters to connect before timing...
+                fDeadline = time.monotonic() + 30.0
+                while time.monotonic() < fDeadline and \
+                      any( dictStatus["queries"] == 0 for dictStatus in fleet.getStatus().values() ):
+                    time.sleep(0.05)
+                while fleet.get(0.0) is not None:
+                    pass
+
+                iSamples = 0
+                fEnd = time.monotonic() + self.fDuration
+                while time.monotonic() < fEnd:
+                    if fleet.get(0.05) is not None:
+                        iSamples += 1
+            finally:
+                fleet.stop()
+                for emulator in listEmulators:
+                    emulator.stop()
+
+            dictStatus = fleet.getStatus()
+            self.record("fleet", "adapters.%d" % iCount, {
+                "adapters"          : iCount,
+                "samples"           : iSamples,
+                "samples_s"         : iSamples / self.fDuration,
+                "samples_s_adapter" : iSamples / self.fDuration / iCount,
+                "errors"            : sum( dictAdapter["errors"] for dictAdapter in dictStatus.values() ),
+                "dropped"           : fleet.getDropped(),
+            })
+
+    def runMemory(self, iResponses:int = 1000):
+        """
+        Retain the responses of many parsed and decoded queries and report the cost of each.
+        """
+
+        emulator = self.newEmulator("6")
+        protocol = self.newProtocol(emulator)
+        CMDS = CommandList()
+        for cmd in [CMDS.RPM, CMDS.VIN]:
+            listLines = self.responseLines(emulator, cmd.bsCmdID)
+            for bKeepRaw in [True, False]:
+                protocol.KEEP_RAW = bKeepRaw
+                listResponses = [ cmd( protocol(listLines) ) ]  # ...warm up
+
+                gc.collect()
+                iObjects = len( gc.get_objects() )
+                iBlocks = sys.getallocatedblocks()
+                tracemalloc.start()
+                iBytes, _ = tracemalloc.get_traced_memory()
+                for _ in range(iResponses):
+                    listResponses.append( cmd( protocol(listLines) ) )
+                iBytes = tracemalloc.get_traced_memory()[0] - iBytes
+                tracemalloc.stop()
+                iBlocks = sys.getallocatedblocks() - iBlocks
+                iObjects = len( gc.get_objects() ) - iObjects
+
+                self.record("memory", "%s.%s" % (cmd.strName, "raw" if bKeepRaw else "noraw"), {
+                    "responses"            : iResponses,
+                    "frames"               : len(listLines),
+                    "bytes_per_response"   : iBytes / iResponses,
+                    "blocks_per_response"  : iBlocks / iResponses,
+                    "objects_per_response" : iObjects / iResponses,  # ...GC tracked objects
+                })
+                del listResponses
+        del protocol.KEEP_RAW
+
+    def runMonitor(self):
+        for strProtocol, strLabel in [ ("6", "can11"), ("7", "can29") ]:
+            # Batch parsing of a port read worth of frame lines...
+            emulator = self.newEmulator(strProtocol)
+            protocol = self.newProtocol(emulator)
+            listLines = [
+                ( "%03X" % iID if iID <= 0x7FF else "%08X" % iID ) + strData
+                for iID, strData in ELM327Emulator.VEHICLE_DEFAULT["broadcast"].items()
+                if (iID > 0x7FF) == (strProtocol == "7")
+            ] * 16
+            self.measure(
+                "monitor", strLabel + "_parse_batch", functools.partial(protocol.parseMonitorLines, listLines),
+                frames = len(listLines)
+            )
+
+            # End to end, from the adapter to a consumer...
+            strPort = emulator.startPTY()
+            try:
+                elm = ELM327(strPort, 0, "", 0.1, True)
+                monitor = BusMonitor()
+                if not elm.startMonitor(monitor):
+                    logger.error("Benchmark: Monitor failed to start")
+                    elm.close()
+                    continue
+                iCursor = monitor.getCursor()
+                iFrames = 0
+                fStart = time.monotonic()
+                fEnd = fStart + self.fDuration
+                while time.monotonic() < fEnd:
+                    iCursor, listFrames = monitor.read(iCursor, fTimeout=0.1)
+                    iFrames += len(listFrames)
+                fElapsed = time.monotonic() - fStart
+                elm.stopMonitor()
+                dictStats = monitor.getStats()
+                self.record("monitor", strLabel + "_stream", {
+                    "frames"       : iFrames,
+                    "frames_s"     : iFrames / fElapsed,
+                    "overruns"     : dictStats["iOverruns"],
+                    "buffer_full"  : dictStats["iBufferFull"],
+                    "invalid"      : dictStats["iInvalid"],
+                })
+                elm.close()
+            finally:
+                emulator.stop()
+
+    #
+    # Run
+    #
+
+    def run(self, listGroups:list[str] = None) -> dict:
+        dictRun = {
+            "parse"     : self.runParse,
+            "decode"    : self.runDecode,
+            "elm"       : self.runELM,
+            "connector" : self.runConnector,
+            "async"     : self.runAsync,
+            "fleet"     : self.runFleet,
+            "memory"    : self.runMemory,
+            "monitor"   : self.runMonitor,
+        }
+        for strGroup in (listGroups or self.GROUPS):
+            logger.info("Benchmark: " + strGroup)
+            dictRun[strGroup]()
+        return self.getReport()
+
+    def close(self):
+        """
+        Remove the temporary cache directory.
+        """
+
+        self.__dirCache.cleanup()
+
+    def getReport(self) -> dict:
+        return {
+            "meta" : {
+                "time"       : time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python"     : sys.version.split()[0],
+                "platform"   : platform.platform(),
+                "latency_s"  : self.fLatency,
+                "iterations" : self.iIterations,
+                "duration_s" : self.fDuration,
+            },
+            "results" : self.listResults,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="pyOBDA benchmarks")
+    parser.add_argument("groups", nargs="*", help="groups to run: " + ", ".join(Benchmark.GROUPS) + " (default: all)")
+    parser.add_argument("--latency", type=float, default=0.0, help="emulated bus latency per response (seconds)")
+    parser.add_argument("--iterations", type=int, default=2000, help="iterations for in-memory benchmarks")
+    parser.add_argument("--io-iterations", type=int, default=200, help="iterations for adapter round trips")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds for each sweep step")
+    parser.add_argument("--no-alloc", action="store_true", help="skip the allocation measurements")
+    parser.add_argument("--output", default=None, help="JSON output file (default: stdout)")
+    parser.add_argument("--verbose", action="store_true", help="keep the OBD2Device log output")
+    args = parser.parse_args()
+    for strGroup in args.groups:
+        if strGroup not in Benchmark.GROUPS:
+            parser.error("unknown group: " + strGroup)
+
+    if not args.verbose:
+        logging.getLogger("OBD2Device").setLevel(logging.WARNING)
+
+    bench = Benchmark(args.latency, args.iterations, args.io_iterations, args.duration, not args.no_alloc)
+    try:
+        strJSON = json.dumps(bench.run(args.groups), indent=1)
+    finally:
+        bench.close()
+    if args.output:
+        with open(args.output, "w") as fileOut:
+            fileOut.write(strJSON + "\n")
+    else:
+        print(strJSON)
@@ -36,8 +36,9 @@ class BitArray:
         iByteLen = len(baValue)
         self.aBits = [ False for iIndex in range(iByteLen * 8) ]
         for iByteIndex in range(iByteLen):
-            for iBitIndex in reversed( range(8) ):
-                self.aBits[iByteIndex * 8 + iBitIndex] = baValue[iByteIndex] & (1 << iBitIndex )
+            # Most significant bit first...
+            for iBitIndex in range(8):
+                self.aBits[iByteIndex * 8 + iBitIndex] = ( baValue[iByteIndex] & (0x80 >> iBitIndex) ) != 0
 
     def __getitem__(self, key):
         if isinstance(key, int):
@@ -57,12 +58,8 @@ class BitArray:
     def getIntValue(self, iStart : int, iStop : int) -> int:
         aBits = self.aBits[iStart:iStop]
         iValue = 0
-        if aBits:
-            iLen = len(aBits)
-            iRange = iLen if iLen < 32 else 32
-            for iBitIndex in range( iRange ):
-                if aBits[iBitIndex]:
-                    iValue &= ( 1 << (iLen - iRange) )
+        for bBit in aBits[:32]:
+            iValue = (iValue << 1) | int(bBit)
         return iValue
 
     def __len__(self):
@@ -0,0 +1,150 @@
+############################################################################
+#
+# Python Onboard Diagnostics II Advanced
+#
+# BusMonitor.py
+#
+# Copyright 2021-2023 Keven L. Ates (atescomp@gmail.com)
+#
+# This file is part of the Onboard Diagnostics II Advanced (pyOBDA) system.
+#
+# pyOBDA is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# pyOBDA is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyOBDA; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+############################################################################
+
+import threading
+import time
+
+
+class BusMonitor:
+    """
+    A bounded ring buffer of bus frames from the adapter's monitor mode (see ELM327.startMonitor()).
+
+    The monitor reader thread puts the parsed frames (see CANProtocol.parseMonitorFrame()) and any number
+    of consumers read them. The producer never blocks: when the ring is full, the oldest frames are
+    overwritten. Each consumer keeps its own cursor (a frame sequence number), so every consumer sees
+    every frame that is still in the ring:
+        iCursor = monitor.getCursor()
+        while monitor.isRunning():
+            iCursor, listFrames = monitor.read(iCursor, fTimeout=0.5)
+
+    Counters (see getStats()):
+        iFrames     - frames received
+        iOverruns   - frames overwritten before a consumer read them (counted per consumer)
+        iInvalid    - lines that could not be parsed as frames
+        iBufferFull - adapter "BUFFER FULL" reports (the adapter stops monitoring and is restarted)
+        iErrors     - other adapter error lines (for example, "<RX ERROR", "CAN ERROR")
+    """
+
+    def __init__(self, iCapacity:int = 8192):
+        self.__iCapacity = iCapacity
+        self.__listRing : list = [None] * iCapacity
+        self.__iSequence = 0  # ...sequence number of the next frame
+        self.__condition = threading.Condition()
+        self.__bRunning = False
+        self.__fStart = None
+        self.__fStop = None
+
+        self.iOverruns = 0
+        self.iInvalid = 0
+        self.iBufferFull = 0
+        self.iErrors = 0
+
+    def start(self):
+        with self.__condition:
+            self.__bRunning = True
+            self.__fStart = time.monotonic()
+            self.__fStop = None
+
+    def stop(self):
+        # Wake any waiting consumers...
+        with self.__condition:
+            self.__bRunning = False
+            self.__fStop = time.monotonic()
+            self.__condition.notify_all()
+
+    def isRunning(self) -> bool:
+        return self.__bRunning
+
+    def put(self, listFrames:list):
+        """
+        Add a batch of frames, overwriting the oldest when full.
+        """
+
+        iCapacity = self.__iCapacity
+        listRing = self.__listRing
+        with self.__condition:
+            iSequence = self.__iSequence
+            if len(listFrames) > iCapacity:
+                iSequence += len(listFrames) - iCapacity
+                listFrames = listFrames[-iCapacity:]
+            iIndex = iSequence % iCapacity
+            iFirst = min( len(listFrames), iCapacity - iIndex )
+            listRing[iIndex:iIndex + iFirst] = listFrames[:iFirst]
+            listRing[:len(listFrames) - iFirst] = listFrames[iFirst:]
+            self.__iSequence = iSequence + len(listFrames)
+            self.__condition.notify_all()
+
+    def getCursor(self) -> int:
+        """
+        Return the cursor of the next frame (a new consumer starts here).
+        """
+
+        return self.__iSequence
+
+    def read(self, iCursor:int, iMax:int = None, fTimeout:float = None) -> tuple[int, list]:
+        """
+        Read the frames from a cursor, waiting up to fTimeout seconds (None = no wait) for new frames.
+
+        Frames already overwritten are skipped and counted as overruns.
+
+        Return a 2-tuple ( Next Cursor, Frames ).
+        """
+
+        with self.__condition:
+            if iCursor >= self.__iSequence and fTimeout and self.__bRunning:
+                self.__condition.wait_for(lambda: iCursor < self.__iSequence or not self.__bRunning, fTimeout)
+
+            iSequence = self.__iSequence
+            iCapacity = self.__iCapacity
+            if iCursor < iSequence - iCapacity:
+                self.iOverruns += iSequence - iCapacity - iCursor
+                iCursor = iSequence - iCapacity
+            iEnd = iSequence if iMax is None else min(iSequence, iCursor + iMax)
+            if iEnd <= iCursor:
+                return (iCursor, [])
+
+            iStart = iCursor % iCapacity
+            iStop = iEnd % iCapacity
+            if iStart < iStop:
+                listFrames = self.__listRing[iStart:iStop]
+            else:
+                listFrames = self.__listRing[iStart:] + self.__listRing[:iStop]
+            return (iEnd, listFrames)
+
+    def getStats(self) -> dict:
+        """
+        Return the counters and the frame rate (frames per second while running).
+        """
+
+        fStart = self.__fStart
+        fElapsed = ( (self.__fStop or time.monotonic()) - fStart ) if fStart is not None else 0.0
+        return {
+            "iFrames"     : self.__iSequence,
+            "fFrameRate"  : (self.__iSequence / fElapsed) if fElapsed > 0.0 else 0.0,
+            "iOverruns"   : self.iOverruns,
+            "iInvalid"    : self.iInvalid,
+            "iBufferFull" : self.iBufferFull,
+            "iErrors"     : self.iErrors,
+        }
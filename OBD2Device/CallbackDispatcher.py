@@ -0,0 +1,222 @@
+############################################################################
+#
+# Python Onboard Diagnostics II Advanced
+#
+# CallbackDispatcher.py
+#
+# Copyright 2021-2023 Keven L. Ates (atescomp@gmail.com)
+#
+# This file is part of the Onboard Diagnostics II Advanced (pyOBDA) system.
+#
+# pyOBDA is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# pyOBDA is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyOBDA; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+############################################################################
+
+import time
+import threading
+import logging
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .Response import Response
+
+logger = logging.getLogger(__name__)
+
+
+class CallbackDispatcher:
+    """
+    Deliver responses to callbacks on a thread pool so the polling thread never waits on user code.
+
+    Each callback (subscriber) has its own bounded queue. A subscriber is serviced by at most one
+    pool thread at a time, so a callback always sees its responses in order and is never run
+    concurrently with itself. A slow callback only fills its own queue. When the queue is full,
+    the overflow policy applies:
+        DROP_OLDEST     - the oldest queued response is dropped
+        COALESCE_LATEST - a queued response for the same command is replaced by the newer one;
+                          otherwise the oldest queued response is dropped
+
+    Calls, drops, errors, queue wait and run time are counted per callback (see getStats()).
+    """
+
+    DROP_OLDEST     = 0
+    COALESCE_LATEST = 1
+
+    def __init__(self, iMaxWorkers:int = 4, iQueueSize:int = 16, iPolicy:int = DROP_OLDEST):
+        self.__iQueueSize = max(iQueueSize, 1)
+        self.__iPolicy = iPolicy
+        self.__executor = ThreadPoolExecutor(max_workers=iMaxWorkers, thread_name_prefix="OBD2Callback")
+        self.__lock = threading.Lock()
+        self.__dictSubscribers : dict = {}  # key = Function, value = subscriber state (dict)
+
+    def __getSubscriber(self, callback):
+        dictSubscriber = self.__dictSubscribers.get(callback)
+        if dictSubscriber is None:
+            dictSubscriber = {
+                # COALESCE_LATEST: key = Command, value = (Response, enqueue time)
+                # DROP_OLDEST:     deque of (Response, enqueue time)
+                "queue"       : OrderedDict() if self.__iPolicy == self.COALESCE_LATEST else deque(),
+                "bScheduled"  : False,
+                "bRemoved"    : False,  # ...removed while its drain was scheduled (see remove())
+                "iCalls"      : 0,
+                "iDrops"      : 0,
+                "iErrors"     : 0,
+                "fWaitTotal"  : 0.0,
+                "fWaitMax"    : 0.0,
+                "fRunTotal"   : 0.0,
+                "fRunMax"     : 0.0,
+            }
+            self.__dictSubscribers[callback] = dictSubscriber
+        return dictSubscriber
+
+    def dispatch(self, callback, response:Response):
+        """
+        Queue a response for a callback. This never blocks on the callback.
+        """
+
+        tupItem = (response, time.monotonic())
+        with self.__lock:
+            dictSubscriber = self.__getSubscriber(callback)
+            if dictSubscriber["bRemoved"]:
+                dictSubscriber["bRemoved"] = False  # ...subscribed again, the running drain serves it
+            queueItems = dictSubscriber["queue"]
+            if self.__iPolicy == self.COALESCE_LATEST:
+                if response.command in queueItems:
+                    dictSubscriber["iDrops"] += 1
+                    queueItems[response.command] = tupItem # ...replace in place
+                else:
+                    if len(queueItems) >= self.__iQueueSize:
+                        dictSubscriber["iDrops"] += 1
+                        queueItems.popitem(last=False)
+                    queueItems[response.command] = tupItem
+            else:
+                if len(queueItems) >= self.__iQueueSize:
+                    dictSubscriber["iDrops"] += 1
+                    queueItems.popleft()
+                queueItems.append(tupItem)
+
+            if dictSubscriber["bScheduled"]:
+                return # ...the running drain will pick it up
+            dictSubscriber["bScheduled"] = True
+
+        try:
+            self.__executor.submit(self.__drain, callback, dictSubscriber)
+        except RuntimeError: # ...shut down
+            with self.__lock:
+                dictSubscriber["bScheduled"] = False
+
+    def __drain(self, callback, dictSubscriber:dict):
+        """
+        Run a callback over its queued responses until the queue is empty.
+        """
+
+        queueItems = dictSubscriber["queue"]
+        while True:
+            with self.__lock:
+                if len(queueItems) == 0:
+                    dictSubscriber["bScheduled"] = False
+                    if dictSubscriber["bRemoved"]:
+                        self.__dictSubscribers.pop(callback, None)
+                    return
+                if self.__iPolicy == self.COALESCE_LATEST:
+                    response, fQueued = queueItems.popitem(last=False)[1]
+                else:
+                    response, fQueued = queueItems.popleft()
+
+            fStart = time.monotonic()
+            try:
+                callback(response)
+            except Exception:
+                logger.exception("Callback %s failed for command: %s" % (callback, response.command))
+                dictSubscriber["iErrors"] += 1
+            fEnd = time.monotonic()
+
+            if dictSubscriber["bRemoved"]:
+                continue  # ...a removed callback keeps no statistics
+            fWait = fStart - fQueued
+            fRun = fEnd - fStart
+            dictSubscriber["iCalls"] += 1
+            dictSubscriber["fWaitTotal"] += fWait
+            dictSubscriber["fRunTotal"] += fRun
+            if fWait > dictSubscriber["fWaitMax"]:
+                dictSubscriber["fWaitMax"] = fWait
+            if fRun > dictSubscriber["fRunMax"]:
+                dictSubscriber["fRunMax"] = fRun
+
+    def remove(self, callback, cmd = None):
+        """
+        Drop a callback's queued responses and statistics.
+
+        With a command, only drop the callback's queued responses for that command (the callback
+        still receives its other commands).
+
+        A call already running finishes. A subscriber with a scheduled drain is only marked removed,
+        so a new dispatch() is served by that drain and the callback never runs concurrently with
+        itself.
+        """
+
+        with self.__lock:
+            dictSubscriber = self.__dictSubscribers.get(callback)
+            if dictSubscriber is None:
+                return
+            queueItems = dictSubscriber["queue"]
+            if cmd is not None:
+                if self.__iPolicy == self.COALESCE_LATEST:
+                    queueItems.pop(cmd, None)
+                else:
+                    listKeep = [ tupItem for tupItem in queueItems if tupItem[0].command != cmd ]
+                    queueItems.clear()  # ...in place, a running drain holds the queue
+                    queueItems.extend(listKeep)
+                return
+            queueItems.clear()
+            if dictSubscriber["bScheduled"]:
+                dictSubscriber["bRemoved"] = True
+                for strKey in ("iCalls", "iDrops", "iErrors"):
+                    dictSubscriber[strKey] = 0
+                for strKey in ("fWaitTotal", "fWaitMax", "fRunTotal", "fRunMax"):
+                    dictSubscriber[strKey] = 0.0
+            else:
+                del self.__dictSubscribers[callback]
+
+    def getStats(self) -> dict:
+        """
+        Return the delivery statistics for each callback.
+
+        Return a dict of dicts keyed by callback with the keys:
+            iCalls, iDrops, iErrors, iQueued, fWaitAvg, fWaitMax, fRunAvg, fRunMax (seconds)
+        """
+
+        dictStats = {}
+        with self.__lock:
+            for callback, dictSubscriber in self.__dictSubscribers.items():
+                if dictSubscriber["bRemoved"]:
+                    continue
+                iCalls = dictSubscriber["iCalls"]
+                dictStats[callback] = {
+                    "iCalls"   : iCalls,
+                    "iDrops"   : dictSubscriber["iDrops"],
+                    "iErrors"  : dictSubscriber["iErrors"],
+                    "iQueued"  : len(dictSubscriber["queue"]),
+                    "fWaitAvg" : (dictSubscriber["fWaitTotal"] / iCalls) if iCalls else 0.0,
+                    "fWaitMax" : dictSubscriber["fWaitMax"],
+                    "fRunAvg"  : (dictSubscriber["fRunTotal"] / iCalls) if iCalls else 0.0,
+                    "fRunMax"  : dictSubscriber["fRunMax"],
+                }
+        return dictStats
+
+    def shutdown(self, bWait:bool = True):
+        """
+        Stop accepting responses. If waiting, finish delivering the queued responses first.
+        """
+
+        self.__executor.shutdown(wait=bWait, cancel_futures=not bWait)
@@ -0,0 +1,147 @@
+############################################################################
+#
+# Python Onboard Diagnostics II Advanced
+#
+# CapabilityCache.py
+#
+# Copyright 2021-2023 Keven L. Ates (atescomp@gmail.com)
+#
+# This file is part of the Onboard Diagnostics II Advanced (pyOBDA) system.
+#
+# pyOBDA is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# pyOBDA is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyOBDA; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+############################################################################
+
+import os
+import time
+import threading
+import logging
+
+from .Utility import Utility
+
+logger = logging.getLogger(__name__)
+
+
+class CapabilityCache:
+    """
+    Persistent per-vehicle capability cache keyed by VIN and protocol.
+
+    Stores the vehicle's supported command names, the PID listing bitmaps, the ECU map, and the
+    detected baud rate and protocol ID in "vehicles.json" under the configuration directory.
+
+    An entry is only used when:
+        the cache file version matches,
+        the entry is younger than the time to live (TTL),
+        the protocol matches the connected protocol, and
+        the ECU map matches the map built from the connection's "0100" response.
+    Otherwise, the entry is dropped and discovery runs as usual.
+    """
+
+    VERSION = 1
+    FILE_NAME = "vehicles.json"
+    TTL_DEFAULT = 30 * 24 * 60 * 60.0  # ...30 days
+
+    __lock = threading.Lock()  # ...serialize file access between connectors
+
+    def __init__(self, strPath:str = None, fTTL:float = TTL_DEFAULT):
+        self.strPath = strPath if strPath else Utility.getConfigPath()
+        self.strFile = os.path.join(self.strPath, self.FILE_NAME)
+        self.fTTL = fTTL
+
+    @classmethod
+    def getKey(cls, strVIN:str, strProtocolID:str) -> str:
+        return strVIN + ":" + strProtocolID
+
+    @classmethod
+    def toJSONMap(cls, mapECU:dict) -> dict:
+        """
+        Return an ECU map (TxID to ECU ID) with JSON (string) keys.
+        """
+
+        return { str(iTxID) : iECU for iTxID, iECU in mapECU.items() }
+
+    def __readAll(self) -> dict:
+        dictCache = Utility.readJSON(self.strFile)
+        if dictCache and dictCache.get("version") != self.VERSION:
+            logger.info("Capability cache version mismatch. Ignoring...")
+            return {}
+        return dictCache.get("vehicles", {})
+
+    def __writeAll(self, dictVehicles:dict):
+        Utility.writeJSON(self.strFile, { "version" : self.VERSION, "vehicles" : dictVehicles })
+
+    def load(self, strVIN:str, strProtocolID:str, mapECU:dict) -> dict:
+        """
+        Return the valid cache entry for a vehicle or None.
+
+        The entry is a dict with the keys:
+            vin, protocol, baud, commands (list of names), pids (dict of name to data hex),
+            ecus (ECU map with string keys), time
+        """
+
+        strKey = self.getKey(strVIN, strProtocolID)
+        with self.__lock:
+            dictEntry = self.__readAll().get(strKey)
+        if dictEntry is None:
+            return None
+
+        strReason = None
+        if time.time() - dictEntry.get("time", 0) > self.fTTL:
+            strReason = "expired"
+        elif dictEntry.get("protocol") != strProtocolID:
+            strReason = "protocol changed"
+        elif dictEntry.get("ecus") != self.toJSONMap(mapECU):
+            strReason = "ECU map changed"
+
+        if strReason is not None:
+            logger.info("Capability cache entry for %s is invalid (%s)" % (strKey, strReason))
+            self.invalidate(strVIN, strProtocolID)
+            return None
+
+        return dictEntry
+
+    def store(self, strVIN:str, strProtocolID:str, iBaudRate:int, mapECU:dict, listCmdNames:list[str], dictPIDs:dict):
+        """
+        Store a vehicle's capabilities.
+        """
+
+        strKey = self.getKey(strVIN, strProtocolID)
+        with self.__lock:
+            dictVehicles = self.__readAll()
+            dictVehicles[strKey] = {
+                "vin"      : strVIN,
+                "protocol" : strProtocolID,
+                "baud"     : iBaudRate,
+                "commands" : sorted(listCmdNames),
+                "pids"     : dictPIDs,
+                "ecus"     : self.toJSONMap(mapECU),
+                "time"     : time.time(),
+            }
+            self.__writeAll(dictVehicles)
+
+    def invalidate(self, strVIN:str = None, strProtocolID:str = None):
+        """
+        Drop cached entries: one vehicle and protocol, all protocols for a vehicle, or everything.
+        """
+
+        with self.__lock:
+            dictVehicles = self.__readAll()
+            if strVIN is None:
+                dictVehicles = {}
+            elif strProtocolID is not None:
+                dictVehicles.pop(self.getKey(strVIN, strProtocolID), None)
+            else:
+                dictVehicles = { strKey : dictEntry for strKey, dictEntry in dictVehicles.items()
+                                 if dictEntry.get("vin") != strVIN }
+            self.__writeAll(dictVehicles)
@@ -39,6 +39,9 @@ logger = logging.getLogger(__name__)
 
 
 class Command:
+    # Decode with the decoder's precompiled linear spec (if any) and build Pint Quantities lazily...
+    RAW_DECODE = True
+
     def __init__(self,
                  strName : str,
                  strDesc : str,
@@ -57,6 +60,7 @@ class Command:
         self.iECU        = iECU        # ...expected ECU ID that generates response messages
         self.bFast       = bFast       # ...boolean indicating if an extra "return early" end-of-command value can be added
         self.bsHeader    = bsHeader    # ...bytes ECU Header used in requests
+        self.spec        = getattr(funcDecoder, "spec", None) # ...precompiled linear spec (see Decoders.linear())
 
     def clone(self):
         return Command(self.strName,
@@ -101,7 +105,10 @@ class Command:
         # Create the response object with the raw data received and reference to original command
         response = Response(self, messages)
         if messages:
-            response.value = self.funcDecoder(messages)
+            if self.spec is not None and Command.RAW_DECODE:
+                response.setRaw(self.spec.decode(messages[0].baData), self.spec)
+            else:
+                response.value = self.funcDecoder(messages)
         else:
             logger.info(str(self) + " did not receive any acceptable messages")
 
@@ -0,0 +1,176 @@
+############################################################################
+#
+# Python Onboard Diagnostics II Advanced
+#
+# CommandScheduler.py
+#
+# Copyright 2021-2023 Keven L. Ates (atescomp@gmail.com)
+#
+# This file is part of the Onboard Diagnostics II Advanced (pyOBDA) system.
+#
+# pyOBDA is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# pyOBDA is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyOBDA; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+############################################################################
+
+import heapq
+import logging
+
+from .Command import Command
+
+logger = logging.getLogger(__name__)
+
+
+class CommandScheduler:
+    """
+    Deadline scheduler for watched commands.
+
+    Each command is given a target rate (Hz) and a priority. The scheduler keeps the commands in a
+    heap ordered by their next deadline. Of the commands that are due, the highest priority goes
+    first and, within a priority, the most overdue goes first. After a command is sent, its next
+    deadline is one period after the previous deadline. If the link has fallen behind, the next
+    deadline is "now" instead, so a late command does not send a burst to catch up.
+
+    The achieved rate of each command is tracked with an exponential moving average of the time
+    between completions. This lets callers compare the requested and achieved rates.
+    """
+
+    # Smoothing factor for the achieved rate moving average...
+    RATE_SMOOTHING = 0.2
+
+    def __init__(self, fDefaultPeriod:float = 0.25):
+        self.__fDefaultPeriod = fDefaultPeriod
+        self.__listHeap : list = []            # ...heap of [deadline, sequence, command]
+        self.__dictEntries : dict = {}         # key = Command, value = schedule entry (dict)
+        self.__iSequence = 0                   # ...heap tie breaker & stale entry marker
+
+    def __len__(self):
+        return len(self.__dictEntries)
+
+    def __contains__(self, cmd:Command):
+        return cmd in self.__dictEntries
+
+    def __push(self, cmd:Command, dictEntry:dict):
+        self.__iSequence += 1
+        dictEntry["iSequence"] = self.__iSequence
+        heapq.heappush(self.__listHeap, (dictEntry["fDeadline"], self.__iSequence, cmd))
+
+    def add(self, cmd:Command, fRate:float = None, iPriority:int = 0, fNow:float = 0.0):
+        """
+        Add a command to the schedule or update its rate and priority.
+
+        A missing or non-positive rate uses the default period. Higher priorities are sent first.
+        A new command is due immediately.
+        """
+
+        fPeriod = (1.0 / fRate) if (fRate is not None and fRate > 0) else self.__fDefaultPeriod
+        dictEntry = self.__dictEntries.get(cmd)
+        if dictEntry is None:
+            dictEntry = {
+                "fPeriod"      : fPeriod,
+                "iPriority"    : iPriority,
+                "fDeadline"    : fNow,
+                "fLastTime"    : None,
+                "fInterval"    : None,
+                "iSequence"    : 0,
+            }
+            self.__dictEntries[cmd] = dictEntry
+            self.__push(cmd, dictEntry)
+        else:
+            dictEntry["fPeriod"] = fPeriod
+            dictEntry["iPriority"] = iPriority
+
+    def remove(self, cmd:Command):
+        """
+        Remove a command from the schedule.
+
+        The command's heap entry goes stale and is discarded when it surfaces.
+        """
+
+        self.__dictEntries.pop(cmd, None)
+
+    def clear(self):
+        self.__listHeap = []
+        self.__dictEntries = {}
+
+    def __isStale(self, tupItem):
+        dictEntry = self.__dictEntries.get(tupItem[2])
+        return (dictEntry is None) or (dictEntry["iSequence"] != tupItem[1])
+
+    def getWait(self, fNow:float) -> float:
+        """
+        Return the seconds until the next command is due (0.0 if one is overdue, None if empty).
+        """
+
+        while self.__listHeap and self.__isStale(self.__listHeap[0]):
+            heapq.heappop(self.__listHeap)
+        if not self.__listHeap:
+            return None
+        return max(self.__listHeap[0][0] - fNow, 0.0)
+
+    def popDue(self, iMax:int, fNow:float) -> list[Command]:
+        """
+        Remove and return up to iMax due commands, by priority then by lateness.
+
+        The returned commands are out of the heap until complete() reschedules them.
+        """
+
+        listDue = []
+        while self.__listHeap and self.__listHeap[0][0] <= fNow:
+            tupItem = heapq.heappop(self.__listHeap)
+            if not self.__isStale(tupItem):
+                listDue.append(tupItem)
+
+        # Highest priority first, then earliest deadline...
+        listDue.sort(key = lambda tupItem: (-self.__dictEntries[ tupItem[2] ]["iPriority"], tupItem[0]))
+
+        # Return the unused due commands to the heap...
+        for tupItem in listDue[iMax:]:
+            heapq.heappush(self.__listHeap, tupItem)
+
+        return [ tupItem[2] for tupItem in listDue[:iMax] ]
+
+    def complete(self, cmds:list[Command], fNow:float):
+        """
+        Reschedule sent commands and update their achieved rates.
+        """
+
+        for cmd in cmds:
+            dictEntry = self.__dictEntries.get(cmd)
+            if dictEntry is None:
+                continue # ...removed while in flight
+
+            if dictEntry["fLastTime"] is not None:
+                fInterval = fNow - dictEntry["fLastTime"]
+                if dictEntry["fInterval"] is None:
+                    dictEntry["fInterval"] = fInterval
+                else:
+                    dictEntry["fInterval"] += self.RATE_SMOOTHING * (fInterval - dictEntry["fInterval"])
+            dictEntry["fLastTime"] = fNow
+
+            dictEntry["fDeadline"] = max(dictEntry["fDeadline"] + dictEntry["fPeriod"], fNow)
+            self.__push(cmd, dictEntry)
+
+    def getRates(self) -> dict[Command, tuple]:
+        """
+        Return the requested and achieved rates (Hz) for each scheduled command.
+
+        Return a dict of 2-tuples ( Requested Rate (float), Achieved Rate (float or None) ) keyed by Command.
+        """
+
+        dictRates = {}
+        for cmd, dictEntry in list( self.__dictEntries.items() ):
+            fInterval = dictEntry["fInterval"]
+            fAchieved = (1.0 / fInterval) if fInterval else None
+            dictRates[cmd] = ( 1.0 / dictEntry["fPeriod"], fAchieved )
+        return dictRates
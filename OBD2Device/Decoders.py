@@ -29,7 +29,7 @@
 import functools
 
 from .BitArray import BitArray
-from .UnitAndScale import Unit, UAS_IDS
+from .UnitAndScale import Unit, UAS, UAS_IDS, LinearSpec
 from .Status import Status
 from .StatusTest import StatusTest
 from .Monitor import Monitor
@@ -82,7 +82,10 @@ Unit/Scaling in that table, simply to avoid redundant code.
 
 def uas(id_):
     """ get the corresponding decoder for this UAS ID """
-    return functools.partial(decodeUAS, id_=id_)
+    funcDecoder = functools.partial(decodeUAS, iID=id_)
+    if isinstance(UAS_IDS[id_], UAS):
+        funcDecoder.spec = UAS_IDS[id_].toSpec()
+    return funcDecoder
 
 
 def decodeUAS(listMessages : list[Message], iID):
@@ -90,17 +93,36 @@ def decodeUAS(listMessages : list[Message], iID):
     return UAS_IDS[iID](baMessage)
 
 
+"""
+Linear decoders
+Decoders that scale and offset a single integer also carry an equivalent precompiled LinearSpec
+(see UnitAndScale.py) as a "spec" attribute. Commands use the spec to decode to plain numbers and
+only build the Pint Quantity when the value is requested. The byte slice indexes the message data,
+which includes the mode and PID bytes.
+"""
+
+def linear(iStart : int, iEnd : int, bSigned : bool, fScale : float, funcUnit, fOffset : float = 0, iDivisor : int = 1):
+    """ attach the equivalent linear spec to a decoder (it must repeat the decoder's arithmetic) """
+    spec = LinearSpec(iStart, iEnd, bSigned, fScale, funcUnit, fOffset, iDivisor)
+    def attach(funcDecoder):
+        funcDecoder.spec = spec
+        return funcDecoder
+    return attach
+
+
 """
 General sensor decoders
 Return Pint Quantities
 """
 
+@linear(2, None, False, 1, Unit.count)
 def count(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iCount = Utility.convertBEBytesToInt(baMessage)
     return iCount * Unit.count
 
 # 0 to 100 %
+@linear(2, 3, False, 100, Unit.percent, iDivisor=255)
 def percent(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iPercent = baMessage[0]
@@ -109,6 +131,7 @@ def percent(listMessages : list[Message]):
 
 
 # -100 to 100 %
+@linear(2, 3, False, 100, Unit.percent, -100.0, iDivisor=128)
 def percentCentered(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iPercent = baMessage[0]
@@ -117,6 +140,7 @@ def percentCentered(listMessages : list[Message]):
 
 
 # -40 to 215 C
+@linear(2, None, False, 1, Unit.celsius, -40)
 def temperature(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iTemperature = Utility.convertBEBytesToInt(baMessage)
@@ -125,6 +149,7 @@ def temperature(listMessages : list[Message]):
 
 
 # -128 to 128 mA
+@linear(4, 6, False, 1, Unit.milliampere, -128, iDivisor=256)
 def currentCentered(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iCurrent = Utility.convertBEBytesToInt(baMessage[2:4])
@@ -133,6 +158,7 @@ def currentCentered(listMessages : list[Message]):
 
 
 # 0 to 1.275 volts
+@linear(2, 3, False, 1, Unit.volt, iDivisor=200)
 def sensorVoltage(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iVoltage = baMessage[0] / 200.0
@@ -140,6 +166,7 @@ def sensorVoltage(listMessages : list[Message]):
 
 
 # 0 to 8 volts
+@linear(4, 6, False, 8, Unit.volt, iDivisor=65535)
 def sensorVoltageBig(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iVoltage = Utility.convertBEBytesToInt(baMessage[2:4])
@@ -148,6 +175,7 @@ def sensorVoltageBig(listMessages : list[Message]):
 
 
 # 0 to 765 kPa
+@linear(2, 3, False, 3, Unit.kilopascal)
 def pressureFuel(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iPressure = baMessage[0]
@@ -156,6 +184,7 @@ def pressureFuel(listMessages : list[Message]):
 
 
 # 0 to 255 kPa
+@linear(2, 3, False, 1, Unit.kilopascal)
 def pressure(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iPressure = baMessage[0]
@@ -172,6 +201,7 @@ def pressureEvap(listMessages : list[Message]):
 
 
 # 0 to 327.675 kPa
+@linear(2, None, False, 1, Unit.kilopascal, iDivisor=200)
 def pressureEvapAbs(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iPressure = Utility.convertBEBytesToInt(baMessage)
@@ -180,6 +210,7 @@ def pressureEvapAbs(listMessages : list[Message]):
 
 
 # -32767 to 32768 Pa
+@linear(2, None, False, 1, Unit.pascal, -32767)
 def pressureEvapAlt(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iPressure = Utility.convertBEBytesToInt(baMessage)
@@ -188,6 +219,7 @@ def pressureEvapAlt(listMessages : list[Message]):
 
 
 # -64 to 63.5 degrees
+@linear(2, 3, False, 1, Unit.degree, -64.0, iDivisor=2)
 def timingAdvance(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iTimeAdv = baMessage[0]
@@ -196,6 +228,7 @@ def timingAdvance(listMessages : list[Message]):
 
 
 # -210 to 301 degrees
+@linear(2, None, False, 1, Unit.degree, -210.0, iDivisor=128)
 def timingInject(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iTiming = Utility.convertBEBytesToInt(baMessage)
@@ -204,6 +237,7 @@ def timingInject(listMessages : list[Message]):
 
 
 # 0 to 2550 grams/sec
+@linear(2, 3, False, 10, Unit.gps)
 def maxMAF(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iMaxMAF = baMessage[0]
@@ -212,6 +246,7 @@ def maxMAF(listMessages : list[Message]):
 
 
 # 0 to 3212 Liters/hour
+@linear(2, None, False, 0.05, Unit.liters_per_hour)
 def getFuelRate(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iFuelRate = Utility.convertBEBytesToInt(baMessage)
@@ -249,6 +284,7 @@ def statusAuxInput(listMessages : list[Message]):
 
 
 # 0 to 25700 %
+@linear(2, None, False, 100.0 / 255.0, Unit.percent)
 def getAbsoluteLoad(listMessages : list[Message]):
     baMessage = listMessages[0].baData[2:]
     iLoad = Utility.convertBEBytesToInt(baMessage)
@@ -26,17 +26,21 @@
 ############################################################################
 
 
-import re
 import serial
 import time
+import threading
 
 from .ConnectionStatus import ConnectionStatus
 from .Protocols.Legacy import \
         SAE_J1850_PWM, SAE_J1850_VPW, ISO_9141_2, ISO_14230_4_5baud, ISO_14230_4_fast
 from .Protocols.CAN import \
-        ISO_15765_4_11bit_500k, ISO_15765_4_29bit_500k, ISO_15765_4_11bit_250k, \
+        CANProtocol, ISO_15765_4_11bit_500k, ISO_15765_4_29bit_500k, ISO_15765_4_11bit_250k, \
         ISO_15765_4_29bit_250k, SAE_J1939
 from .Protocols.Unknown import UnknownProtocol
+from .AdapterCache import AdapterCache
+from .QueryTimer import QueryTimer
+from .Protocols.ISOTP import ISOTPReassembler
+from .BusMonitor import BusMonitor
 
 import logging
 
@@ -61,10 +65,17 @@ class ELM327:
         getPortName()
         getProtocolName()
         getECUsValues()
+        getDetectTimes()
+        startMonitor()
+        stopMonitor()
+
+    With an AdapterCache, auto detection first tries the last known good baud rate (per port) and
+    protocol (per adapter "AT @2" identifier) and only falls back to the full search when they fail.
     """
 
     # ELM Chevron (prompt)
     ELM_PROMPT = '>'
+    ELM_PROMPT_BYTES = b'>'
 
     # ELM 'OK' (successful reply)
     ELM_OK = 'OK'
@@ -166,8 +177,36 @@ class ELM327:
         "ERR",                  # ...All other errors: ERRxx == digits, internal ELM error
     ]
 
+    #
+    # Response Wait Classes
+    #
+    # The most (fractional) seconds to keep waiting on a silent adapter for the prompt. A read ends the
+    # instant the prompt arrives, so these limits only apply when the adapter or vehicle stays silent.
+    # A limit of None ends the read after a single port timeout of silence.
+    #
+    _WAIT_PROBE  = None  # ...baud rate probing: a wrong rate is silent or garbage
+    _WAIT_NORMAL =  1.0  # ...AT commands and PIDs: the ELM answers "NO DATA" after its own timeout (AT ST)
+    _WAIT_RESET  =  5.0  # ...AT Z: the ELM reboots before printing its version
+    _WAIT_SEARCH = 15.0  # ...0100 during protocol search: the ELM may try every protocol ("SEARCHING...")
+
+    #
+    # Read Buffer
+    #
+    # Initial size of the reusable read buffer. A typical response is well under 100 bytes, a large
+    # multiframe response (VIN, Mode 06) is a few hundred. The buffer grows when needed and then keeps
+    # its size.
+    #
+    _READ_BUFFER_SIZE = 1024
+
+    #
+    # Log Translation Table
+    #
+    # Maps printable ASCII to itself and everything else to '_' for buffer logging.
+    #
+    _LOG_PRINTABLE = bytes( (iChar if (31 < iChar < 127) else 95) for iChar in range(256) )
+
     def __init__(self, strPortName:str, iBaudRate:int, strProtocol:str, fTimeout:float,
-                 bCheckVoltage=True, bStartLowPower=False):
+                 bCheckVoltage=True, bStartLowPower=False, adapterCache:AdapterCache=None):
         """
         Initialize the ELM interface port by resetting and gettings supported PIDs.
         """
@@ -187,6 +226,14 @@ class ELM327:
         self.__objProtocol = UnknownProtocol([])
         self.__bLowPower = bStartLowPower
         self.__fTimeout = fTimeout
+        self.__baReadBuffer = bytearray(self._READ_BUFFER_SIZE)
+        self.__adapterCache = adapterCache
+        self.__strAdapterID = AdapterCache.getAdapterID(strPortName, None)
+        self.__dictDetectTimes = {}
+        self.timer:QueryTimer = None  # ...per-stage timing (see QueryTimer), off when None
+        self.__threadMonitor = None  # ...the monitor mode reader thread (see startMonitor())
+        self.__eventMonitorStop = threading.Event()
+        self.__bsMonitorCmd = None  # ..."STMA" (STN adapters) or "AT MA", None = not probed yet
 
         #
         # Open Port
@@ -217,15 +264,17 @@ class ELM327:
         #
         # Find the ELM's bps (baud rate)
         #
+        fStart = time.monotonic()
         if not self.setBaudRate(iBaudRate):
             self.__error("Set Baud Rate FAILED!")
             return
+        self.__dictDetectTimes["baud_s"] = time.monotonic() - fStart
 
         #
         # Command: ATZ (Reset)
         #
         try:
-            results = self.__send(b"AT Z", delay=1)  # ...wait 1 second for ELM to initialize
+            results = self.__send(b"AT Z", self._WAIT_RESET)  # ...wait for ELM to initialize
             if len(results) > 1:
                 logger.debug("Response: " + results[1] )
 
@@ -238,7 +287,7 @@ class ELM327:
         # Command: AT E0 (Echo OFF)
         #
         results = self.__send(b"AT E0")
-        if not self.__isOK(results, expectEcho=True):
+        if not self.isOK(results, expectEcho=True):
             self.__error("AT E0 (Echo OFF) did not return 'OK'!")
             return
         logger.debug("Response: " + results[0] )
@@ -247,7 +296,7 @@ class ELM327:
         # Command: AT H1 (Headers ON)
         #
         results = self.__send(b"AT H1")
-        if not self.__isOK(results):
+        if not self.isOK(results):
             self.__error("AT H1 (Headers ON) did not return 'OK'!")
             return
         logger.debug("Response: " + results[0] )
@@ -256,7 +305,7 @@ class ELM327:
         # Command: AT L0 (Linefeeds OFF)
         #
         results = self.__send(b"AT L0")
-        if not self.__isOK(results):
+        if not self.isOK(results):
             self.__error("AT L0 (Linefeeds OFF) did not return 'OK'!")
             return
         logger.debug("Response: " + results[0] )
@@ -278,6 +327,7 @@ class ELM327:
             self.__error("AT @1 (Device Identified) did not respond!")
             return
         logger.debug("Response: " + results[0] )
+        self.__strAdapterID = AdapterCache.getAdapterID(strPortName, results[0])
 
         # Communication with the ELM at this point is successful...
         self.__strStatus = ConnectionStatus.ELM
@@ -303,7 +353,9 @@ class ELM327:
         #
         # Attempt communicate with the vehicle and load the correct protocol parser...
         #
+        fStart = time.monotonic()
         if self.setProtocol(strProtocol):
+            self.__dictDetectTimes["protocol_s"] = time.monotonic() - fStart
             self.__strStatus = ConnectionStatus.VEHICLE
             logger.info(
                 "Adapter connected: Vehicle connected, Ignition ON, PORT=%s BAUD=%s PROTOCOL=%s" %
@@ -312,6 +364,12 @@ class ELM327:
                     self.__objProtocol.ELM_ID,
                 )
             )
+            logger.info("Detection times: " + repr(self.__dictDetectTimes))
+            if self.__adapterCache is not None:
+                self.__adapterCache.store(
+                    strPortName, self.__strAdapterID, self.__objPort.baudrate, self.__objProtocol.ELM_ID,
+                    self.__dictDetectTimes
+                )
             return
 
         # Otherwise, protocol failed...
@@ -332,21 +390,49 @@ class ELM327:
                 return False
             return self.setSelectedProtocol(strProtocol)
         else:
+            # Try the last known good protocol for this adapter...
+            self.__dictDetectTimes["protocol_cached"] = False
+            if self.__adapterCache is not None:
+                strCached = self.__adapterCache.getProtocol(self.__strAdapterID)
+                if strCached in self._SUPPORTED_PROTOCOLS and self.tryProtocol(strCached):
+                    logger.info("Cached protocol %s succeeded." % strCached)
+                    self.__dictDetectTimes["protocol_cached"] = True
+                    return True
             # Auto detect the protocol...
             return self.findProtocol()
 
+    def tryProtocol(self, strProtocol:str):
+        """
+        Attempt communication with the vehicle on a single protocol without searching.
+
+        Unlike "AT TP", "AT SP" does not fall back to an automatic search when the protocol fails, so a
+        wrong protocol fails fast. On success, load the protocol parser and return True.
+        """
+
+        r = self.__send(b"AT SP" + strProtocol.encode())
+        if not self.isOK(r):
+            return False
+
+        r0100 = self.__send(b"0100", self._WAIT_SEARCH)
+        if not r0100 or self.hasErrorMessage(r0100):
+            logger.debug("Protocol " + strProtocol + " FAILED.")
+            return False
+
+        self.__objProtocol = self._SUPPORTED_PROTOCOLS[strProtocol](r0100)
+        return True
+
     def setSelectedProtocol(self, strProtocol:str):
         r = self.__send(b"AT TP" + strProtocol.encode())
-        if not self.__isOK(r):
+        if not self.isOK(r):
             self.__error("AT TP (Try Protocol) did not return 'OK'!")
             return False
 
-        r0100 = self.__send(b"0100", delay=1)
-        if self.__hasErrorMessage(r0100):
+        r0100 = self.__send(b"0100", self._WAIT_SEARCH)
+        if self.hasErrorMessage(r0100):
             logger.error("1: Protocol Query (0100) FAILED: Unable to connect!")
             # Try again...
-            r0100 = self.__send(b"0100", delay=1)
-            if self.__hasErrorMessage(r0100):
+            r0100 = self.__send(b"0100", self._WAIT_SEARCH)
+            if self.hasErrorMessage(r0100):
                 logger.error("2: Protocol Query (0100) FAILED: Unable to connect!")
                 self.__error("Set Selected Protocol FAILED! Use OBD-II->Configure to selected another or set to Auto Select.")
                 return False
@@ -366,20 +452,20 @@ class ELM327:
         #
         # Command: ELM "Auto Protocol" mode
         #
-        r = self.__send(b"AT SP0", delay=1)
-        if not self.__isOK(r):
+        r = self.__send(b"AT SP0")
+        if not self.isOK(r):
             self.__error("AT SP0 (Set Protocol Auto) did not return 'OK'!")
             return False
 
         #
         # Command: 0100 (first command, SEARCH protocols)
         #
-        r0100 = self.__send(b"0100", delay=1)
-        if self.__hasErrorMessage(r0100):
+        r0100 = self.__send(b"0100", self._WAIT_SEARCH)
+        if self.hasErrorMessage(r0100):
             logger.error("1: Protocol Query (0100) FAILED: Unable to connect!")
             # Try again...
-            r0100 = self.__send(b"0100", delay=1)
-            if self.__hasErrorMessage(r0100):
+            r0100 = self.__send(b"0100", self._WAIT_SEARCH)
+            if self.hasErrorMessage(r0100):
                 logger.error("2: Protocol Query (0100) FAILED: Unable to connect!")
                 return False
 
@@ -410,11 +496,11 @@ class ELM327:
                 logger.debug("Trying: " + strProtoNo + "...")
 
                 r = self.__send(b"AT TP" + strProtoNo.encode())
-                r0100 = self.__send(b"0100", delay=1)
-                if self.__hasErrorMessage(r0100):
+                r0100 = self.__send(b"0100", self._WAIT_SEARCH)
+                if self.hasErrorMessage(r0100):
                     # Try again...
-                    r0100 = self.__send(b"0100", delay=1)
-                    if self.__hasErrorMessage(r0100):
+                    r0100 = self.__send(b"0100", self._WAIT_SEARCH)
+                    if self.hasErrorMessage(r0100):
                         continue
 
                 # Otherwise, successfully found the protocol...
@@ -427,13 +513,24 @@ class ELM327:
         return False
 
     def setBaudRate(self, iBaud:int):
+        self.__dictDetectTimes["baud_cached"] = False
         if iBaud == 0 or iBaud == None:
             # If using pseudo terminal, skip auto baud process...
             if self.getPortName().startswith("/dev/pts"):
                 logger.debug("Pseudo terminal detected, skipping baud rate setup")
                 return True
-            else:
-                return self.findBaudRate()
+            # Try the last known good baud rate for this port...
+            if self.__adapterCache is not None:
+                iCached = self.__adapterCache.getBaudRate(self.getPortName())
+                if iCached:
+                    self.__objPort.timeout = 0.5
+                    bFound = self.__probeBaud(iCached)
+                    self.__objPort.timeout = self.__fTimeout # ...reinstate user timeout
+                    if bFound:
+                        logger.info("Cached baud %d succeeded." % iCached)
+                        self.__dictDetectTimes["baud_cached"] = True
+                        return True
+            return self.findBaudRate()
         else:
             self.__objPort.baudrate = iBaud
             return True
@@ -449,40 +546,9 @@ class ELM327:
         self.__objPort.timeout = 0.5
 
         for baud in self._TRY_BAUD_ORDER:
-            logger.debug("Testing baud %d" % baud)
-            self.__objPort.baudrate = baud
-            self.__objPort.flushInput()
-            self.__objPort.flushOutput()
-
-            # Send an "AT WS" command to get a prompt back from the scanner
-            # (an empty command runs the risk of repeating a dangerous command)
-
-            ## The first character might get eaten if the interface was busy,
-            ## so write a second one (again so that the lone CR doesn't repeat
-            ## the previous command)
-            #
-            ## All commands should be terminated with carriage return according
-            ## to ELM327 and STN11XX specifications
-            ##self.__port.write(b"\x7F\x7F\r")
-            ##self.__port.flush()
-            ##response = self.__port.read(1024)
-
-            iTest = 2
-            while iTest > 0:
-                response = self.__send(b"AT WS")
-                logger.debug( "Response on baud %d: %s" % ( baud, repr(response) ) )
-
-                # If response is the prompt character...
-                if response and len(response) > 0:
-                    if response[-1].endswith(">"):
-                        logger.debug("Selected baud %d" % baud)
-                        self.__objPort.timeout = self.__fTimeout # ...reinstate user timeout
-                        return True
-                    # Otherwise, got something, so try again...
-                    iTest -= 1
-                    continue
-                # Otherwise, no response...
-                break
+            if self.__probeBaud(baud):
+                self.__objPort.timeout = self.__fTimeout # ...reinstate user timeout
+                return True
             # ...next baud...
 
         # Otherwise, no baud found...
@@ -490,14 +556,123 @@ class ELM327:
         self.__objPort.timeout = self.__fTimeout # ...reinstate user timeout
         return False
 
-    def __isOK(self, lines, expectEcho=False):
+    def __probeBaud(self, baud:int):
+        """
+        Test a single baud rate for a prompt from the ELM32x interface.
+
+        On success, leave the port at the baud rate and return True.
+        """
+
+        logger.debug("Testing baud %d" % baud)
+        self.__objPort.baudrate = baud
+        self.__objPort.flushInput()
+        self.__objPort.flushOutput()
+
+        # Send an "AT WS" command to get a prompt back from the scanner
+        # (an empty command runs the risk of repeating a dangerous command)
+
+        ## The first character might get eaten if the interface was busy,
+        ## so write a second one (again so that the lone CR doesn't repeat
+        ## the previous command)
+        #
+        ## All commands should be terminated with carriage return according
+        ## to ELM327 and STN11XX specifications
+        ##self.__port.write(b"\x7F\x7F\r")
+        ##self.__port.flush()
+        ##response = self.__port.read(1024)
+
+        iTest = 2
+        while iTest > 0:
+            response = self.__send(b"AT WS", self._WAIT_PROBE)
+            logger.debug( "Response on baud %d: %s" % ( baud, repr(response) ) )
+
+            # If response is the prompt character...
+            if response and len(response) > 0:
+                if response[-1].endswith(">"):
+                    logger.debug("Selected baud %d" % baud)
+                    return True
+                # Otherwise, got something, so try again...
+                iTest -= 1
+                continue
+            # Otherwise, no response...
+            break
+        return False
+
+    @classmethod
+    def probe(cls, strPortName:str, listBauds:list[int] = None, fTimeout:float = 0.5):
+        """
+        Identify an ELM32x interface on a port with a lightweight "AT I" handshake.
+
+        Unlike a full initialization, the probe does not reset the interface or touch the vehicle.
+        Each baud rate is tried in order (by default, the automatic detection order). Pseudo terminals
+        and URL ports keep their rate and are only tried once.
+
+        Return a 3-tuple ( Baud Rate, Response Seconds, Identification ) or None when no interface
+        answers. The baud rate is 0 for ports that keep their rate.
+        """
+
+        if not listBauds:
+            listBauds = cls._TRY_BAUD_ORDER
+        bFixedRate = strPortName.startswith("/dev/pts") or "://" in strPortName
+        if bFixedRate:
+            listBauds = listBauds[:1]
+
+        try:
+            objPort = \
+                serial.serial_for_url(
+                    strPortName,
+                    bytesize = 8,
+                    parity = serial.PARITY_NONE,
+                    stopbits = 1,
+                    timeout = fTimeout # in seconds
+                )
+        except (serial.SerialException, OSError) as err:
+            logger.debug("Probe %s: %s" % (strPortName, str(err)))
+            return None
+
+        try:
+            for iBaud in listBauds:
+                if not bFixedRate:
+                    objPort.baudrate = iBaud
+                objPort.reset_input_buffer()
+
+                fStart = time.monotonic()
+                objPort.write(b"AT I\r")
+                objPort.flush()
+
+                # Read to the prompt or a timeout of silence...
+                baData = bytearray()
+                while True:
+                    data = objPort.read(objPort.in_waiting or 1)
+                    if not data:
+                        break
+                    baData += data
+                    if cls.ELM_PROMPT_BYTES in data:
+                        break
+                fSeconds = time.monotonic() - fStart
+
+                if cls.ELM_PROMPT_BYTES in baData:
+                    astrLines = cls.splitLines(baData)
+                    strIdent = next( (strLine for strLine in astrLines if strLine.startswith("ELM")), "" )
+                    if strIdent:
+                        logger.debug("Probe %s: %s at baud %d in %.3f s" % (strPortName, strIdent, iBaud, fSeconds))
+                        return (0 if bFixedRate else iBaud, fSeconds, strIdent)
+        except (serial.SerialException, OSError) as err:
+            logger.debug("Probe %s: %s" % (strPortName, str(err)))
+        finally:
+            objPort.close()
+
+        return None
+
+    @classmethod
+    def isOK(cls, lines, expectEcho=False):
         strOK = "OK"
         if not lines:
             return False
         if expectEcho:
             # Allow the adapter to already have echo disabled by searching all lines...
             # NOTE: No need to test for the echo.
-            if self.__hasErrorMessage(lines):
+            if cls.hasErrorMessage(lines):
                 return False
             for line in lines:
                 if line == strOK:
@@ -506,9 +681,10 @@ class ELM327:
         else: # ...no echo, just search the first line for OK...
             return len(lines) > 0 and lines[0] == strOK
 
-    def __hasErrorMessage(self, lines):
+    @classmethod
+    def hasErrorMessage(cls, lines):
         for line in lines:
-            for msg in self._ELM_BAD_MSGS:
+            for msg in cls._ELM_BAD_MSGS:
                 if msg in line:
                     return True
         return False
@@ -533,9 +709,29 @@ class ELM327:
     def getECUsValues(self):
         return self.__objProtocol.mapECU.values()
 
+    def getECUMap(self) -> dict:
+        return dict(self.__objProtocol.mapECU)
+
+    def getBaudRate(self):
+        if self.__objPort is not None:
+            return self.__objPort.baudrate
+        else:
+            return 0
+
     def getProtocolName(self):
         return self.__objProtocol.ELM_NAME
 
+    def getAdapterID(self):
+        return self.__strAdapterID
+
+    def getDetectTimes(self) -> dict:
+        """
+        Return the detection timings: baud_s and protocol_s (fractional seconds), and baud_cached and
+        protocol_cached (True when the cached value succeeded).
+        """
+
+        return dict(self.__dictDetectTimes)
+
     def getProtocolID(self):
         return self.__objProtocol.ELM_ID
 
@@ -554,7 +750,7 @@ class ELM327:
             logger.info("Unconnected: Cannot enter Low Power mode")
             return None
 
-        r = self.__send(b"AT LP", delay=1)
+        r = self.__send(b"AT LP")
 
         if 'OK' in r:
             logger.debug("Low Power mode succeeded")
@@ -593,6 +789,8 @@ class ELM327:
         Close by resetting the interface and setting all attributes to an unconnected state.
         """
 
+        self.stopMonitor()
+
         self.__strStatus = ConnectionStatus.NONE
         self.__objProtocol = None
 
@@ -603,24 +801,187 @@ class ELM327:
             self.__objPort.close()
             self.__objPort = None
 
-    def send_and_parse(self, cmd):
+    def startMonitor(self, monitor:BusMonitor) -> bool:
+        """
+        Start the adapter's monitor mode: every frame seen on the bus is put into the monitor.
+
+        Monitoring uses "STMA" on STN adapters and "AT MA" otherwise. Only the CAN protocols are
+        supported. The frames are read and parsed by a reader thread, a batch per port read. When the
+        adapter reports "BUFFER FULL" (the host read too slowly), it stops monitoring and is restarted.
+
+        While monitoring, the adapter cannot be queried (send_and_parse() returns no messages) until
+        stopMonitor(), or until the adapter ends monitoring by itself or the port fails.
+
+        Return True when monitoring started.
+        """
+
+        if self.__strStatus != ConnectionStatus.VEHICLE or self.__objPort is None:
+            logger.info("Unconnected: Cannot monitor!")
+            return False
+        if not isinstance(self.__objProtocol, CANProtocol):
+            logger.warning("Monitor: Only the CAN protocols can be monitored!")
+            return False
+        if self.isMonitoring():
+            logger.warning("Monitor: Already monitoring!")
+            return False
+
+        # Check if we are in Low Power mode...
+        if self.__bLowPower == True:
+            self.setToNormalPower()
+
+        # STN adapters answer "STI" with their firmware ID, ELMs with "?"...
+        if self.__bsMonitorCmd is None:
+            results = self.__send(b"STI")
+            self.__bsMonitorCmd = b"STMA" if results and results[0].startswith("STN") else b"AT MA"
+
+        self.__eventMonitorStop.clear()
+        monitor.start()
+        self.__write(self.__bsMonitorCmd)
+        self.__threadMonitor = threading.Thread(
+            target=self.__runMonitor, args=(monitor,), name="ELM327 Monitor " + self.getPortName(), daemon=True
+        )
+        self.__threadMonitor.start()
+        logger.info("Monitor: Started with " + self.__bsMonitorCmd.decode())
+        return True
+
+    def stopMonitor(self):
+        """
+        Stop the adapter's monitor mode (any character stops it) and wait for the reader thread.
+        """
+
+        if self.__threadMonitor is None:
+            return
+
+        # Only a running monitor needs the stop character (the adapter may have ended it)...
+        if self.__threadMonitor.is_alive():
+            self.__eventMonitorStop.set()
+            try:
+                self.__objPort.write(b" ")
+                self.__objPort.flush()
+            except Exception:
+                pass
+        self.__threadMonitor.join()
+        self.__threadMonitor = None
+        logger.info("Monitor: Stopped")
+
+    def isMonitoring(self) -> bool:
+        # NOTE: The reader thread also ends by itself when the adapter ends monitoring or the port fails
+        return self.__threadMonitor is not None and self.__threadMonitor.is_alive()
+
+    def __runMonitor(self, monitor:BusMonitor):
+        """
+        The monitor mode reader thread.
+
+        Read everything waiting on the port, parse the complete lines as one batch and put the frames
+        into the monitor, until the prompt ends monitoring.
+        """
+
+        protocol = self.__objProtocol
+        objPort = self.__objPort
+        eventStop = self.__eventMonitorStop
+        fDeadline = None  # ...after a stop, the most seconds to wait for the prompt
+        bBufferFull = False
+        bsPending = b""
+        try:
+            while True:
+                try:
+                    data = objPort.read(objPort.in_waiting or 1)
+                except Exception:
+                    logger.critical("Monitor: Device disconnected while reading!")
+                    return
+
+                if eventStop.is_set() and fDeadline is None:
+                    fDeadline = time.monotonic() + self._WAIT_NORMAL
+                if not data:
+                    if fDeadline is not None and time.monotonic() > fDeadline:
+                        logger.warning("Monitor: No prompt after stop!")
+                        return
+                    continue
+
+                # Parse the complete lines...
+                bsPending += data
+                iCR = bsPending.rfind(b"\r")
+                if iCR != -1:
+                    listLines = bsPending[:iCR].replace(b"\x00", b"").decode("ascii", "ignore").split("\r")
+                    bsPending = bsPending[iCR + 1:]
+                else:
+                    listLines = []
+
+                frames, linesOther = protocol.parseMonitorLines(listLines)
+                if frames:
+                    monitor.put(frames)
+                for strLine in linesOther:
+                    strLine = strLine.strip()
+                    if not strLine or strLine == "STOPPED":
+                        continue
+                    if strLine == "BUFFER FULL":
+                        monitor.iBufferFull += 1
+                        bBufferFull = True
+                    elif self.hasErrorMessage([strLine]):
+                        monitor.iErrors += 1
+                    else:
+                        monitor.iInvalid += 1
+
+                # The prompt ends monitoring...
+                if self.ELM_PROMPT_BYTES in bsPending:
+                    if eventStop.is_set():
+                        return
+                    if not bBufferFull:
+                        logger.warning("Monitor: The adapter ended monitoring!")
+                        return
+                    logger.debug("Monitor: BUFFER FULL, restarting...")
+                    bBufferFull = False
+                    bsPending = b""
+                    self.__write(self.__bsMonitorCmd)
+        finally:
+            monitor.stop()
+
+    def send_and_parse(self, cmd, funcMessage = None):
         """
         Sends the given command string and parses the response lines with the protocol object.
 
         An empty command string will re-trigger the previous command.
 
+        With a message function, each data message is also passed to it as soon as it is complete.
+        On the CAN protocols, the lines are reassembled (ISO-TP) while the adapter is still sending,
+        so the first messages of a long response can be handled before the prompt arrives. On other
+        protocols, the messages are passed after the whole response is parsed.
+
         Return a list of Message objects.
         """
 
         if self.__strStatus == ConnectionStatus.NONE:
             logger.info("Unconnected: Cannot send and parse!")
             return None
+        if self.isMonitoring():
+            logger.warning("Monitoring: Cannot send and parse!")
+            return []
 
         # Check if we are in Low Power mode...
         if self.__bLowPower == True:
             self.setToNormalPower()
 
-        astrLines = self.__send(cmd)
+        # For streaming, feed each complete line to the protocol's reassembler as it arrives...
+        funcLine = None
+        if funcMessage is not None and hasattr(self.__objProtocol, "feedLine"):
+            protocol = self.__objProtocol
+            reassembler = ISOTPReassembler()
+
+            def funcLine(bsLine):
+                message = protocol.feedLine( reassembler, bsLine.replace(b"\x00", b"").strip().decode("ascii", "ignore") )
+                if message is not None:
+                    funcMessage(message)
+
+        timer = self.timer
+        if timer is None and funcLine is None:
+            astrLines = self.__send(cmd)
+        else:
+            self.__write(cmd)
+            if timer is not None:
+                timer.mark("write")
+            astrLines = self.__read(self._WAIT_NORMAL, timer, funcLine)
+            if timer is not None:
+                timer.mark("read")
 
         #
         # Clean up the last line...
@@ -629,38 +990,33 @@ class ELM327:
         if len(astrLines) > 0 and astrLines[-1].endswith( self.ELM_PROMPT ):
             astrLines[-1] = astrLines[-1][:-1]
         # If the last line is now empty, remove it...
-        if len(astrLines[-1]) == 0:
+        if len(astrLines) > 0 and len(astrLines[-1]) == 0:
             astrLines = astrLines[:-1]
 
         messages = self.__objProtocol(astrLines)
+        if timer is not None:
+            timer.mark("parse")
+
+        # Without streaming, pass the data messages now...
+        if funcMessage is not None and funcLine is None:
+            for message in messages:
+                if message.isParsed():
+                    funcMessage(message)
+
         return messages
 
-    def __send(self, cmd, delay = None):
+    def __send(self, cmd, fWait = _WAIT_NORMAL):
         """
         An unprotected send function
 
         This will send a command string without any protection and get its result.
 
-        Return the result, a list of message strings, after an optional
-        delay and end marker (by default, the prompt) is seen.
+        Return the result, a list of message strings, as soon as the end marker (by default, the prompt)
+        is seen or the adapter stays silent past the wait limit.
         """
 
         self.__write(cmd)
-
-        delayed = 0.0
-        if delay is not None:
-            logger.debug("Wait: %d seconds" % delay)
-            time.sleep(delay)
-            delayed += delay
-
-        astrLines = self.__read()
-        while delayed < 1.0 and len(astrLines) <= 0:
-            d = 0.1
-            logger.debug("No response...wait: %f seconds" % d)
-            time.sleep(d)
-            delayed += 1.0 # d
-            astrLines = self.__read()
-        return astrLines
+        return self.__read(fWait)
 
     def __write(self, cmd):
         """
@@ -685,11 +1041,14 @@ class ELM327:
         else:
             logger.info("Unconnected: Cannot write!")
 
-    def __read(self):
+    def __read(self, fWait = None, timer:QueryTimer = None, funcLine = None):
         """
         A "low-level" read function.
 
-        Accumulate characters until the end marker (by default, the prompt) is seen.
+        Accumulate characters until the end marker (by default, the prompt) is seen. On silence, keep
+        waiting until the (fractional) seconds wait limit passes. With no wait limit, a single port
+        timeout of silence ends the read. With a timer, the wait for the first data is marked. With a
+        line function, each complete line (bytes) is passed to it as it arrives.
 
         Return a list of response strings.
         """
@@ -698,7 +1057,10 @@ class ELM327:
             logger.info("Unconnected: Cannot read!")
             return []
 
-        baBuffer = bytearray()
+        fDeadline = None if fWait is None else time.monotonic() + fWait
+        baBuffer = self.__baReadBuffer
+        iLen = 0
+        iLine = 0  # ...start of the next (incomplete) line for the line function
 
         #
         # Read all the ELM's response data...
@@ -712,6 +1074,9 @@ class ELM327:
         #       errors) will always be signalled by a single question mark. These include incomplete messages,
         #       incorrect AT commands, or invalid hexadecimal digit strings, but are not an indication of
         #       whether or not the message was understood by the vehicle.
+        #
+        # NOTE: The pyserial read_until() reads a single byte per call, so instead block for the first
+        #       byte (or the timeout) and then drain everything already waiting in one read.
         while True:
             # Retrieve as much data as possible...
             try:
@@ -725,51 +1090,68 @@ class ELM327:
 
             # If nothing was received...
             if not data:
-                if len(baBuffer) == 0:
+                # Keep waiting on silence until the deadline...
+                if fDeadline is not None and time.monotonic() < fDeadline:
+                    continue
+                if iLen == 0:
                     logger.warning("Port Read: End - No Data!")
                 else:
                     logger.info("Port Read: End - Data received.")
                 break
 
-            baBuffer.extend(data)
-            logger.info( "Port Read: Found bytes: " + str( len(baBuffer) ) )
-
-            # End on the specified End Marker sequence...
-            if self.ELM_PROMPT.encode() in baBuffer:
+            if timer is not None and iLen == 0:
+                timer.mark("wait")
+
+            # Copy into the reusable buffer, growing it when needed...
+            iEnd = iLen + len(data)
+            if iEnd > len(baBuffer):
+                baBuffer.extend( bytes( max( iEnd - len(baBuffer), len(baBuffer) ) ) )
+            baBuffer[iLen:iEnd] = data
+
+            # End on the specified End Marker sequence (only search the new data)...
+            iFound = baBuffer.find(self.ELM_PROMPT_BYTES, iLen, iEnd)
+            iLen = iEnd
+
+            # Pass on the completed lines...
+            if funcLine is not None:
+                iCR = baBuffer.find(b"\r", iLine, iEnd)
+                while iCR != -1:
+                    if iCR > iLine:
+                        funcLine( bytes(baBuffer[iLine:iCR]) )
+                    iLine = iCR + 1
+                    iCR = baBuffer.find(b"\r", iLine, iEnd)
+
+            if iFound != -1:
                 break
 
         # Check buffer...
-        if len(baBuffer) == 0:
+        if iLen == 0:
             return []
 
-        # Log...
-        strLogC = ""
-        strLogV = ""
-        for iIndex in range( len(baBuffer) ):
-            ch = baBuffer[iIndex]
-            strLogC += ( chr(ch) if (ch > 31 and ch != 127) else '_' )
-            strLogV += hex(ch)[2:].upper().zfill(2) + ' '
-        logger.debug("Buffer: " + strLogC)
-        logger.debug("   Hex: " + strLogV)
+        return self.splitLines(baBuffer[:iLen])
 
-        # Remove nulls...
-        baBuffer = re.sub(b"\x00", b"", baBuffer)
+    @classmethod
+    def splitLines(cls, bsData):
+        """
+        Split raw response data into response strings.
 
-        # Convert the bytearray into a string...
-        strBuffer = baBuffer.decode("ascii", "ignore")
+        Return a list of response strings.
+        """
+
+        # Log...
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Buffer: " + bsData.translate(cls._LOG_PRINTABLE).decode("ascii"))
+            logger.debug("   Hex: " + bsData.hex(" ").upper())
 
-        # Split the string into lines--remove blank lines, end marker line, and trailing spaces...
-        astrLines = [ strLine.strip() for strLine in re.split("[\r\n]", strBuffer) if bool(strLine)]
+        # Remove nulls and split into lines--remove blank lines, end marker line, and trailing spaces...
+        astrLines = [
+            strLine for strLine in
+                ( bsLine.strip().decode("ascii", "ignore") for bsLine in bsData.replace(b"\x00", b"").splitlines() )
+            if strLine
+        ]
 
         # Log...
-        strLogC = ""
-        strLogV = ""
-        for iIndex in range( len(astrLines) ):
-            for iChar in range ( len( astrLines[iIndex] ) ):
-                ch = ord( astrLines[iIndex][iChar] )
-                strLogC += ( chr(ch) if (ch > 31 and ch != 127) else '_' )
-                strLogV += hex(ch)[2:].upper().zfill(2) + ' '
-        logger.debug(" After: " + strLogC)
-        logger.debug("   Hex: " + strLogV)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(" After: " + repr(astrLines))
 
         return astrLines
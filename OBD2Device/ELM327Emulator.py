@@ -0,0 +1,846 @@
+############################################################################
+#
+# Python Onboard Diagnostics II Advanced
+#
+# ELM327Emulator.py
+#
+# Copyright 2021-2023 Keven L. Ates (atescomp@gmail.com)
+#
+# This file is part of the Onboard Diagnostics II Advanced (pyOBDA) system.
+#
+# pyOBDA is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# pyOBDA is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyOBDA; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+############################################################################
+
+import os
+import time
+import socket
+import threading
+import logging
+
+from .Utility import Utility
+
+logger = logging.getLogger(__name__)
+
+
+class ELM327Emulator:
+    """
+    A software ELM327 adapter connected to a scripted vehicle for testing and benchmarking without a car.
+
+    The emulator attaches to:
+        a pseudo terminal (POSIX): startPTY() returns a "/dev/pts/N" port name, or
+        a TCP socket: startSocket() returns a "socket://host:port" URL.
+    Both port names work with ELM327, the connectors, and serial.serial_for_url().
+
+    The emulator implements the AT commands used by ELM327 (Z, WS, I, @1, @2, E, L, H, S, RV, SP, TP,
+    DP, DPN, SH, ST, AT, CAF, D, LP, MA and the STN "STMA") and answers Modes 01, 02, 03, 04, 06, 07 and
+    09 from a vehicle model. Responses are framed for the vehicle's protocol:
+        CAN 11 bit ("6", "8") and 29 bit ("7", "9") with ISO 15765-4 single, first and consecutive
+        frames (the sequence number wraps from F to 0), and
+        legacy J1850 / ISO 9141 / ISO 14230 ("1" to "5") with a 3 byte header and a checksum byte.
+    Headers on and off ("AT H1" / "AT H0"), echo, linefeeds and spaces are honored.
+
+    The vehicle model is a dict (see VEHICLE_DEFAULT) or a JSON file (see loadVehicle()). Each ECU
+    lists its Mode 01 PIDs, freeze frame PIDs, stored and pending DTCs, Mode 06 monitor tests and
+    Mode 09 info. A PID value is a hex string or a function of the elapsed seconds returning bytes.
+    The "supported PIDs" bitmaps (0100, 0120, ..., 0200, 0600, 0900) are built from the model.
+
+    Monitor mode ("AT MA" or "STMA", CAN only) streams the vehicle's broadcast frames until any character
+    is received, then prints "STOPPED" and the prompt. The frames are sent as fast as the transport takes
+    them or at iMonitorRate frames per second. With iMonitorLimit, the adapter reports "BUFFER FULL" and
+    stops after that many frames (as a real adapter does when the host reads too slowly).
+
+    Latency is added to each OBD response: fLatency seconds by default, or a per-request latency
+    from dictLatency (keyed by the request hex, for example "010C"). The first request after an
+    automatic protocol selection also waits fSearchDelay seconds.
+
+    Use:
+        emulator = ELM327Emulator(fLatency=0.01)
+        strPort = emulator.startPTY()
+        connector = OBD2Connector(strPort)
+        ...
+        emulator.stop()
+    """
+
+    VERSION = "ELM327 v1.5"
+    DESCRIPTION = "OBDII to RS232 Interpreter"
+
+    PROTOCOL_NAMES = {
+        "1" : "SAE J1850 PWM",
+        "2" : "SAE J1850 VPW",
+        "3" : "ISO 9141-2",
+        "4" : "ISO 14230-4 (KWP 5BAUD)",
+        "5" : "ISO 14230-4 (KWP FAST)",
+        "6" : "ISO 15765-4 (CAN 11/500)",
+        "7" : "ISO 15765-4 (CAN 29/500)",
+        "8" : "ISO 15765-4 (CAN 11/250)",
+        "9" : "ISO 15765-4 (CAN 29/250)",
+    }
+    CAN_11BIT_IDS = ["6", "8"]
+    CAN_29BIT_IDS = ["7", "9"]
+
+    #
+    # Default Vehicle Model
+    #
+    # A gasoline car on CAN 11/500 with an engine and a transmission ECU.
+    #
+    #   ecus: address  - legacy and 29 bit CAN source address (engine 0x10, transmission 0x18)
+    #         canid    - 11 bit CAN response ID (engine 0x7E8, transmission 0x7E9)
+    #         pids     - Mode 01 PID: value (hex string or function(fElapsed) -> bytes)
+    #         freeze   - Mode 02 (frame 0) PID: value
+    #         dtcs     - stored DTCs (Mode 03) as 4 digit hex, for example "0133" = P0133
+    #         pending  - pending DTCs (Mode 07)
+    #         monitors - Mode 06 MID: list of tests [TID, UAS ID, value, min, max]
+    #         info     - Mode 09 PID: value (the VIN, 0x02, is added from the vehicle's "vin")
+    #   broadcast: CAN ID: data (hex string or function(fElapsed) -> bytes) of the frames seen in monitor
+    #              mode. IDs up to 0x7FF are sent on the 11 bit protocols, larger IDs on the 29 bit ones.
+    #
+    VEHICLE_DEFAULT = {
+        "vin"      : "1G1JC5444R7252367",
+        "protocol" : "6",
+        "voltage"  : "12.6V",
+        "ignition" : True,
+        "ecus"     : [
+            {
+                "address"  : 0x10,
+                "canid"    : 0x7E8,
+                "pids"     : {
+                    0x01 : "00076500",    # ...monitor status
+                    0x03 : "0200",        # ...fuel system status
+                    0x04 : "80",          # ...engine load
+                    0x05 : "7B",          # ...coolant temperature
+                    0x06 : "80",          # ...short term fuel trim bank 1
+                    0x07 : "82",          # ...long term fuel trim bank 1
+                    0x0B : "21",          # ...intake manifold pressure
+                    0x0C : "1AF8",        # ...RPM
+                    0x0D : "3C",          # ...speed
+                    0x0E : "8C",          # ...timing advance
+                    0x0F : "46",          # ...intake air temperature
+                    0x10 : "0271",        # ...MAF
+                    0x11 : "40",          # ...throttle position
+                    0x1C : "01",          # ...OBD compliance
+                    0x1F : "0465",        # ...run time
+                    0x21 : "0000",        # ...distance with MIL on
+                    0x2F : "A0",          # ...fuel level
+                    0x33 : "65",          # ...barometric pressure
+                    0x42 : "3A98",        # ...control module voltage
+                    0x46 : "48",          # ...ambient air temperature
+                    0x51 : "01",          # ...fuel type
+                },
+                "freeze"   : {
+                    0x02 : "0133",
+                    0x04 : "99",
+                    0x05 : "7B",
+                    0x0C : "1C20",
+                    0x0D : "42",
+                },
+                "dtcs"     : [ "0133", "0420" ],
+                "pending"  : [ "0300" ],
+                "monitors" : {
+                    0x01 : [ [ 0x80, 0x0A, 0x0BB8, 0x0000, 0xFFFF ] ],
+                    0x21 : [ [ 0x80, 0x01, 0x0012, 0x0000, 0x0040 ] ],
+                },
+                "info"     : {
+                    0x04 : "0131323334353637383941424344454647",  # ...1 calibration ID
+                },
+            },
+            {
+                "address"  : 0x18,
+                "canid"    : 0x7E9,
+                "pids"     : {
+                    0x01 : "00040000",
+                    0x05 : "50",
+                },
+            },
+        ],
+        "broadcast" : {
+            0x0C9      : "801AF80000000000",  # ...engine: RPM, torque
+            0x0F1      : "0000400000000000",  # ...brake
+            0x1E9      : "0000000000000000",  # ...wheel speeds
+            0x3E9      : "003C003C003C003C",  # ...vehicle speed
+            0x4C1      : "7B46000000000000",  # ...engine temperatures
+            0x0CF00400 : "F07D7DF81A00FF7D",  # ...J1939 EEC1: engine speed
+            0x18FEEE00 : "7BFFFFFFFFFFFFFF",  # ...J1939 ET1: engine temperature
+            0x18FEF100 : "FF003CFFFFFFFFFF",  # ...J1939 CCVS: vehicle speed
+        },
+    }
+
+    def __init__(self, dictVehicle:dict = None, fLatency:float = 0.0, dictLatency:dict = None,
+                 fSearchDelay:float = 0.0, strIdentifier:str = None, iMonitorRate:int = 0, iMonitorLimit:int = 0):
+        self.dictVehicle = dictVehicle if dictVehicle is not None else self.VEHICLE_DEFAULT
+        self.fLatency = fLatency
+        self.dictLatency = dictLatency if dictLatency is not None else {}
+        self.fSearchDelay = fSearchDelay
+        self.strIdentifier = strIdentifier  # ..."AT @2" result, None = not set ("?")
+        self.iMonitorRate = iMonitorRate    # ...monitor frames per second, 0 = as fast as possible
+        self.iMonitorLimit = iMonitorLimit  # ...monitor frames before "BUFFER FULL", 0 = no limit
+        self.fStart = time.monotonic()
+        self.iRequests = 0
+
+        # Build the per ECU tables (the model itself is not changed)...
+        self.__listECUs : list[dict] = []
+        for dictECU in self.dictVehicle.get("ecus", []):
+            dictInfo = dict( dictECU.get("info", {}) )
+            if not self.__listECUs and "vin" in self.dictVehicle:
+                dictInfo[0x02] = b"\x01" + self.dictVehicle["vin"].encode("ascii")
+                dictInfo.setdefault(0x01, b"\x01")
+            self.__listECUs.append({
+                "address"  : dictECU.get("address", 0x10),
+                "canid"    : dictECU.get("canid", 0x7E8),
+                "pids"     : dict( dictECU.get("pids", {}) ),
+                "freeze"   : dict( dictECU.get("freeze", {}) ),
+                "dtcs"     : list( dictECU.get("dtcs", []) ),
+                "pending"  : list( dictECU.get("pending", []) ),
+                "monitors" : dict( dictECU.get("monitors", {}) ),
+                "info"     : dictInfo,
+            })
+
+        self.__dictBroadcast = dict( self.dictVehicle.get("broadcast", {}) )
+
+        self.__lockState = threading.Lock()
+        self.__bRunning = False
+        self.__listThreads : list[threading.Thread] = []
+        self.__iMasterFD = None
+        self.__iSlaveFD = None
+        self.__sockServer = None
+        self.reset()
+
+    @classmethod
+    def loadVehicle(cls, strFile:str) -> dict:
+        """
+        Load a vehicle model from a JSON file.
+
+        The file has the same layout as VEHICLE_DEFAULT. PIDs, MIDs, info and broadcast keys are hex
+        strings (for example, "0C"). Addresses and CAN IDs can be numbers or hex strings.
+        """
+
+        dictJSON = Utility.readJSON(strFile)
+
+        def toInt(value):
+            return int(value, 16) if isinstance(value, str) else value
+
+        for dictECU in dictJSON.get("ecus", []):
+            for strKey in ["address", "canid"]:
+                if strKey in dictECU:
+                    dictECU[strKey] = toInt(dictECU[strKey])
+            for strTable in ["pids", "freeze", "monitors", "info"]:
+                if strTable in dictECU:
+                    dictECU[strTable] = { toInt(key) : value for key, value in dictECU[strTable].items() }
+        if "broadcast" in dictJSON:
+            dictJSON["broadcast"] = { toInt(key) : value for key, value in dictJSON["broadcast"].items() }
+        return dictJSON
+
+    #
+    # Adapter State
+    #
+
+    def reset(self):
+        """
+        Reset the adapter settings to the power on defaults.
+        """
+
+        self.bEcho = True
+        self.bLinefeeds = False
+        self.bHeaders = False
+        self.bSpaces = True
+        self.strProtocol = "0"     # ...selected protocol ("0" = automatic)
+        self.bAuto = True          # ...automatic search allowed (SP 0, SP Ah, TP)
+        self.strActive = None      # ...protocol found by the last search
+        self.strHeader = None      # ..."AT SH" header or None for the default (functional)
+        self.bsLastLine = b""
+        self.bMonitor = False      # ...monitor mode requested ("AT MA", "STMA")
+
+    def isCAN(self) -> bool:
+        return self.dictVehicle.get("protocol", "6") in self.CAN_11BIT_IDS + self.CAN_29BIT_IDS
+
+    #
+    # Command Processing
+    #
+
+    def handle(self, bsLine:bytes) -> bytes:
+        """
+        Process a single command line (without the carriage return).
+
+        Return the complete output, including the echo and the prompt.
+        """
+
+        with self.__lockState:
+            # An empty line repeats the last command...
+            bsCmd = bsLine.strip()
+            if bsCmd == b"":
+                bsCmd = self.bsLastLine
+            else:
+                self.bsLastLine = bsCmd
+
+            strCmd = bsCmd.decode("ascii", "ignore").replace(" ", "").upper()
+            strEcho = (bsLine.decode("ascii", "ignore") + "\r") if self.bEcho else ""
+
+            if strCmd.startswith("AT"):
+                listLines = self.__handleAT(strCmd[2:])
+            elif strCmd == "STMA":
+                listLines = self.__handleAT("MA")
+            elif strCmd and Utility.isHex(strCmd):
+                listLines = self.__handleOBD(strCmd)
+            else:
+                listLines = ["?"]
+
+        # Monitor mode streams its frames from the transport (see __monitor)...
+        if self.bMonitor:
+            return strEcho.encode("ascii")
+
+        strEOL = "\r\n" if self.bLinefeeds else "\r"
+        strOut = strEcho + strEOL.join(listLines) + strEOL + strEOL + ">"
+        return strOut.encode("ascii")
+
+    def __handleAT(self, strAT:str) -> list[str]:
+        if strAT in ("Z", "WS"):
+            self.reset()
+            return ["", "", self.VERSION]
+        if strAT == "I":
+            return [self.VERSION]
+        if strAT == "@1":
+            return [self.DESCRIPTION]
+        if strAT == "@2":
+            return [self.strIdentifier if self.strIdentifier else "?"]
+        if strAT == "RV":
+            return [ self.dictVehicle.get("voltage", "12.6V") ]
+        if strAT == "D":
+            self.bHeaders = False
+            self.bSpaces = True
+            self.bLinefeeds = False
+            self.strHeader = None
+            return ["OK"]
+
+        # On / Off settings...
+        dictFlags = { "E" : "bEcho", "L" : "bLinefeeds", "H" : "bHeaders", "S" : "bSpaces" }
+        if len(strAT) == 2 and strAT[0] in dictFlags and strAT[1] in "01":
+            setattr(self, dictFlags[ strAT[0] ], strAT[1] == "1")
+            return ["OK"]
+
+        # Protocols...
+        if strAT.startswith("SP") or strAT.startswith("TP"):
+            strArg = strAT[2:]
+            bAuto = strAT.startswith("TP")
+            if strArg.startswith("A"):
+                bAuto = True
+                strArg = strArg[1:]
+            if strArg == "0":
+                bAuto = True
+            elif strArg not in self.PROTOCOL_NAMES:
+                return ["?"]
+            self.strProtocol = strArg
+            self.bAuto = bAuto
+            self.strActive = None
+            return ["OK"]
+        if strAT == "DPN":
+            strProto = self.strActive if self.strActive else self.strProtocol
+            return [ ("A" if self.bAuto else "") + strProto ]
+        if strAT == "DP":
+            strProto = self.strActive if self.strActive else self.strProtocol
+            strName = self.PROTOCOL_NAMES.get(strProto, "AUTO")
+            return [ ("AUTO, " if self.bAuto and strProto != "0" else "") + strName ]
+
+        # Monitor all...
+        if strAT == "MA":
+            bConnected, _ = self.__connect()
+            if not bConnected or not self.isCAN() or self.strActive != self.dictVehicle.get("protocol", "6"):
+                return ["?"]
+            self.bMonitor = True
+            return []
+
+        # Headers...
+        if strAT.startswith("SH") and Utility.isHex(strAT[2:]) and len(strAT[2:]) in (3, 6, 8):
+            self.strHeader = strAT[2:]
+            return ["OK"]
+
+        # Accepted without effect...
+        for strPrefix in ["ST", "AT", "CAF", "LP", "M0", "M1", "PC", "R0", "R1", "AL", "NL"]:
+            if strAT.startswith(strPrefix):
+                return ["OK"]
+
+        return ["?"]
+
+    def __connect(self) -> tuple[bool, list[str]]:
+        """
+        Connect to the vehicle, searching when in automatic mode.
+
+        Return a 2-tuple ( Connected, Search Output Lines ).
+        """
+
+        if self.strActive is not None:
+            return (True, [])
+        if not self.dictVehicle.get("ignition", True):
+            return (False, ["SEARCHING..."] if self.bAuto else [])
+
+        strVehicle = self.dictVehicle.get("protocol", "6")
+        if self.strProtocol == strVehicle:
+            self.strActive = strVehicle
+            return (True, [])
+        if self.bAuto:
+            if self.fSearchDelay:
+                time.sleep(self.fSearchDelay)
+            self.strActive = strVehicle
+            return (True, ["SEARCHING..."])
+        return (False, [])
+
+    def __handleOBD(self, strCmd:str) -> list[str]:
+        # Drop the optional response count digit ("010C1")...
+        strRequest = strCmd[:-1] if len(strCmd) & 1 else strCmd
+        baRequest = bytes.fromhex(strRequest)
+
+        bConnected, listLines = self.__connect()
+        if not bConnected:
+            return listLines + ["UNABLE TO CONNECT"]
+
+        self.iRequests += 1
+        fLatency = self.dictLatency.get(strRequest, self.fLatency)
+        if fLatency:
+            time.sleep(fLatency)
+
+        fElapsed = time.monotonic() - self.fStart
+        bAnswered = False
+        for dictECU in self.__listECUs:
+            if not self.__isAddressed(dictECU):
+                continue
+            listPayloads = self.__respond(dictECU, baRequest, fElapsed)
+            for baPayload in listPayloads:
+                listLines += self.__frame(dictECU, baPayload)
+                bAnswered = True
+
+        if not bAnswered:
+            listLines.append("NO DATA")
+        return listLines
+
+    def __isAddressed(self, dictECU:dict) -> bool:
+        # Functional (default) headers reach every ECU. Physical headers reach a single ECU...
+        if self.strHeader is None:
+            return True
+        strActive = self.strActive
+        if strActive in self.CAN_11BIT_IDS:
+            iHeader = int(self.strHeader, 16)
+            return iHeader == 0x7DF or iHeader + 8 == dictECU["canid"]
+        if strActive in self.CAN_29BIT_IDS and len(self.strHeader) == 8:
+            iTarget = int(self.strHeader[4:6], 16)
+            return iTarget == 0x33 or iTarget == dictECU["address"]
+        return True
+
+    #
+    # ECU Responses
+    #
+
+    @classmethod
+    def __value(cls, value, fElapsed:float) -> bytes:
+        if callable(value):
+            return bytes( value(fElapsed) )
+        if isinstance(value, str):
+            return bytes.fromhex(value)
+        return bytes(value)
+
+    @classmethod
+    def __bitmap(cls, iBase:int, listKeys) -> bytes:
+        # Bits for base+1 to base+0x20 (MSB first), the last bit flags the next range...
+        iBits = 0
+        for iKey in listKeys:
+            if iBase < iKey <= iBase + 0x20:
+                iBits |= 1 << (0x20 - (iKey - iBase))
+        if any( iKey > iBase + 0x20 for iKey in listKeys ):
+            iBits |= 1
+        return iBits.to_bytes(4, "big")
+
+    @classmethod
+    def __isListing(cls, iBase:int, listKeys) -> bool:
+        # A "supported" listing is answered for 0x00 and for ranges flagged by the previous listing...
+        return iBase == 0 or any( iKey > iBase for iKey in listKeys )
+
+    def __respond(self, dictECU:dict, baRequest:bytes, fElapsed:float) -> list[bytes]:
+        """
+        Return the ECU's response payloads (Mode + data, without framing) for a request.
+        """
+
+        iMode = baRequest[0]
+        baArgs = baRequest[1:]
+
+        # Mode 01: Current data (CAN allows up to 6 PIDs per request)...
+        if iMode == 0x01:
+            dictPIDs = dictECU["pids"]
+            if not baArgs or (len(baArgs) > 1 and not self.isCAN()):
+                return []
+            baResponse = bytearray([0x41])
+            for iPID in baArgs[:6]:
+                if iPID % 0x20 == 0:
+                    if not self.__isListing(iPID, dictPIDs):
+                        continue
+                    baResponse += bytes([iPID]) + self.__bitmap(iPID, dictPIDs)
+                elif iPID in dictPIDs:
+                    baResponse += bytes([iPID]) + self.__value(dictPIDs[iPID], fElapsed)
+            return [ bytes(baResponse) ] if len(baResponse) > 1 else []
+
+        # Mode 02: Freeze frame data (frame 0 only)...
+        if iMode == 0x02:
+            dictFreeze = dictECU["freeze"]
+            if not baArgs or not dictFreeze:
+                return []
+            iPID = baArgs[0]
+            iFrame = baArgs[1] if len(baArgs) > 1 else 0
+            if iFrame != 0:
+                return []
+            if iPID % 0x20 == 0:
+                if not self.__isListing(iPID, dictFreeze):
+                    return []
+                return [ bytes([0x42, iPID, iFrame]) + self.__bitmap(iPID, dictFreeze) ]
+            if iPID in dictFreeze:
+                return [ bytes([0x42, iPID, iFrame]) + self.__value(dictFreeze[iPID], fElapsed) ]
+            return []
+
+        # Mode 03 / 07: Stored / pending DTCs...
+        if iMode == 0x03 or iMode == 0x07:
+            listDTCs = dictECU["dtcs" if iMode == 0x03 else "pending"]
+            baDTCs = b"".join( [ bytes.fromhex(strDTC) for strDTC in listDTCs ] )
+            if self.isCAN():
+                return [ bytes([iMode + 0x40, len(listDTCs)]) + baDTCs ]
+            # Legacy: 3 DTCs per frame with no count byte...
+            if not baDTCs:
+                return [ bytes([iMode + 0x40]) + bytes(6) ]
+            return [
+                bytes([iMode + 0x40]) + baDTCs[iIndex:iIndex + 6].ljust(6, b"\x00")
+                for iIndex in range(0, len(baDTCs), 6)
+            ]
+
+        # Mode 04: Clear DTCs and freeze frame data...
+        if iMode == 0x04:
+            dictECU["dtcs"] = []
+            dictECU["pending"] = []
+            dictECU["freeze"] = {}
+            return [ bytes([0x44]) ]
+
+        # Mode 06: On-board monitoring test results (CAN only)...
+        if iMode == 0x06:
+            dictMonitors = dictECU["monitors"]
+            if not baArgs or not self.isCAN() or not dictMonitors:
+                return []
+            iMID = baArgs[0]
+            if iMID % 0x20 == 0:
+                if not self.__isListing(iMID, dictMonitors):
+                    return []
+                return [ bytes([0x46, iMID]) + self.__bitmap(iMID, dictMonitors) ]
+            if iMID not in dictMonitors:
+                return []
+            baResponse = bytearray([0x46, iMID])
+            for iTID, iUAS, iValue, iMin, iMax in dictMonitors[iMID]:
+                baResponse += bytes([iTID, iUAS])
+                baResponse += iValue.to_bytes(2, "big") + iMin.to_bytes(2, "big") + iMax.to_bytes(2, "big")
+            return [ bytes(baResponse) ]
+
+        # Mode 09: Vehicle information...
+        if iMode == 0x09:
+            dictInfo = dictECU["info"]
+            if not baArgs or not dictInfo:
+                return []
+            iPID = baArgs[0]
+            if iPID == 0x00:
+                return [ bytes([0x49, 0x00]) + self.__bitmap(0x00, dictInfo) ]
+            if iPID not in dictInfo:
+                return []
+            baValue = self.__value(dictInfo[iPID], fElapsed)
+            if self.isCAN():
+                return [ bytes([0x49, iPID]) + baValue ]
+            # Legacy: numbered 4 byte frames without the CAN item count byte...
+            baData = baValue[1:] if iPID in (0x02, 0x04, 0x06) else baValue
+            iPad = (-len(baData)) % 4
+            baData = bytes(iPad) + baData
+            return [
+                bytes([0x49, iPID, iIndex // 4 + 1]) + baData[iIndex:iIndex + 4]
+                for iIndex in range(0, len(baData), 4)
+            ]
+
+        return []
+
+    #
+    # Framing
+    #
+
+    def __format(self, baBytes:bytes) -> str:
+        return baBytes.hex(" ").upper() if self.bSpaces else baBytes.hex().upper()
+
+    def __frame(self, dictECU:dict, baPayload:bytes) -> list[str]:
+        """
+        Frame one ECU response payload as the adapter prints it.
+        """
+
+        strActive = self.strActive
+        strSep = " " if self.bSpaces else ""
+
+        # CAN (ISO 15765-4)...
+        if strActive in self.CAN_11BIT_IDS or strActive in self.CAN_29BIT_IDS:
+            if strActive in self.CAN_11BIT_IDS:
+                strHeader = "%03X" % dictECU["canid"]
+            else:
+                strHeader = self.__format( bytes([0x18, 0xDA, 0xF1, dictECU["address"]]) )
+
+            iLen = len(baPayload)
+            # Single Frame...
+            if iLen <= 7:
+                if self.bHeaders:
+                    return [ strHeader + strSep + self.__format( bytes([iLen]) + baPayload ) ]
+                return [ self.__format(baPayload) ]
+
+            # First Frame and Consecutive Frames...
+            listFrames = [ bytes([0x10 | (iLen >> 8), iLen & 0xFF]) + baPayload[:6] ]
+            iSequence = 1
+            for iIndex in range(6, iLen, 7):
+                listFrames.append( bytes([0x20 | (iSequence & 0x0F)]) + baPayload[iIndex:iIndex + 7] )
+                iSequence += 1
+            if self.bHeaders:
+                return [ strHeader + strSep + self.__format(baFrame) for baFrame in listFrames ]
+            # Without headers, the ELM prints the length and numbered data lines...
+            listLines = [ "%03X" % iLen ]
+            listLines.append( "0:" + strSep + self.__format(listFrames[0][2:]) )
+            for iIndex, baFrame in enumerate(listFrames[1:]):
+                listLines.append( "%X:" % ((iIndex + 1) & 0x0F) + strSep + self.__format(baFrame[1:]) )
+            return listLines
+
+        # Legacy (J1850, ISO 9141, ISO 14230)...
+        if not self.bHeaders:
+            return [ self.__format(baPayload) ]
+        if strActive == "1":
+            baHeader = bytes([0x41, 0x6B, dictECU["address"]])
+        elif strActive in ("4", "5"):
+            baHeader = bytes([0x80 | len(baPayload), 0xF1, dictECU["address"]])
+        else:
+            baHeader = bytes([0x48, 0x6B, dictECU["address"]])
+        baFrame = baHeader + baPayload
+        return [ self.__format( baFrame + bytes([ sum(baFrame) & 0xFF ]) ) ]
+
+    #
+    # Transports
+    #
+
+    def __serve(self, funcRead, funcWrite):
+        """
+        Read command lines and write the responses until the transport closes.
+        """
+
+        bsBuffer = b""
+        threadMonitor = None
+        eventStop = threading.Event()
+        while self.__bRunning:
+            try:
+                data = funcRead()
+            except OSError:
+                break
+            if not data:
+                break
+
+            # Any character stops monitoring (and is otherwise ignored)...
+            if threadMonitor is not None:
+                bStop = self.bMonitor  # ...still monitoring (not ended by "BUFFER FULL")
+                eventStop.set()
+                threadMonitor.join()
+                threadMonitor = None
+                self.bMonitor = False
+                if bStop:
+                    bsBuffer = b""
+                    continue
+
+            bsBuffer += data
+            while b"\r" in bsBuffer:
+                bsLine, bsBuffer = bsBuffer.split(b"\r", 1)
+                bsLine = bsLine.replace(b"\n", b"")
+                try:
+                    funcWrite( self.handle(bsLine) )
+                except OSError:
+                    return
+                if self.bMonitor:
+                    eventStop.clear()
+                    threadMonitor = threading.Thread(
+                        target=self.__monitor, args=(funcWrite, eventStop),
+                        name=threading.current_thread().name + " monitor", daemon=True
+                    )
+                    threadMonitor.start()
+                    bsBuffer = b""
+                    break
+
+        if threadMonitor is not None:
+            eventStop.set()
+            threadMonitor.join(1.0)
+
+    def __monitor(self, funcWrite, eventStop:threading.Event):
+        """
+        Write the vehicle's broadcast frames until stopped or, with a frame limit, the buffer "fills".
+        """
+
+        strEOL = "\r\n" if self.bLinefeeds else "\r"
+        bCAN29 = self.strActive in self.CAN_29BIT_IDS
+        listHeaders = []
+        for iID, value in self.__dictBroadcast.items():
+            if (iID > 0x7FF) != bCAN29:
+                continue
+            if not self.bHeaders:
+                strHeader = ""
+            elif bCAN29:
+                strHeader = self.__format( iID.to_bytes(4, "big") ) + (" " if self.bSpaces else "")
+            else:
+                strHeader = "%03X" % iID + (" " if self.bSpaces else "")
+            listHeaders.append( (strHeader, value) )
+
+        iBatch = max(64 // max(len(listHeaders), 1), 1)  # ...broadcast cycles per write
+        fNext = time.monotonic()
+        iSent = 0
+        strEnd = "STOPPED"
+        try:
+            while self.__bRunning and not eventStop.is_set():
+                fElapsed = time.monotonic() - self.fStart
+                listLines = []
+                for _ in range(iBatch):
+                    for strHeader, value in listHeaders:
+                        listLines.append( strHeader + self.__format( self.__value(value, fElapsed) ) )
+                if self.iMonitorLimit and iSent + len(listLines) >= self.iMonitorLimit:
+                    del listLines[ (self.iMonitorLimit - iSent): ]
+                    strEnd = "BUFFER FULL"
+                iSent += len(listLines)
+                if listLines:
+                    funcWrite( ( strEOL.join(listLines) + strEOL ).encode("ascii") )
+                if strEnd != "STOPPED":
+                    self.bMonitor = False
+                    break
+
+                # Pace the frames...
+                if self.iMonitorRate:
+                    fNext += len(listLines) / self.iMonitorRate
+                    fSleep = fNext - time.monotonic()
+                    if fSleep > 0:
+                        eventStop.wait(fSleep)
+                elif not listLines:
+                    eventStop.wait(0.1)  # ...nothing to broadcast on this protocol
+            funcWrite( ( strEnd + strEOL + strEOL + ">" ).encode("ascii") )
+        except OSError:
+            pass
+
+    def startPTY(self) -> str:
+        """
+        Attach to a new pseudo terminal (POSIX only).
+
+        Return the port name to connect to.
+        """
+
+        import pty
+        import tty
+
+        self.__iMasterFD, self.__iSlaveFD = pty.openpty()
+        tty.setraw(self.__iSlaveFD)
+        strPort = os.ttyname(self.__iSlaveFD)
+
+        iMasterFD = self.__iMasterFD
+        def write(bsData:bytes):
+            os.write(iMasterFD, bsData)
+
+        self.__start( lambda: os.read(iMasterFD, 1024), write, "ELM327Emulator " + strPort )
+        logger.info("ELM327 emulator on " + strPort)
+        return strPort
+
+    def startSocket(self, strHost:str = "127.0.0.1", iPort:int = 0) -> str:
+        """
+        Listen on a TCP socket. Clients are served one at a time, like a single adapter.
+
+        Return the "socket://host:port" URL to connect to.
+        """
+
+        self.__sockServer = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__sockServer.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__sockServer.bind( (strHost, iPort) )
+        self.__sockServer.listen(1)
+        strURL = "socket://%s:%d" % self.__sockServer.getsockname()[:2]
+
+        def accept():
+            while self.__bRunning:
+                try:
+                    sockClient, _ = self.__sockServer.accept()
+                except OSError:
+                    return
+                with sockClient:
+                    sockClient.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    self.reset()
+                    self.__serve( lambda: sockClient.recv(1024), sockClient.sendall )
+
+        self.__bRunning = True
+        thread = threading.Thread(target=accept, name="ELM327Emulator " + strURL, daemon=True)
+        self.__listThreads.append(thread)
+        thread.start()
+        logger.info("ELM327 emulator on " + strURL)
+        return strURL
+
+    def __start(self, funcRead, funcWrite, strName:str):
+        self.__bRunning = True
+        thread = threading.Thread(target=self.__serve, args=(funcRead, funcWrite), name=strName, daemon=True)
+        self.__listThreads.append(thread)
+        thread.start()
+
+    def stop(self):
+        """
+        Stop serving and close the transports.
+        """
+
+        self.__bRunning = False
+        if self.__sockServer is not None:
+            try:
+                self.__sockServer.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.__sockServer.close()
+            self.__sockServer = None
+        for iFD in [self.__iMasterFD, self.__iSlaveFD]:
+            if iFD is not None:
+                try:
+                    os.close(iFD)
+                except OSError:
+                    pass
+        self.__iMasterFD = None
+        self.__iSlaveFD = None
+        for thread in self.__listThreads:
+            thread.join(1.0)
+        self.__listThreads = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ELM327 emulator")
+    parser.add_argument("--protocol", default=None, help="vehicle protocol ID (1-9)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to each OBD response")
+    parser.add_argument("--search", type=float, default=0.0, help="seconds for an automatic protocol search")
+    parser.add_argument("--vehicle", default=None, help="vehicle model JSON file")
+    parser.add_argument("--socket", default=None, metavar="HOST:PORT", help="listen on a TCP socket instead of a pty")
+    args = parser.parse_args()
+
+    dictVehicle = ELM327Emulator.loadVehicle(args.vehicle) if args.vehicle else dict(ELM327Emulator.VEHICLE_DEFAULT)
+    if args.protocol:
+        dictVehicle["protocol"] = args.protocol
+    emulator = ELM327Emulator(dictVehicle, fLatency=args.latency, fSearchDelay=args.search)
+    if args.socket:
+        strHost, _, strPort = args.socket.rpartition(":")
+        print( emulator.startSocket(strHost or "127.0.0.1", int(strPort)), flush=True )
+    else:
+        print( emulator.startPTY(), flush=True )
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        emulator.stop()
@@ -0,0 +1,381 @@
+############################################################################
+#
+# Python Onboard Diagnostics II Advanced
+#
+# FleetManager.py
+#
+# Copyright 2021-2023 Keven L. Ates (atescomp@gmail.com)
+#
+# This file is part of the Onboard Diagnostics II Advanced (pyOBDA) system.
+#
+# pyOBDA is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# pyOBDA is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyOBDA; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+############################################################################
+
+import time
+import threading
+import logging
+import queue
+
+from .Command import Command
+from .ConnectionStatus import ConnectionStatus
+from .OBD2Connector import OBD2Connector
+from .CommandScheduler import CommandScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class FleetManager:
+    """
+    Headless manager for many ELM327 adapters polled at the same time.
+
+    Each port gets its own OBD2Connector and its own worker thread with a deadline scheduler (see
+    CommandScheduler), so adapters are polled independently at their own pace. The serial work is
+    I/O bound and each connector owns an OS port, so threads (not processes) are used.
+
+    All responses go to a single bounded stream of 4-tuples:
+        ( Response Time, Port, Command, Response )
+    When the stream is full, the oldest sample is dropped and counted.
+
+    Failures are isolated per adapter:
+        a worker that fails to connect or loses its adapter retries after fRetryDelay seconds,
+        an exception in a worker only restarts that adapter's connection,
+        a worker blocked in a query longer than fHangTimeout seconds is reported as "hung" while the
+        other workers continue (a stream put never blocks a worker).
+
+    Use:
+        fleet = FleetManager(["/dev/ttyUSB0", "/dev/ttyUSB1"])
+        fleet.watch(CommandList().RPM, fRate=10.0)
+        fleet.start()
+        for fTime, strPort, cmd, response in fleet.stream():
+            ...
+    """
+
+    # Adapter States...
+    CONNECTING = "connecting"
+    RUNNING    = "running"
+    FAILED     = "failed"
+    HUNG       = "hung"
+    STOPPED    = "stopped"
+
+    def __init__(self, listPorts:list[str], iBaudRate:int = 0, strProtocol:str = "", bFast:bool = True,
+                 fTimeout:float = 0.1, bCheckVoltage:bool = True, fDelayCmds:float = 0.25,
+                 fHangTimeout:float = 10.0, fRetryDelay:float = 5.0, iStreamSize:int = 10000,
+                 funcConnector = OBD2Connector):
+        self.__iBaudRate = iBaudRate
+        self.__strProtocol = strProtocol
+        self.__bFast = bFast
+        self.__fTimeout = fTimeout
+        self.__bCheckVoltage = bCheckVoltage
+        self.__fDelayCmds = fDelayCmds
+        self.__fHangTimeout = fHangTimeout
+        self.__fRetryDelay = fRetryDelay
+        self.__funcConnector = funcConnector  # ...connector factory (same arguments as OBD2Connector)
+        self.__queueStream = queue.Queue(maxsize=max(iStreamSize, 1))
+        self.__iDropped = 0
+        self.__lockDrop = threading.Lock()
+        self.__eventStop = threading.Event()
+        self.__dictWatched : dict = {}         # key = Command, value = (fRate, iPriority)
+        self.__dictAdapters : dict = {}        # key = Port, value = adapter state (dict)
+        for strPort in listPorts:
+            self.__addAdapter(strPort)
+
+    def __addAdapter(self, strPort:str):
+        if strPort in self.__dictAdapters:
+            return
+        self.__dictAdapters[strPort] = {
+            "strPort"      : strPort,
+            "strState"     : self.STOPPED,
+            "connector"    : None,
+            "thread"       : None,
+            "scheduler"    : CommandScheduler(self.__fDelayCmds),  # ...only used by the worker thread
+            "queueChanges" : queue.SimpleQueue(),  # ...scheduler changes for the worker thread
+            "fBusySince"   : None,                 # ...start time of the query in progress
+            "iQueries"     : 0,
+            "iResponses"   : 0,
+            "iErrors"      : 0,
+            "iConnects"    : 0,
+            "fLastTime"    : None,
+            "dictRates"    : {},
+        }
+
+    @property
+    def running(self):
+        return any( dictAdapter["thread"] is not None for dictAdapter in self.__dictAdapters.values() )
+
+    def getPorts(self) -> list[str]:
+        return list(self.__dictAdapters)
+
+    def add(self, strPort:str):
+        """
+        Add an adapter port. The adapter is started now when the fleet is running.
+        """
+
+        self.__addAdapter(strPort)
+        dictAdapter = self.__dictAdapters[strPort]
+        for cmd, (fRate, iPriority) in self.__dictWatched.items():
+            self.__queueChange(dictAdapter, "add", cmd, fRate, iPriority, time.monotonic())
+        if self.running and not self.__eventStop.is_set():
+            self.__startAdapter(dictAdapter)
+
+    def watch(self, cmd:Command, fRate:float = None, iPriority:int = 0):
+        """
+        Poll a command on every adapter at a target rate (Hz) and priority.
+
+        Commands an adapter's vehicle does not support are skipped on that adapter.
+        """
+
+        self.__dictWatched[cmd] = (fRate, iPriority)
+        for dictAdapter in self.__dictAdapters.values():
+            self.__queueChange(dictAdapter, "add", cmd, fRate, iPriority, time.monotonic())
+
+    def unwatch(self, cmd:Command):
+        self.__dictWatched.pop(cmd, None)
+        for dictAdapter in self.__dictAdapters.values():
+            self.__queueChange(dictAdapter, "remove", cmd)
+
+    def __queueChange(self, dictAdapter:dict, strMethod:str, *tupArgs):
+        scheduler = dictAdapter["scheduler"]
+        dictAdapter["queueChanges"].put( (getattr(scheduler, strMethod), tupArgs) )
+
+    def start(self):
+        """
+        Start a worker thread per adapter.
+        """
+
+        self.__eventStop.clear()
+        for dictAdapter in self.__dictAdapters.values():
+            self.__startAdapter(dictAdapter)
+
+    def __startAdapter(self, dictAdapter:dict):
+        if dictAdapter["thread"] is not None:
+            return
+        dictAdapter["strState"] = self.CONNECTING
+        dictAdapter["thread"] = threading.Thread(
+            target=self.__run, args=(dictAdapter, ), name="OBD2Fleet " + dictAdapter["strPort"], daemon=True
+        )
+        dictAdapter["thread"].start()
+
+    def stop(self, fWait:float = 5.0):
+        """
+        Stop the workers and close the connections.
+
+        A worker still blocked after fWait seconds is abandoned (it is a daemon thread).
+        """
+
+        self.__eventStop.set()
+        fDeadline = time.monotonic() + fWait
+        for dictAdapter in self.__dictAdapters.values():
+            thread = dictAdapter["thread"]
+            if thread is not None:
+                thread.join( max(fDeadline - time.monotonic(), 0.0) )
+                if thread.is_alive():
+                    logger.warning("Fleet adapter %s did not stop" % dictAdapter["strPort"])
+                    dictAdapter["strState"] = self.HUNG
+                    continue
+                dictAdapter["thread"] = None
+                dictAdapter["strState"] = self.STOPPED
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    #
+    # Stream
+    #
+
+    def get(self, fTimeout:float = None):
+        """
+        Return the next ( Response Time, Port, Command, Response ) sample or None on timeout.
+        """
+
+        try:
+            return self.__queueStream.get(timeout=fTimeout)
+        except queue.Empty:
+            return None
+
+    def stream(self, fTimeout:float = 0.25):
+        """
+        Yield samples until the fleet is stopped.
+        """
+
+        while not self.__eventStop.is_set() or not self.__queueStream.empty():
+            tupSample = self.get(fTimeout)
+            if tupSample is not None:
+                yield tupSample
+
+    def __put(self, tupSample:tuple):
+        # Never block a worker: on a full stream, drop the oldest sample...
+        while True:
+            try:
+                self.__queueStream.put_nowait(tupSample)
+                return
+            except queue.Full:
+                try:
+                    self.__queueStream.get_nowait()
+                    with self.__lockDrop:
+                        self.__iDropped += 1
+                except queue.Empty:
+                    pass
+
+    #
+    # Status
+    #
+
+    def getStatus(self) -> dict:
+        """
+        Return the per adapter status keyed by port.
+
+        Each status is a dict with the keys:
+            state, queries, responses, errors, connects, last (response time), rates (see CommandScheduler.getRates)
+        """
+
+        fNow = time.monotonic()
+        dictStatus = {}
+        for strPort, dictAdapter in list( self.__dictAdapters.items() ):
+            strState = dictAdapter["strState"]
+            fBusySince = dictAdapter["fBusySince"]
+            if strState == self.RUNNING and fBusySince is not None and fNow - fBusySince > self.__fHangTimeout:
+                strState = self.HUNG
+            dictStatus[strPort] = {
+                "state"     : strState,
+                "queries"   : dictAdapter["iQueries"],
+                "responses" : dictAdapter["iResponses"],
+                "errors"    : dictAdapter["iErrors"],
+                "connects"  : dictAdapter["iConnects"],
+                "last"      : dictAdapter["fLastTime"],
+                "rates"     : dictAdapter["dictRates"],
+            }
+        return dictStatus
+
+    def getDropped(self) -> int:
+        return self.__iDropped
+
+    #
+    # Worker
+    #
+
+    def __applyChanges(self, dictAdapter:dict, fWait:float = None):
+        """
+        Apply queued scheduler changes from the watch functions, waiting up to fWait seconds for one.
+        """
+
+        queueChanges = dictAdapter["queueChanges"]
+        try:
+            funcChange, tupArgs = queueChanges.get(timeout=fWait) if fWait else queueChanges.get_nowait()
+            funcChange(*tupArgs)
+            while True:
+                funcChange, tupArgs = queueChanges.get_nowait()
+                funcChange(*tupArgs)
+        except queue.Empty:
+            pass
+
+    def __connect(self, dictAdapter:dict):
+        strPort = dictAdapter["strPort"]
+        dictAdapter["strState"] = self.CONNECTING
+        dictAdapter["iConnects"] += 1
+        try:
+            conn = self.__funcConnector(
+                strPort, self.__iBaudRate, self.__strProtocol, self.__bFast, self.__fTimeout, self.__bCheckVoltage
+            )
+        except Exception as err:
+            logger.error("Fleet adapter %s connect FAILED: %s" % (strPort, str(err)))
+            dictAdapter["iErrors"] += 1
+            return None
+        if conn.status() != ConnectionStatus.VEHICLE:
+            logger.error("Fleet adapter %s connect FAILED: %s" % (strPort, conn.status()))
+            conn.close()
+            return None
+        dictAdapter["connector"] = conn
+        dictAdapter["strState"] = self.RUNNING
+        logger.info("Fleet adapter %s connected" % strPort)
+        return conn
+
+    def __disconnect(self, dictAdapter:dict):
+        conn = dictAdapter["connector"]
+        dictAdapter["connector"] = None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception as err:
+                logger.debug("Fleet adapter %s close: %s" % (dictAdapter["strPort"], str(err)))
+
+    def __run(self, dictAdapter:dict):
+        """
+        The worker thread for one adapter.
+        """
+
+        strPort = dictAdapter["strPort"]
+        scheduler = dictAdapter["scheduler"]
+        conn = None
+
+        while not self.__eventStop.is_set():
+            self.__applyChanges(dictAdapter)
+
+            # (Re)connect...
+            if conn is None or not conn.isConnected():
+                self.__disconnect(dictAdapter)
+                conn = self.__connect(dictAdapter)
+                if conn is None:
+                    dictAdapter["strState"] = self.FAILED
+                    self.__eventStop.wait(self.__fRetryDelay)
+                    continue
+
+            fNow = time.monotonic()
+            listCmds = scheduler.popDue(OBD2Connector.MAX_PIDS_PER_QUERY, fNow)
+            if not listCmds:
+                fWait = scheduler.getWait(fNow)
+                self.__applyChanges(dictAdapter, min(fWait if fWait is not None else 0.25, 0.25))
+                continue
+
+            # Skip the commands this vehicle does not support...
+            listUsable = [ cmd for cmd in listCmds if conn.isCmdUsable(cmd, bWarn=False) ]
+            for cmd in listCmds:
+                if cmd not in listUsable:
+                    logger.info("Fleet adapter %s: Command [%s] is NOT supported, skipping" % (strPort, str(cmd)))
+                    scheduler.remove(cmd)
+            if not listUsable:
+                continue
+
+            # Query (a blocked query only stalls this worker)...
+            dictAdapter["fBusySince"] = fNow
+            try:
+                dictResponses = conn.query_many(listUsable, bForce=True)
+            except Exception as err:
+                logger.error("Fleet adapter %s query FAILED: %s" % (strPort, str(err)))
+                dictAdapter["iErrors"] += 1
+                dictAdapter["fBusySince"] = None
+                self.__disconnect(dictAdapter)
+                conn = None
+                scheduler.complete(listUsable, time.monotonic())
+                continue
+            dictAdapter["fBusySince"] = None
+            scheduler.complete(listUsable, time.monotonic())
+
+            dictAdapter["iQueries"] += 1
+            for cmd, response in dictResponses.items():
+                if response.isNull():
+                    continue
+                dictAdapter["iResponses"] += 1
+                dictAdapter["fLastTime"] = response.time
+                self.__put( (response.time, strPort, cmd, response) )
+            dictAdapter["dictRates"] = scheduler.getRates()
+
+        self.__disconnect(dictAdapter)
+        dictAdapter["strState"] = self.STOPPED
+        dictAdapter["thread"] = None
@@ -0,0 +1,412 @@
+############################################################################
+#
+# Python Onboard Diagnostics II Advanced
+#
+# Headless.py
+#
+# Copyright 2021-2023 Keven L. Ates (atescomp@gmail.com)
+#
+# This file is part of the Onboard Diagnostics II Advanced (pyOBDA) system.
+#
+# pyOBDA is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# pyOBDA is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyOBDA; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+############################################################################
+
+import os
+import sys
+import time
+import json
+import socket
+import signal
+import threading
+import configparser
+import logging
+
+from .Command import Command
+from .CommandList import CommandList
+from .Response import Response
+from .OBD2Connector import OBD2Connector
+from .OBD2ConnectorAsync import OBD2ConnectorAsync
+from .CapabilityCache import CapabilityCache
+from .AdapterCache import AdapterCache
+from .Utility import Utility
+from .UnitAndScale import Unit
+
+logger = logging.getLogger(__name__)
+
+
+class Headless:
+    """
+    Headless (no wx) sensor streaming for servers, data loggers and embedded boards.
+
+    The connection settings are read from the pyOBDA config file ([OBD] section, see the README) and
+    may be overridden. Watched commands are polled by an OBD2ConnectorAsync at their own rates and
+    each new response is written as a record to the sinks:
+        stdout  - the default when no other sink is given
+        file    - appended to, so a restarted daemon continues the log
+        socket  - a TCP server; every connected client receives every record
+
+    Records are JSON lines:
+        {"t": <epoch seconds>, "cmd": <command name>, "value": <number, string or null>, "unit": <str or null>}
+    or CSV lines with the same fields in the same order.
+
+    Run:
+        python -m OBD2Device.Headless RPM@10 SPEED@5 COOLANT_TEMP --listen 127.0.0.1:35000
+        python -m OBD2Device.Headless --once STATUS FUEL_LEVEL
+        python -m OBD2Device.Headless --emulator --duration 5 RPM@10
+    """
+
+    FORMATS = ["json", "csv"]
+
+    def __init__(self, strPort:str = "", iBaudRate:int = 0, strProtocol:str = "", bFast:bool = True,
+                 fTimeout:float = 10.0, bCheckVoltage:bool = True, iReconnects:int = 3, fRate:float = 1.0,
+                 strFormat:str = "json"):
+        self.strPort = strPort
+        self.iBaudRate = iBaudRate
+        self.strProtocol = strProtocol
+        self.bFast = bFast
+        self.fTimeout = fTimeout
+        self.bCheckVoltage = bCheckVoltage
+        self.iReconnects = max(iReconnects, 1)
+        self.fRate = fRate  # ...default rate (Hz) of watched commands without one
+        self.strFormat = strFormat
+        self.connection:(OBD2Connector|None) = None
+        self.CMDS = CommandList()
+
+        self.__lockWrite = threading.Lock()
+        self.__listFiles = []    # ...open sink streams
+        self.__listClients = []  # ...connected socket clients
+        self.__socketServer = None
+        self.__threadServer = None
+        self.__eventStop = threading.Event()
+        self.iRecords = 0
+        self.iDropped = 0  # ...socket clients dropped on a send error
+
+    @classmethod
+    def getConfigFile(cls) -> str:
+        """
+        Return the default pyOBDA config file (the same file the GUI uses).
+        """
+
+        if sys.platform.startswith('win'):  # ...Windows
+            return "pyobda.ini"
+        return os.path.join(Utility.getConfigPath(), "config")
+
+    @classmethod
+    def readConfig(cls, strFile:str = None) -> dict:
+        """
+        Read the connection settings from the [OBD] section of a pyOBDA config file.
+
+        Return a dict of keyword arguments for the constructor. Missing items get the GUI defaults.
+        """
+
+        strFile = strFile if strFile else cls.getConfigFile()
+        config = configparser.RawConfigParser()
+        if not os.path.exists(strFile) or config.read(strFile) == []:
+            logger.info("No configuration file exists: " + strFile)
+        if not config.has_section("OBD"):
+            config.add_section("OBD")
+
+        strBaud = config.get("OBD", "BAUD", fallback="")
+        fDelay = max(config.getfloat("OBD", "DELAY", fallback=1.0), 0.001)
+        return {
+            "strPort"       : config.get("OBD", "PORT", fallback="/dev/ttyUSB0"),
+            "iBaudRate"     : 0 if strBaud in ("", "Auto") else config.getint("OBD", "BAUD"),
+            "strProtocol"   : config.get("OBD", "PROTOCOL", fallback="6"),
+            "bFast"         : config.getboolean("OBD", "FAST", fallback=True),
+            "bCheckVoltage" : config.getboolean("OBD", "CHECKVOLTS", fallback=True),
+            "fTimeout"      : config.getfloat("OBD", "TIMEOUT", fallback=10.0),
+            "iReconnects"   : config.getint("OBD", "RECONNECTS", fallback=3),
+            "fRate"         : 1.0 / fDelay,
+        }
+
+    def parseCommands(self, listSpecs:list[str]) -> list[tuple[Command, float]]:
+        """
+        Parse command specs "NAME" or "NAME@RATE" (rate in Hz, default fRate).
+
+        Return a list of 2-tuples ( Command, Rate ). Raise ValueError on an unknown name or bad rate.
+        """
+
+        listCmds = []
+        for strSpec in listSpecs:
+            strName, _, strRate = strSpec.partition("@")
+            strName = strName.strip().upper()
+            if strName not in self.CMDS:
+                raise ValueError("Unknown command: " + strName)
+            fRate = float(strRate) if strRate else self.fRate
+            if fRate <= 0.0:
+                raise ValueError("Rate must be positive: " + strSpec)
+            listCmds.append( ( self.CMDS[strName], fRate ) )
+        return listCmds
+
+    #
+    # Sinks
+    #
+
+    def addFile(self, fileOut):
+        """
+        Add an open text stream (stdout, a log file) to receive the records.
+        """
+
+        with self.__lockWrite:
+            self.__listFiles.append(fileOut)
+
+    def listen(self, strHost:str, iPort:int) -> tuple:
+        """
+        Start a TCP server that sends the records to every connected client.
+
+        Return the bound ( host, port ), so port 0 picks a free port.
+        """
+
+        self.__socketServer = socket.create_server( (strHost, iPort), reuse_port=False )
+        self.__socketServer.settimeout(0.5)  # ...check for stop
+        self.__threadServer = threading.Thread(target=self.__serve, name="HeadlessServer", daemon=True)
+        self.__threadServer.start()
+        tupAddress = self.__socketServer.getsockname()[:2]
+        logger.info("Listening on %s:%d" % tupAddress)
+        return tupAddress
+
+    def __serve(self):
+        while not self.__eventStop.is_set():
+            try:
+                socketClient, tupAddress = self.__socketServer.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # ...server closed
+            socketClient.settimeout(1.0)  # ...a stalled client is dropped rather than stalling the records
+            if self.strFormat == "csv":
+                self.__send(socketClient, self.getHeader())
+            with self.__lockWrite:
+                self.__listClients.append(socketClient)
+            logger.info("Client connected: %s:%d" % tupAddress[:2])
+
+    def __send(self, socketClient, strLine:str) -> bool:
+        try:
+            socketClient.sendall( strLine.encode() )
+            return True
+        except OSError:
+            return False
+
+    def getHeader(self) -> str:
+        return "t,cmd,value,unit\n"
+
+    def format(self, response:Response) -> str:
+        """
+        Format a response as a record line.
+        """
+
+        if response.isNull():
+            value = None
+            strUnit = None
+        elif response.raw is not None:
+            value = response.raw  # ...the plain number, no Quantity needed
+            strUnit = response.spec.strUnit
+        elif isinstance(response.value, Unit.Quantity):
+            value = response.value.magnitude
+            strUnit = str(response.value.units)
+        elif isinstance(response.value, (bool, int, float, str)):
+            value = response.value
+            strUnit = None
+        else:
+            value = str(response.value)
+            strUnit = None
+
+        strName = response.command.strName if response.command else ""
+        if self.strFormat == "csv":
+            strValue = "" if value is None else str(value)
+            if "," in strValue or '"' in strValue or "\n" in strValue:
+                strValue = '"' + strValue.replace('"', '""') + '"'
+            return "%.3f,%s,%s,%s\n" % (response.time, strName, strValue, strUnit if strUnit else "")
+        return json.dumps( { "t" : round(response.time, 3), "cmd" : strName, "value" : value, "unit" : strUnit } ) + "\n"
+
+    def write(self, response:Response):
+        """
+        Write a response record to every sink (the watch callback).
+        """
+
+        strLine = self.format(response)
+        with self.__lockWrite:
+            self.iRecords += 1
+            for fileOut in self.__listFiles:
+                fileOut.write(strLine)
+                fileOut.flush()
+            if self.__listClients:
+                listKeep = [ socketClient for socketClient in self.__listClients if self.__send(socketClient, strLine) ]
+                for socketClient in self.__listClients:
+                    if socketClient not in listKeep:
+                        self.iDropped += 1
+                        socketClient.close()
+                        logger.info("Client dropped")
+                self.__listClients = listKeep
+
+    #
+    # Connection
+    #
+
+    def connect(self, funcConnector = OBD2ConnectorAsync) -> bool:
+        """
+        Connect to the vehicle, trying up to iReconnects times.
+        """
+
+        for iAttempt in range(self.iReconnects):
+            if self.__eventStop.is_set():
+                return False
+            fStart = time.monotonic()
+            self.connection = funcConnector(
+                self.strPort, self.iBaudRate, self.strProtocol, self.bFast, self.fTimeout, self.bCheckVoltage,
+                False, cache=CapabilityCache(), adapterCache=AdapterCache()
+            )
+            if self.connection.isConnected():
+                logger.info("Connected to %s (%s) in %.3f s" %
+                            (self.connection.getPortName(), self.connection.getProtocolName(), time.monotonic() - fStart))
+                return True
+            self.connection.close()
+            self.connection = None
+            logger.warning("Connection attempt %d of %d failed" % (iAttempt + 1, self.iReconnects))
+        return False
+
+    def once(self, listCmds:list[tuple[Command, float]]):
+        """
+        Query the commands once and write their records.
+        """
+
+        dictResponses = self.connection.query_many( [ cmd for cmd, _ in listCmds ] )
+        for cmd, _ in listCmds:
+            response = dictResponses.get(cmd)
+            if response is not None:
+                self.write(response)
+
+    def run(self, listCmds:list[tuple[Command, float]], fDuration:float = None):
+        """
+        Stream the commands at their rates until stop() is called or fDuration seconds pass.
+        """
+
+        for cmd, fRate in listCmds:
+            self.connection.watch(cmd, callback=self.write, fRate=fRate)
+        self.connection.start()
+        if not self.connection.running:
+            logger.warning("No usable commands to watch")
+            return
+        self.__eventStop.wait(fDuration)
+        self.connection.stop()
+
+    def stop(self):
+        """
+        Stop streaming (safe from a signal handler).
+        """
+
+        self.__eventStop.set()
+
+    def close(self):
+        self.stop()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        if self.__socketServer is not None:
+            self.__socketServer.close()
+            self.__threadServer.join()
+            self.__socketServer = None
+        with self.__lockWrite:
+            for socketClient in self.__listClients:
+                socketClient.close()
+            self.__listClients = []
+
+
+def main(listArgs:list = None) -> int:
+    """
+    Run the headless streamer from the command line arguments. Return the exit code.
+    """
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="pyOBDA headless sensor streaming (no wx)")
+    parser.add_argument("commands", nargs="*", default=["RPM", "SPEED", "COOLANT_TEMP"],
+                        help="commands to stream as NAME or NAME@RATE (Hz) (default: RPM SPEED COOLANT_TEMP)")
+    parser.add_argument("--config", default=None, help="pyOBDA config file (default: " + Headless.getConfigFile() + ")")
+    parser.add_argument("--port", default=None, help="adapter port (overrides the config PORT)")
+    parser.add_argument("--baud", type=int, default=None, help="baud rate, 0 for auto (overrides the config BAUD)")
+    parser.add_argument("--protocol", default=None, help="ELM protocol ID (overrides the config PROTOCOL)")
+    parser.add_argument("--rate", type=float, default=None, help="default rate (Hz) (default: 1 / config DELAY)")
+    parser.add_argument("--format", choices=Headless.FORMATS, default="json", help="record format (default: json)")
+    parser.add_argument("--output", default=None, help="append the records to a file")
+    parser.add_argument("--listen", default=None, metavar="HOST:PORT", help="send the records to TCP clients")
+    parser.add_argument("--duration", type=float, default=None, help="seconds to stream (default: until a signal)")
+    parser.add_argument("--once", action="store_true", help="query the commands once and exit")
+    parser.add_argument("--emulator", action="store_true", help="connect to the ELM327 emulator instead of a vehicle")
+    parser.add_argument("--verbose", action="store_true", help="keep the OBD2Device log output")
+    args = parser.parse_args(listArgs)
+
+    if not args.verbose:
+        logging.getLogger("OBD2Device").setLevel(logging.WARNING)
+
+    dictConfig = Headless.readConfig(args.config)
+    for strKey, value in ( ("strPort", args.port), ("iBaudRate", args.baud), ("strProtocol", args.protocol),
+                           ("fRate", args.rate) ):
+        if value is not None:
+            dictConfig[strKey] = value
+    dictConfig["strFormat"] = args.format
+
+    emulator = None
+    if args.emulator:
+        from .ELM327Emulator import ELM327Emulator
+        emulator = ELM327Emulator()
+        dictConfig["strPort"] = emulator.startPTY()
+        dictConfig["iBaudRate"] = 0
+        dictConfig["strProtocol"] = ""
+
+    headless = Headless(**dictConfig)
+    try:
+        listCmds = headless.parseCommands(args.commands)
+    except ValueError as error:
+        parser.error(str(error))
+
+    fileOut = None
+    if args.output:
+        fileOut = open(args.output, "a")
+        headless.addFile(fileOut)
+    if args.listen:
+        strHost, _, strListenPort = args.listen.rpartition(":")
+        tupAddress = headless.listen(strHost if strHost else "127.0.0.1", int(strListenPort))
+        print("Listening on %s:%d" % tupAddress, file=sys.stderr)
+    if not args.output and not args.listen:
+        headless.addFile(sys.stdout)
+    if args.format == "csv":
+        for fileSink in ( [fileOut] if fileOut else [] ) + ( [] if args.output or args.listen else [sys.stdout] ):
+            fileSink.write(headless.getHeader())
+
+    # Stop cleanly on Ctrl-C and on a service stop...
+    signal.signal( signal.SIGINT, lambda iSignal, frame: headless.stop() )
+    signal.signal( signal.SIGTERM, lambda iSignal, frame: headless.stop() )
+
+    iExit = 0
+    try:
+        if not headless.connect(OBD2Connector if args.once else OBD2ConnectorAsync):
+            print("Unable to connect to " + dictConfig["strPort"], file=sys.stderr)
+            iExit = 1
+        elif args.once:
+            headless.once(listCmds)
+        else:
+            headless.run(listCmds, args.duration)
+    finally:
+        headless.close()
+        if fileOut:
+            fileOut.close()
+        if emulator:
+            emulator.stop()
+    return iExit
+
+
+if __name__ == "__main__":
+    sys.exit(main())
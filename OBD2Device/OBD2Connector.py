@@ -31,13 +31,18 @@ import errno
 import glob
 import sys
 import serial
+from concurrent.futures import ThreadPoolExecutor
 
 from .ELM327 import ELM327
 from .CommandList import CommandList
 from .Command import Command
 from .ConnectionStatus import ConnectionStatus
+from .CapabilityCache import CapabilityCache
+from .AdapterCache import AdapterCache
+from .QueryTimer import QueryTimer
 from .Response import Response
 from .Protocols.ECU import ECU
+from .Protocols.Message import Message
 
 
 logger = logging.getLogger(__name__)
@@ -53,6 +58,15 @@ class OBD2Connector(object):
     This class uses a synchronous value reporting process.
     """
 
+    # Protocol IDs for the ISO 15765-4 CAN protocols...
+    CAN_PROTOCOL_IDS = ["6", "7", "8", "9"]
+
+    # Most Mode 1 PIDs allowed in a single ISO 15765-4 request...
+    MAX_PIDS_PER_QUERY = 6
+
+    # Most ports checked or probed at the same time...
+    MAX_PORT_WORKERS = 32
+
     @classmethod
     def __isPortAvailable(cls, strPort : str):
         # Is a port available?
@@ -92,16 +106,56 @@ class OBD2Connector(object):
             listPortsPossible += [port for port in glob.glob('/dev/tty.*') if port not in listPortsExclude]
         #listPortsPossible += glob.glob('/dev/pts/[0-9]*') # for OBDSim?
 
-        listPortsAvailable : list[str] = []
-        for strPort in listPortsPossible:
-            if cls.__isPortAvailable(strPort):
-                listPortsAvailable.append(strPort)
+        if not listPortsPossible:
+            return []
+
+        # Check the ports concurrently (opening a port can block)...
+        with ThreadPoolExecutor(max_workers=min(len(listPortsPossible), cls.MAX_PORT_WORKERS)) as executor:
+            listAvailable = list( executor.map(cls.__isPortAvailable, listPortsPossible) )
+
+        listPortsAvailable : list[str] = [
+            strPort for strPort, bAvailable in zip(listPortsPossible, listAvailable) if bAvailable
+        ]
 
         return listPortsAvailable
 
+    @classmethod
+    def rankSerialPorts(cls, listPorts:list[str], iBaudRate:int = 0, adapterCache:AdapterCache = None):
+        """
+        Probe ports for an ELM327 concurrently (one worker per port) with the ELM327 "AT I" handshake.
+
+        The baud rate is tried first when given. Otherwise, the port's cached baud rate is tried before
+        the automatic detection order.
+
+        Return a list of 4-tuples ( Port, Baud Rate, Response Seconds, Identification ) for the ports
+        that answered, fastest first.
+        """
+
+        if not listPorts:
+            return []
+
+        def probe(strPort:str):
+            listBauds = list(ELM327._TRY_BAUD_ORDER)
+            iFirst = iBaudRate
+            if not iFirst and adapterCache is not None:
+                iFirst = adapterCache.getBaudRate(strPort)
+            if iFirst:
+                listBauds = [iFirst] + [ iBaud for iBaud in listBauds if iBaud != iFirst ]
+            return ELM327.probe(strPort, listBauds)
+
+        with ThreadPoolExecutor(max_workers=min(len(listPorts), cls.MAX_PORT_WORKERS)) as executor:
+            listResults = list( executor.map(probe, listPorts) )
+
+        listRanked = [
+            (strPort, ) + tupResult for strPort, tupResult in zip(listPorts, listResults) if tupResult
+        ]
+        listRanked.sort(key=lambda tupRank: tupRank[2])
+        return listRanked
+
 
     def __init__(self, strPort:str = "", iBaudRate:int = 0, strProtocol:str = "", bFast:bool = True,
-                 fTimeout:float = 0.1, bCheckVoltage:bool = True, bStartLowPower:bool = False):
+                 fTimeout:float = 0.1, bCheckVoltage:bool = True, bStartLowPower:bool = False,
+                 cache:CapabilityCache = None, adapterCache:AdapterCache = None):
         self.interface:(ELM327|None) = None
         self.CMDS = CommandList()
         self.listCommandsSupported:list = set(self.CMDS.getBaseCmds())
@@ -110,6 +164,11 @@ class OBD2Connector(object):
         self.__baLastCommand:bytearray = b""  # ...store previous command to run with a CR
         self.__baLastHeader:bytearray = ECU.HEADER.ENGINE  # ...to compare with previously used header
         self.__dictFrameCounts:dict = {}  # ...count the number of return frames for each command
+        self.__dictPIDMessages:dict = {}  # ...PID listing command results (they don't change while connected)
+        self.cache:CapabilityCache = cache if cache is not None else CapabilityCache()
+        self.strVIN:str = None
+        self.adapterCache:AdapterCache = adapterCache if adapterCache is not None else AdapterCache()
+        self.timer:QueryTimer = None  # ...per-stage query timing (see enableTiming()), off when None
 
         # Validate parameters...
         if strPort == "" or strPort.startswith("Auto"):
@@ -118,8 +177,10 @@ class OBD2Connector(object):
         logger.info("=== OBD-II Connector ===")
         # Connect and load sensors...
         self.__connect(strPort, iBaudRate, strProtocol, bCheckVoltage, bStartLowPower)
-        # Load the vehicles's supported commands...
-        self.__loadCmds()
+        # Load the vehicles's supported commands (from the cache for a known vehicle)...
+        if not self.__loadCachedCmds():
+            self.__loadCmds()
+            self.__storeCachedCmds()
         logger.info("========================")
 
     def __connect(self, strPort, iBaudRate, strProtocol, bCheckVoltage,
@@ -137,21 +198,29 @@ class OBD2Connector(object):
                 logger.warning("No OBD-II adapters found!")
                 return
 
-            for strPort in astrPortNames :
-                if not strPort :
-                    continue
-                logger.info("Attempting to use port: " + strPort)
-                self.interface = ELM327(strPort, iBaudRate, strProtocol,
+            # Probe all ports at once and try the fastest responding ELM first...
+            listRanked = self.rankSerialPorts(astrPortNames, iBaudRate, self.adapterCache)
+            logger.info("Responding ports: " + str( [ tupRank[0] for tupRank in listRanked ] ))
+
+            if not listRanked:
+                logger.warning("No OBD-II adapters responded!")
+                return
+
+            for strPort, iProbedBaud, fSeconds, strIdent in listRanked :
+                logger.info("Attempting to use port: %s (%s, %.3f s)" % (strPort, strIdent, fSeconds))
+                self.interface = ELM327(strPort, iBaudRate if iBaudRate else iProbedBaud, strProtocol,
                                         self.fTimeout, bCheckVoltage,
-                                        bStartLowPower)
+                                        bStartLowPower, self.adapterCache)
 
-                if self.interface.getStatus() >= ConnectionStatus.ELM :
+                # NOTE: The statuses are strings, so test for NONE rather than ordering them
+                if self.interface.getStatus() != ConnectionStatus.NONE :
                     break  # ...success! stop searching for serial port
+                self.interface.close()  # ...release the failed port before trying the next one
         else:
             logger.info("Attempting to use configured port:" + strPort)
             self.interface = ELM327(strPort, iBaudRate, strProtocol,
                                     self.fTimeout, bCheckVoltage,
-                                    bStartLowPower)
+                                    bStartLowPower, self.adapterCache)
 
         # If the connection failed, close it...
         if self.interface.getStatus() == ConnectionStatus.NONE :
@@ -182,6 +251,7 @@ class OBD2Connector(object):
             if ( response.isNull() ) :
                 logger.warn("No valid data for PID listing command: %s" % cmdPID)
                 continue
+            self.__dictPIDMessages[cmdPID] = response.messages[0]
 
             # Loop through PIDs bit-array...
             for iIndex, bBit in enumerate(response.value) :
@@ -198,6 +268,70 @@ class OBD2Connector(object):
 
         logger.info("Finished querying with %d commands supported." % len(self.listCommandsSupported))
 
+    def __readVIN(self):
+        """
+        Read the vehicle's VIN for the capability cache. Return None if unavailable.
+        """
+
+        # NOTE: Only use the blocking OBD2Connector.query() (see __loadCmds())
+        response = OBD2Connector.query(self, self.CMDS.VIN, bForce=True)
+        if response.isNull() :
+            return None
+        strVIN = bytes(response.value).decode("ascii", "ignore").strip()
+        if len(strVIN) != 17 or not strVIN.isalnum() :
+            logger.debug("Invalid VIN: %s" % repr(strVIN))
+            return None
+        return strVIN
+
+    def __loadCachedCmds(self):
+        """
+        Load the supported commands from the capability cache for a known vehicle.
+
+        Return True when the cache was used.
+        """
+
+        if self.status() != ConnectionStatus.VEHICLE or self.cache is None :
+            return False
+
+        self.strVIN = self.__readVIN()
+        if self.strVIN is None :
+            return False
+
+        dictEntry = self.cache.load(self.strVIN, self.getProtocolID(), self.interface.getECUMap())
+        if dictEntry is None :
+            return False
+
+        for strName in dictEntry["commands"] :
+            if strName in self.CMDS :
+                self.listCommandsSupported.add(self.CMDS[strName])
+        for strName, (strData, iECU) in dictEntry["pids"].items() :
+            if strName in self.CMDS :
+                message = Message([])
+                message.baData = bytearray.fromhex(strData)
+                message.iECU = iECU
+                self.__dictPIDMessages[ self.CMDS[strName] ] = message
+
+        logger.info("Loaded %d supported commands from the capability cache for VIN %s." %
+                    (len(self.listCommandsSupported), self.strVIN))
+        return True
+
+    def __storeCachedCmds(self):
+        """
+        Store the discovered commands in the capability cache.
+        """
+
+        if self.status() != ConnectionStatus.VEHICLE or self.cache is None or self.strVIN is None :
+            return
+
+        self.cache.store(
+            self.strVIN,
+            self.getProtocolID(),
+            self.interface.getBaudRate(),
+            self.interface.getECUMap(),
+            [ cmd.strName for cmd in self.listCommandsSupported ],
+            { cmd.strName : [ message.baData.hex(), message.iECU ] for cmd, message in self.__dictPIDMessages.items() },
+        )
+
     def __setHeader(self, header):
         """
         Set the default header for commands.
@@ -225,12 +359,45 @@ class OBD2Connector(object):
         # Set the new header as the last header...
         self.__baLastHeader = header
 
+    def enableTiming(self, bEnable:bool = True):
+        """
+        Turn the per-stage query timing on or off (see QueryTimer).
+
+        Turning it off drops the collected timings.
+        """
+
+        if bEnable and self.timer is None :
+            self.timer = QueryTimer()
+        elif not bEnable :
+            self.timer = None
+        if self.interface is not None :
+            self.interface.timer = self.timer
+
+    def getTimings(self) -> dict:
+        """
+        Return the per-stage query timings of each command (see QueryTimer.getStats()).
+        """
+
+        return self.timer.getStats() if self.timer is not None else {}
+
+    def getTimingReport(self) -> list[str]:
+        """
+        Return the per-stage query timings as lines of a text table (see QueryTimer.getReport()).
+        """
+
+        return self.timer.getReport() if self.timer is not None else []
+
+    def resetTimings(self):
+        if self.timer is not None :
+            self.timer.reset()
+
     def close(self):
         """
         Closes the connection and clears supported commands.
         """
 
         self.listCommandsSupported = set()
+        self.__dictPIDMessages = {}
 
         if self.interface is not None :
             logger.info("Closing connection")
@@ -345,7 +512,7 @@ class OBD2Connector(object):
             return False
 
         # Mode 6 is only implemented for the CAN protocols...
-        if cmd.mode == 6 and self.interface.getProtocolID() not in ["6", "7", "8", "9"] :
+        if cmd.mode == 6 and self.interface.getProtocolID() not in self.CAN_PROTOCOL_IDS :
             if bWarn :
                 logger.warning("Mode 6 commands are ONLY supported over CAN protocols!")
             return False
@@ -362,11 +529,25 @@ class OBD2Connector(object):
             logger.warning("Unconnected: No connection available!")
             return respNull
 
+        # PID listing results don't change while connected, so answer them from memory...
+        if cmd in self.__dictPIDMessages :
+            messagePID = self.__dictPIDMessages[cmd]
+            message = Message(messagePID.listFrames)
+            message.baData = bytearray(messagePID.baData)
+            message.iECU = messagePID.iECU
+            return cmd([message])
+
         # If the user is NOT forcing the command and the command is not usable...
         if not bForce and not self.isCmdUsable(cmd, False) :
             return respNull # ...nothing to do
 
+        timer = self.timer
+        if timer is not None :
+            timer.begin(cmd.strName)
+            timer.hold() # ...the header switch is a request of its own
         self.__setHeader(cmd.bsHeader)
+        if timer is not None :
+            timer.release("header")
 
         logger.info("Sending command: %s" % str(cmd))
         bytesCmd = self.__buildCmdString(cmd)
@@ -379,14 +560,187 @@ class OBD2Connector(object):
             self.__baLastCommand = bytesCmd
 
         # If the command has an unknown frame count, log it so we can specify it next time...
-        if cmd not in self.__dictFrameCounts :
+        # NOTE: An empty response (NO DATA) says nothing about the frame count
+        if messages and cmd not in self.__dictFrameCounts :
             self.__dictFrameCounts[cmd] = sum([len(msg.listFrames) for msg in messages])
 
         if not messages :
             logger.warn("No valid OBD Messages returned!")
+            if timer is not None :
+                timer.end()
             return respNull
 
-        return cmd(messages)  # ...compute a response object
+        response = cmd(messages)  # ...compute a response object
+        if timer is not None :
+            timer.mark("decode")
+            timer.end()
+        return response
+
+    def query_many(self, cmds:list[Command], bForce=False) -> dict[Command, Response]:
+        """
+        Send commands to the vehicle with protection against unsupported commands.
+
+        On the CAN protocols, Mode 1 PID commands sharing a header are packed up to MAX_PIDS_PER_QUERY
+        per request and the combined response is split back out per command. All other commands are
+        sent one at a time.
+
+        Return a dict of Response objects keyed by Command.
+        """
+
+        dictResponses : dict[Command, Response] = {}
+        if self.status() == ConnectionStatus.NONE :
+            logger.warning("Unconnected: No connection available!")
+            for cmd in cmds :
+                dictResponses[cmd] = Response()
+            return dictResponses
+
+        # Sort the commands into batches by header...
+        dictBatches : dict[bytes, list[Command]] = {}
+        for cmd in cmds :
+            if cmd in dictResponses :
+                continue # ...duplicate
+
+            # If the user is NOT forcing the command and the command is not usable...
+            if not bForce and not self.isCmdUsable(cmd, False) :
+                dictResponses[cmd] = Response() # ...nothing to do
+                continue
+
+            if self.isBatchable(cmd, self.interface.getProtocolID()) :
+                listBatch = dictBatches.setdefault(cmd.bsHeader, [])
+                if cmd not in listBatch :
+                    listBatch.append(cmd)
+            else :
+                # NOTE: Only use the blocking OBD2Connector.query() (see __loadCmds())
+                dictResponses[cmd] = OBD2Connector.query(self, cmd, bForce=True)
+
+        # Send the batches...
+        for listBatch in dictBatches.values() :
+            for iIndex in range(0, len(listBatch), self.MAX_PIDS_PER_QUERY) :
+                listCmds = listBatch[iIndex : iIndex + self.MAX_PIDS_PER_QUERY]
+                if len(listCmds) == 1 :
+                    dictResponses[ listCmds[0] ] = OBD2Connector.query(self, listCmds[0], bForce=True)
+                else :
+                    dictResponses.update( self.__queryBatch(listCmds) )
+
+        return dictResponses
+
+    @classmethod
+    def isBatchable(cls, cmd:Command, strProtocolID:str):
+        """
+        Can the command be packed with other commands into a single request on the protocol?
+        """
+
+        return (
+            cmd.mode == 1 and
+            len(cmd.bsCmdID) == 4 and
+            cmd.iBytes > 2 and
+            strProtocolID in cls.CAN_PROTOCOL_IDS
+        )
+
+    def __queryBatch(self, cmds:list[Command]) -> dict[Command, Response]:
+        """
+        Send several Mode 1 PID commands in a single request and split the response by PID.
+        """
+
+        timer = self.timer
+        if timer is not None :
+            timer.begin( "+".join( [ cmd.strName for cmd in cmds ] ) )
+            timer.hold() # ...the header switch is a request of its own
+        self.__setHeader(cmds[0].bsHeader)
+        if timer is not None :
+            timer.release("header")
+
+        logger.info("Sending commands: %s" % ", ".join( [ str(cmd) for cmd in cmds ] ))
+
+        bytesBatch = self.buildBatchCmd(cmds)
+        bytesCmd = bytesBatch
+        if self.bFast and all(cmd.bFast for cmd in cmds) and (bytesBatch in self.__dictFrameCounts) :
+            bytesCmd += self.getFrameCountSuffix(self.__dictFrameCounts[bytesBatch])
+        if self.bFast and (bytesCmd == self.__baLastCommand) :
+            bytesCmd = b""
+
+        messages = self.interface.send_and_parse(bytesCmd)
+
+        # If the command is new, note it...
+        if bytesCmd :
+            self.__baLastCommand = bytesCmd
+
+        # If the batch has an unknown frame count, log it so we can specify it next time...
+        if messages and bytesBatch not in self.__dictFrameCounts :
+            self.__dictFrameCounts[bytesBatch] = sum([len(msg.listFrames) for msg in messages])
+
+        if not messages :
+            logger.warn("No valid OBD Messages returned!")
+
+        dictMessages = self.splitBatchMessages(cmds, messages)
+
+        # Decode each command's messages into a response object...
+        dictResponses = { cmd : cmd(dictMessages[cmd]) for cmd in cmds }
+        if timer is not None :
+            timer.mark("decode")
+            timer.end()
+        return dictResponses
+
+    @classmethod
+    def buildBatchCmd(cls, cmds:list[Command]) -> bytes:
+        """
+        Assemble the command string of a batched Mode 1 request: the mode followed by each PID.
+            Example: 01 0C 0D 05
+        """
+
+        return b"01" + b"".join( [ cmd.bsCmdID[2:] for cmd in cmds ] )
+
+    @classmethod
+    def splitBatchMessages(cls, cmds:list[Command], messages:list[Message]) -> dict[Command, list[Message]]:
+        """
+        Split the messages of a batched Mode 1 request into messages per command.
+
+        Return a dict of Message lists keyed by Command.
+        """
+
+        #
+        # Split each ECU's response into a message per PID...
+        #
+        # Each ECU responds once with the mode followed by the PID and data for each PID it supports:
+        #   41 0C 1A F8 0D 32 05 7B
+        #      [PID+Data] [   ] [   ]
+        # Each PID's data size is known from its command's byte count (which includes the mode and PID).
+        #   41 0C 1A F8 --> RPM
+        #   41 0D 32    --> SPEED
+        #   41 05 7B    --> COOLANT_TEMP
+        dictPIDs : dict[int, Command] = { cmd.pid : cmd for cmd in cmds }
+        dictMessages : dict[Command, list[Message]] = { cmd : [] for cmd in cmds }
+        for message in messages or [] :
+            baData = message.baData
+            if len(baData) < 2 or baData[0] != 0x41 :
+                continue # ...not a Mode 1 response
+
+            iIndex = 1
+            while iIndex < len(baData) :
+                cmd = dictPIDs.get(baData[iIndex])
+                if cmd is None :
+                    # The data size of an unexpected PID is unknown, so the rest can't be split...
+                    logger.debug("Unexpected PID %02X in batch response. Dropping the remainder..." % baData[iIndex])
+                    break
+                iEnd = iIndex + cmd.iBytes - 1
+                messagePID = Message(message.listFrames)
+                messagePID.iECU = message.iECU
+                messagePID.baData = baData[0:1] + baData[iIndex:iEnd]
+                dictMessages[cmd].append(messagePID)
+                iIndex = iEnd
+
+        return dictMessages
+
+    @classmethod
+    def getFrameCountSuffix(cls, iCount:int) -> bytes:
+        """
+        Return the response count suffix for a command string.
+
+        The ELM327 takes a single hex digit (1 - F) after the data bytes. A longer suffix would be
+        read as another data byte, so other counts get no suffix.
+        """
+
+        return (b"%X" % iCount) if 1 <= iCount <= 15 else b""
 
     def __buildCmdString(self, cmd:Command):
         """
@@ -399,7 +753,7 @@ class OBD2Connector(object):
         # only wait for exactly that number. This avoids some harsh
         # timeouts from the ELM, thus speeding up queries.
         if self.bFast and cmd.bFast and (cmd in self.__dictFrameCounts) :
-            bytesCmd += str(self.__dictFrameCounts[cmd]).encode()
+            bytesCmd += self.getFrameCountSuffix(self.__dictFrameCounts[cmd])
 
         # If we sent the command last time, just send a CR...
         # NOTE: The CR is added by the ELM327 class
@@ -29,9 +29,13 @@
 import time
 import threading
 import logging
+import queue
+from types import MappingProxyType
 
 from .Response import Response
 from .OBD2Connector import OBD2Connector
+from .CommandScheduler import CommandScheduler
+from .CallbackDispatcher import CallbackDispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -41,25 +45,53 @@ class OBD2ConnectorAsync(OBD2Connector):
     Class representing an OBD-II connection with it's assorted commands and sensors.
 
     This class uses an asynchronous value reporting process.
+
+    Watched commands are sent by a deadline scheduler (see CommandScheduler). Each command can be
+    given a target rate and a priority; commands without a rate are sent every fDelayCmds seconds.
+
+    Callbacks are run off the polling thread by a dispatcher (see CallbackDispatcher). Any object
+    with dispatch(callback, response), remove(callback, cmd=None) and shutdown() methods can be
+    given instead.
     """
 
     def __init__(self, strPort:str = "", iBaudRate:int = 0, strProtocol:str = "", bFast:bool = True,
                  fTimeout:float = 0.1, bCheckVoltage:bool = True, bStartLowPower:bool = False,
-                 fDelayCmds:float = 0.25):
+                 fDelayCmds:float = 0.25, dispatcher = None, cache = None,
+                 adapterCache = None):
         self.__thread = None
+        # NOTE: Set before connecting, since a failed connect calls close()...
+        self.__bOwnDispatcher = dispatcher is None
+        self.__dispatcher = CallbackDispatcher() if dispatcher is None else dispatcher
         super(OBD2ConnectorAsync, self).__init__(
-            strPort, iBaudRate, strProtocol, bFast, fTimeout, bCheckVoltage, bStartLowPower
+            strPort, iBaudRate, strProtocol, bFast, fTimeout, bCheckVoltage, bStartLowPower, cache,
+            adapterCache
         )
-        self.__dictCommands = {}   # key = OBDCommand, value = Response
-        self.__dictCallbacks = {}  # key = OBDCommand, value = list of Functions
+        # NOTE: The watched commands, their latest responses, and their callbacks are published as
+        #       read-only snapshots. Writers copy, modify, and rebind a snapshot under the write lock.
+        #       Readers just take the current reference, so they never lock and always see a
+        #       consistent view.
+        self.__lockWrite = threading.Lock()
+        self.__dictCommands = MappingProxyType({})   # key = OBDCommand, value = Response
+        self.__dictCallbacks = MappingProxyType({})  # key = OBDCommand, value = tuple of Functions
+        self.__iVersion = 0                          # ...incremented on every snapshot publish
+        self.__queueChanges = queue.SimpleQueue()    # ...scheduler changes for the daemon thread
         self.__bRunning = False
         self.__bWasRunning = False  # used with __enter__() and __exit__()
         self.__fDelayCmds = fDelayCmds
+        self.__scheduler = CommandScheduler(fDelayCmds)
 
     @property
     def running(self):
         return self.__bRunning
 
+    @property
+    def version(self):
+        """
+        The snapshot version. It changes whenever new responses or watched commands are published.
+        """
+
+        return self.__iVersion
+
     def start(self):
         """
         Start the async update loop.
@@ -124,82 +156,117 @@ class OBD2ConnectorAsync(OBD2Connector):
         """
 
         self.stop()
+        if self.__bOwnDispatcher:
+            self.__dispatcher.shutdown()
         super(OBD2ConnectorAsync, self).close()
 
-    def watch(self, cmd, callback=None, force=False):
+    def watch(self, cmd, callback=None, force=False, fRate:float=None, iPriority:int=0):
         """
         Watch the given command for continuous updating.
 
         When watched, query() will return that command's latest value.
         Optional callbacks can be given which will be fired upon every new value.
+        The optional rate (Hz) and priority set how often and how urgently the command is sent.
+        Watching a watched command again updates its rate and priority.
+        Commands can be watched while running.
         """
 
-        # Don't change the dict while the daemon thread is iterating...
-        if self.__bRunning:
-            logger.warning("Can't watch() while running, please use stop()")
-            return
-
         if not force and not self.isCmdUsable(cmd, False):
             # self.test_cmd() will print warnings
             return
 
-        # Create new command being watched, store the command...
-        if cmd not in self.__dictCommands:
-            logger.info("Watching command: %s" % str(cmd))
-            self.__dictCommands[cmd] = Response()  # ...give it an initial value
-            self.__dictCallbacks[cmd] = []  # ...create an empty list
+        with self.__lockWrite:
+            dictCommands = self.__dictCommands
+            dictCallbacks = self.__dictCallbacks
+
+            # Create new command being watched, store the command...
+            if cmd not in dictCommands:
+                logger.info("Watching command: %s" % str(cmd))
+                dictCommands = dict(dictCommands)
+                dictCommands[cmd] = Response()  # ...give it an initial value
+                dictCallbacks = dict(dictCallbacks)
+                dictCallbacks[cmd] = ()  # ...create an empty list
+
+            # If a callback was given, push it...
+            if hasattr(callback, "__call__") and (callback not in dictCallbacks[cmd]):
+                logger.info("subscribing callback for command: %s" % str(cmd))
+                dictCallbacks = dict(dictCallbacks)
+                dictCallbacks[cmd] = dictCallbacks[cmd] + (callback,)
 
-        # If a callback was given, push it...
-        if hasattr(callback, "__call__") and (callback not in self.__dictCallbacks[cmd]):
-            logger.info("subscribing callback for command: %s" % str(cmd))
-            self.__dictCallbacks[cmd].append(callback)
+            self.__publish(dictCommands, dictCallbacks)
+            self.__queueChanges.put( (self.__scheduler.add, (cmd, fRate, iPriority, time.monotonic())) )
 
     def unwatch(self, cmd, callback=None):
         """
         Stop watching a specific command (and optionally, a specific callback) being updated.
 
         If no callback is specified, all callbacks for that command are dropped.
+        Commands can be unwatched while running.
         """
 
-        # Don't change the dict while the daemon thread is iterating...
-        if self.__bRunning:
-            logger.warning("Can't unwatch() while running, please use stop()")
-            return
-
         logger.info("Unwatching command: %s" % str(cmd))
 
-        if cmd in self.__dictCommands:
+        with self.__lockWrite:
+            if cmd not in self.__dictCommands:
+                return
+
+            dictCommands = self.__dictCommands
+            dictCallbacks = dict(self.__dictCallbacks)
             bRemoveCmd = True
+            tupDropped = dictCallbacks[cmd]  # ...the callbacks to drop
             # If a callback was specified...
-            if hasattr(callback, "__call__") and (callback in self.__dictCallbacks[cmd]):
+            if hasattr(callback, "__call__") and (callback in dictCallbacks[cmd]):
                 bRemoveCmd = False
+                tupDropped = (callback,)
                 # ...remove the callback...
-                self.__dictCallbacks[cmd].remove(callback)
+                dictCallbacks[cmd] = tuple( [ func for func in dictCallbacks[cmd] if func != callback ] )
 
                 # If all callbacks have been removed...
-                if len(self.__dictCallbacks[cmd]) == 0:
+                if len(dictCallbacks[cmd]) == 0:
                     bRemoveCmd = True
 
             # If complete removal is indicated...
             if bRemoveCmd:
                 # ...remove the command from callbacks...
-                self.__dictCallbacks.pop(cmd, None)
-                    # ...remove the command entirely...
-                self.__dictCommands.pop(cmd, None)
+                dictCallbacks.pop(cmd, None)
+                # ...remove the command entirely...
+                dictCommands = dict(dictCommands)
+                dictCommands.pop(cmd, None)
+                self.__queueChanges.put( (self.__scheduler.remove, (cmd,)) )
+
+            # Drop the pending responses of the dropped callbacks: all of them, or only the command's
+            #   when the callback still watches another command...
+            for func in tupDropped:
+                if any( [ func in tupCallbacks for tupCallbacks in dictCallbacks.values() ] ):
+                    self.__dispatcher.remove(func, cmd)
+                else:
+                    self.__dispatcher.remove(func)
+
+            self.__publish(dictCommands, dictCallbacks)
 
     def unwatch_all(self):
         """
         Stop watching all commands and callbacks being updated.
         """
 
-        # Don't change the dict while the daemon thread is iterating...
-        if self.__bRunning:
-            logger.warning("Can't unwatch_all() while running, please use stop()")
-            return
-
         logger.info("Unwatching all commands")
-        self.__dictCommands = {}
-        self.__dictCallbacks = {}
+        with self.__lockWrite:
+            # ...drop the pending responses of every callback (the dispatcher may be shared)...
+            for callback in set( [ func for tupCallbacks in self.__dictCallbacks.values() for func in tupCallbacks ] ):
+                self.__dispatcher.remove(callback)
+            self.__publish({}, {})
+            self.__queueChanges.put( (self.__scheduler.clear, ()) )
+
+    def __publish(self, dictCommands, dictCallbacks):
+        """
+        Publish new snapshots. The caller must hold the write lock.
+        """
+
+        if not isinstance(dictCallbacks, MappingProxyType):
+            self.__dictCallbacks = MappingProxyType(dictCallbacks)
+        if not isinstance(dictCommands, MappingProxyType):
+            self.__dictCommands = MappingProxyType(dictCommands)
+        self.__iVersion += 1
 
     def query(self, cmd, force=False):
         """
@@ -208,38 +275,91 @@ class OBD2ConnectorAsync(OBD2Connector):
         Only commands that have been watched will return valid responses
         """
 
-        if cmd in self.__dictCommands:
-            return self.__dictCommands[cmd]
-        else:
-            return Response()
+        return self.__dictCommands.get(cmd) or Response()
 
-    def run(self):
+    def snapshot(self):
         """
-        The Daemon Thread for the asynchronous process.
+        Return a consistent, read-only view of the latest responses of all watched commands.
+
+        The view is a mapping keyed by Command. It does not change; call again for newer values.
         """
 
-        # Loop until the stop signal is received...
-        while self.__bRunning:
+        return self.__dictCommands
+
+    def getRates(self) -> dict:
+        """
+        Return the requested and achieved rates (Hz) of the watched commands.
+
+        Return a dict of 2-tuples ( Requested Rate (float), Achieved Rate (float or None) ) keyed by Command.
+        """
+
+        return self.__scheduler.getRates()
+
+    def getCallbackStats(self) -> dict:
+        """
+        Return the delivery statistics of the callbacks (see CallbackDispatcher.getStats()).
+        """
 
-            if len(self.__dictCommands) > 0:
-                # Loop over the requested commands: send and collect the response...
-                for c in self.__dictCommands:
-                    if not self.isConnected():
-                        logger.info("Async thread terminated because device disconnected")
-                        self.__bRunning = False
-                        self.__thread = None
-                        return
+        return self.__dispatcher.getStats()
 
-                    # Force, since commands are checked for support in watch()...
-                    r = super(OBD2ConnectorAsync, self).query(c, bForce=True)
+    def __applyChanges(self, fWait:float = None):
+        """
+        Apply queued scheduler changes from the watch functions, waiting up to fWait seconds for one.
+        """
 
-                    # Store the response...
-                    self.__dictCommands[c] = r
+        try:
+            funcChange, tupArgs = self.__queueChanges.get(timeout=fWait) if fWait else self.__queueChanges.get_nowait()
+            funcChange(*tupArgs)
+            while True:
+                funcChange, tupArgs = self.__queueChanges.get_nowait()
+                funcChange(*tupArgs)
+        except queue.Empty:
+            pass
+
+    def run(self):
+        """
+        The Daemon Thread for the asynchronous process.
+        """
 
-                    # Fire the callbacks, if there are any...
-                    for callback in self.__dictCallbacks[c]:
-                        callback(r)
-                time.sleep(self.__fDelayCmds)
+        # Loop until the stop signal is received...
+        while self.__bRunning:
+            self.__applyChanges()
+
+            if len(self.__scheduler) > 0:
+                if not self.isConnected():
+                    logger.info("Async thread terminated because device disconnected")
+                    self.__bRunning = False
+                    self.__thread = None
+                    return
+
+                # Wait for the next command to come due (or for a watch change)...
+                fNow = time.monotonic()
+                listCmds = self.__scheduler.popDue(self.MAX_PIDS_PER_QUERY, fNow)
+                if not listCmds:
+                    fWait = self.__scheduler.getWait(fNow)
+                    self.__applyChanges(min(fWait if fWait is not None else 0.25, 0.25))
+                    continue
+
+                # Send the due commands (batched where possible) and collect the responses...
+                # NOTE: Force, since commands are checked for support in watch()...
+                dictResponses = self.query_many(listCmds, bForce=True)
+                self.__scheduler.complete(listCmds, time.monotonic())
+
+                # Store the responses of the still watched commands...
+                with self.__lockWrite:
+                    dictCommands = dict(self.__dictCommands)
+                    for c, r in dictResponses.items():
+                        if c in dictCommands:
+                            dictCommands[c] = r
+                    self.__publish(dictCommands, self.__dictCallbacks)
+
+                    # Queue the callbacks, if there are any...
+                    # NOTE: Queue under the write lock (dispatch() never blocks on a callback), so an
+                    #       unwatch() cannot slip between reading the callbacks and queueing to them
+                    dictCallbacks = self.__dictCallbacks
+                    for c, r in dictResponses.items():
+                        for callback in dictCallbacks.get(c, ()):
+                            self.__dispatcher.dispatch(callback, r)
 
             else:
-                time.sleep(0.25)  # ...idle
+                self.__applyChanges(0.25)  # ...idle
@@ -0,0 +1,646 @@
+############################################################################
+#
+# Python Onboard Diagnostics II Advanced
+#
+# OBD2ConnectorAsyncIO.py
+#
+# Copyright 2021-2023 Keven L. Ates (atescomp@gmail.com)
+#
+# This file is part of the Onboard Diagnostics II Advanced (pyOBDA) system.
+#
+# pyOBDA is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# pyOBDA is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyOBDA; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+############################################################################
+
+import asyncio
+import time
+import logging
+
+import serial
+
+from .ConnectionStatus import ConnectionStatus
+from .Command import Command
+from .CommandList import CommandList
+from .CommandScheduler import CommandScheduler
+from .ELM327 import ELM327
+from .OBD2Connector import OBD2Connector
+from .Response import Response
+from .Protocols.ECU import ECU
+from .Protocols.Unknown import UnknownProtocol
+
+logger = logging.getLogger(__name__)
+
+
+class OBD2ConnectorAsyncIO:
+    """
+    Class representing an OBD-II connection for asyncio applications.
+
+    The adapter is driven from the event loop, so no threads are used:
+        Serial ports (and pseudo terminals) are watched with loop.add_reader() (POSIX only).
+        "socket://host:port" (WiFi adapters) use an asyncio stream connection.
+
+    The ELM327 command and prompt handling, protocol parsers, and command decoders are shared with
+    the blocking connectors. Each request (header, command, and response up to the prompt) holds a
+    lock, so concurrent queries never interleave on the wire. If a request is cancelled or times out
+    before its prompt arrives, the next request first drains the adapter up to the prompt.
+
+    Use:
+        conn = await OBD2ConnectorAsyncIO.connect("/dev/ttyUSB0")
+        response = await conn.query(conn.CMDS.RPM)
+        async for response in conn.stream(conn.CMDS.SPEED, fRate=10):
+            ...
+        await conn.close()
+    """
+
+    def __init__(self, bFast:bool = True, fTimeout:float = 0.1):
+        self.CMDS = CommandList()
+        self.listCommandsSupported:set = set(self.CMDS.getBaseCmds())
+        self.bFast:bool = bFast  # ...switch to allow optimizations
+        self.fTimeout:float = fTimeout
+        self.__strStatus = ConnectionStatus.NONE
+        self.__strPortName = ""
+        self.__objProtocol = UnknownProtocol([])
+        self.__objPort = None     # ...serial port (serial transport)
+        self.__writer = None      # ...stream writer (socket transport)
+        self.__reader:asyncio.StreamReader = None
+        self.__lock = asyncio.Lock()
+        self.__bResync = False    # ...a request ended before its prompt
+        self.__baLastCommand:bytes = b""  # ...store previous command to run with a CR
+        self.__baLastHeader:bytes = ECU.HEADER.ENGINE  # ...to compare with previously used header
+        self.__dictFrameCounts:dict = {}  # ...count the number of return frames for each command
+
+        # Watched streams...
+        self.__scheduler = CommandScheduler()
+        self.__dictResponses:dict = {}  # key = Command, value = latest Response
+        self.__dictStreams:dict = {}    # key = Command, value = list of asyncio.Queue
+        self.__eventWake = asyncio.Event()
+        self.__taskPoll:asyncio.Task = None
+
+    @classmethod
+    async def connect(cls, strPort:str = "", iBaudRate:int = 0, strProtocol:str = "", bFast:bool = True,
+                      fTimeout:float = 0.1, bCheckVoltage:bool = True):
+        """
+        Create a connector and connect it to an ELM327 device.
+
+        Without a port, the serial ports are scanned and probed, and the fastest responding ELM327 is used.
+        """
+
+        conn = cls(bFast, fTimeout)
+        logger.info("=== OBD-II Connector (asyncio) ===")
+        if strPort == "" or strPort is None or strPort.startswith("Auto"):
+            logger.info("Scanning for serial ports...")
+            loop = asyncio.get_running_loop()
+            astrPortNames = await loop.run_in_executor(None, OBD2Connector.scanSerialPorts)
+            logger.info("Available ports: " + str(astrPortNames))
+            # Probe all ports at once and try the fastest responding ELM first...
+            listRanked = await loop.run_in_executor(None, OBD2Connector.rankSerialPorts, astrPortNames, iBaudRate)
+            logger.info("Responding ports: " + str( [ tupRank[0] for tupRank in listRanked ] ))
+            for strPort, iProbedBaud, fSeconds, strIdent in listRanked:
+                await conn.open(strPort, iBaudRate if iBaudRate else iProbedBaud, strProtocol, bCheckVoltage)
+                # NOTE: The statuses are strings, so test for NONE rather than ordering them
+                # NOTE: A failed open() closes its own transport
+                if conn.status() != ConnectionStatus.NONE:
+                    break
+        else:
+            await conn.open(strPort, iBaudRate, strProtocol, bCheckVoltage)
+
+        if conn.status() == ConnectionStatus.VEHICLE:
+            await conn.__loadCmds()
+        logger.info("==================================")
+        return conn
+
+    #
+    # Transport
+    #
+
+    async def __openTransport(self, strPort:str, iBaudRate:int):
+        if strPort.startswith("socket://"):
+            strHost, _, strNetPort = strPort[len("socket://"):].partition(":")
+            self.__reader, self.__writer = await asyncio.open_connection(strHost, int(strNetPort))
+        else:
+            self.__objPort = \
+                serial.serial_for_url(
+                    strPort,
+                    baudrate = iBaudRate if iBaudRate else 38400,
+                    bytesize = 8,
+                    parity = serial.PARITY_NONE,
+                    stopbits = 1,
+                    timeout = 0 # ...non-blocking, the event loop waits
+                )
+            self.__reader = asyncio.StreamReader()
+            asyncio.get_running_loop().add_reader(self.__objPort.fileno(), self.__onReadable)
+        self.__strPortName = strPort
+
+    def __onReadable(self):
+        try:
+            data = self.__objPort.read(self.__objPort.in_waiting or 1)
+        except Exception:
+            logger.critical("Port Read: Device disconnected while reading!")
+            self.__closeTransport()
+            return
+        if data:
+            self.__reader.feed_data(data)
+
+    def __write(self, cmd:bytes) -> bool:
+        cmd += b"\r"  # terminate with carriage return in accordance with ELM327 and STN11XX specifications
+        logger.debug("write: " + repr(cmd))
+        try:
+            if self.__writer is not None:
+                self.__writer.write(cmd)
+            else:
+                self.__objPort.write(cmd)
+        except Exception:
+            logger.critical("Device disconnected while writing")
+            self.__closeTransport()
+            return False
+        return True
+
+    def __closeTransport(self):
+        self.__strStatus = ConnectionStatus.NONE
+        if self.__objPort is not None:
+            try:
+                asyncio.get_running_loop().remove_reader(self.__objPort.fileno())
+            except Exception:
+                pass
+            self.__objPort.close()
+            self.__objPort = None
+        if self.__writer is not None:
+            self.__writer.close()
+            self.__writer = None
+        if self.__reader is not None:
+            self.__reader.feed_eof()
+
+    #
+    # Request Framing
+    #
+
+    async def __readPrompt(self, fWait:float) -> bytes:
+        """
+        Read up to and including the prompt. Raise asyncio.TimeoutError on silence past the wait.
+        """
+
+        return await asyncio.wait_for(self.__reader.readuntil(ELM327.ELM_PROMPT_BYTES), fWait)
+
+    async def __resync(self):
+        """
+        Drain the response of an abandoned request up to its prompt.
+        """
+
+        logger.debug("Resynchronizing with the adapter...")
+        self.__baLastCommand = b""  # ...the adapter's last command is unknown, so never repeat it
+        try:
+            await self.__readPrompt(ELM327._WAIT_NORMAL)
+        except asyncio.TimeoutError:
+            pass # ...nothing pending
+        self.__bResync = False
+
+    async def __sendLocked(self, cmd:bytes, fWait = ELM327._WAIT_NORMAL) -> list[str]:
+        """
+        Send a command string and read its response. The caller must hold the request lock.
+
+        Return the result, a list of message strings (see ELM327.splitLines()).
+        """
+
+        if self.__reader is None:
+            logger.info("Unconnected: Cannot send!")
+            return []
+
+        if self.__bResync:
+            await self.__resync()
+
+        self.__bResync = True  # ...until the prompt ends this request
+        if not self.__write(cmd):
+            self.__baLastCommand = b""
+            return []
+        # NOTE: Record the command once written, before awaiting its response. A request cancelled
+        #       while reading must not leave a stale last command, or the next empty repeat (CR)
+        #       would resend the cancelled command.
+        if cmd:
+            self.__baLastCommand = cmd
+        try:
+            bsData = await self.__readPrompt(self.fTimeout if fWait is None else fWait)
+        except asyncio.TimeoutError:
+            logger.warning("Port Read: End - No Prompt!")
+            return []
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError) as err:
+            logger.critical("Port Read: %s" % err)
+            self.__closeTransport()
+            return []
+        self.__bResync = False
+
+        return ELM327.splitLines(bsData)
+
+    async def __send(self, cmd:bytes, fWait = ELM327._WAIT_NORMAL) -> list[str]:
+        async with self.__lock:
+            return await self.__sendLocked(cmd, fWait)
+
+    async def __sendAndParseLocked(self, cmd:bytes):
+        astrLines = await self.__sendLocked(cmd)
+
+        # If the prompt ends the last line, remove it...
+        if len(astrLines) > 0 and astrLines[-1].endswith( ELM327.ELM_PROMPT ):
+            astrLines[-1] = astrLines[-1][:-1]
+        # If the last line is now empty, remove it...
+        if len(astrLines) > 0 and len(astrLines[-1]) == 0:
+            astrLines = astrLines[:-1]
+
+        return self.__objProtocol(astrLines)
+
+    async def __setHeaderLocked(self, header:bytes):
+        """
+        Set the default header for commands. The caller must hold the request lock.
+        """
+
+        if header == self.__baLastHeader:
+            return # ...nothing to do
+
+        listMsg = await self.__sendAndParseLocked(b'AT SH ' + header + b' ')
+        if not listMsg or "".join( [msg.raw() for msg in listMsg] ) != "OK":
+            logger.info("Set Header ('AT SH %s') did not return 'OK'", header)
+            return
+
+        self.__baLastHeader = header
+
+    #
+    # Adapter Setup
+    #
+
+    async def open(self, strPort:str, iBaudRate:int = 0, strProtocol:str = "", bCheckVoltage:bool = True):
+        """
+        Open the port and initialize the ELM327 (see ELM327.__init__() for the sequence).
+        """
+
+        logger.info("Initializing ELM327: PORT=%s BAUD=%s PROTOCOL=%s" %
+                    (strPort, "Auto" if iBaudRate == 0 else str(iBaudRate), strProtocol or "Auto"))
+
+        try:
+            await self.__openTransport(strPort, iBaudRate)
+        except (serial.SerialException, OSError, ValueError) as err:
+            logger.error(str(err))
+            self.__closeTransport()
+            return
+
+        if self.__objPort is not None and iBaudRate == 0 and not strPort.startswith("/dev/pts"):
+            if not await self.__findBaudRate():
+                logger.error("Set Baud Rate FAILED!")
+                self.__closeTransport()
+                return
+
+        await self.__send(b"AT Z", ELM327._WAIT_RESET)  # ...ignore return data as it can be junk bits
+
+        for cmd, bEcho in [ (b"AT E0", True), (b"AT H1", False), (b"AT L0", False) ]:
+            if not ELM327.isOK(await self.__send(cmd), expectEcho=bEcho):
+                logger.error("%s did not return 'OK'!" % cmd.decode())
+                self.__closeTransport()
+                return
+
+        results = await self.__send(b"AT @1")
+        if len(results) == 0 or results[0] == '':
+            logger.error("AT @1 (Device Description) did not respond!")
+            self.__closeTransport()
+            return
+
+        # Communication with the ELM at this point is successful...
+        self.__strStatus = ConnectionStatus.ELM
+
+        if bCheckVoltage:
+            results = await self.__send(b"AT RV")
+            try:
+                if len(results) == 0 or float(results[0].lower().replace('v', '')) < 6.0:
+                    logger.error("AT RV (ELM Volts) too low ( < 6.0 ) or missing!")
+                    self.__closeTransport()
+                    return
+            except ValueError:
+                logger.error("AT RV (ELM Volts) value error!")
+                self.__closeTransport()
+                return
+            self.__strStatus = ConnectionStatus.OBD
+
+        if await self.__setProtocol(strProtocol):
+            self.__strStatus = ConnectionStatus.VEHICLE
+            logger.info("Adapter connected: Vehicle connected, PORT=%s PROTOCOL=%s" %
+                        (strPort, self.__objProtocol.ELM_ID))
+        else:
+            logger.error("Adapter connected: Vehicle connection FAILED!")
+
+    async def __findBaudRate(self):
+        for iBaud in ELM327._TRY_BAUD_ORDER:
+            logger.debug("Testing baud %d" % iBaud)
+            self.__objPort.baudrate = iBaud
+            self.__objPort.reset_input_buffer()
+            self.__reader = asyncio.StreamReader()  # ...discard anything from the last rate
+            self.__bResync = False
+            response = await self.__send(b"AT WS", 0.5)
+            if response and response[-1].endswith(ELM327.ELM_PROMPT):
+                logger.debug("Selected baud %d" % iBaud)
+                return True
+        return False
+
+    async def __setProtocol(self, strProtocol:str):
+        if strProtocol and strProtocol != "Auto":
+            if strProtocol not in ELM327._SUPPORTED_PROTOCOLS:
+                logger.error("Protocol {:} is not valid!".format(strProtocol))
+                return False
+            listTry = [strProtocol]
+        else:
+            if not ELM327.isOK(await self.__send(b"AT SP0")):
+                logger.error("AT SP0 (Set Protocol Auto) did not return 'OK'!")
+                return False
+            r0100 = await self.__send(b"0100", ELM327._WAIT_SEARCH)
+            if not ELM327.hasErrorMessage(r0100):
+                r = await self.__send(b"AT DPN")
+                strProtoNo = r[0] if r else ""
+                strProtoNo = strProtoNo[1:] if (len(strProtoNo) > 1 and strProtoNo[0] == "A") else strProtoNo
+                if strProtoNo in ELM327._SUPPORTED_PROTOCOLS:
+                    self.__objProtocol = ELM327._SUPPORTED_PROTOCOLS[strProtoNo](r0100)
+                    return True
+            listTry = ELM327._TRY_PROTOCOL_ORDER
+
+        for strProtoNo in listTry:
+            await self.__send(b"AT TP" + strProtoNo.encode())
+            for _ in range(2):  # ...try twice
+                r0100 = await self.__send(b"0100", ELM327._WAIT_SEARCH)
+                if not ELM327.hasErrorMessage(r0100):
+                    self.__objProtocol = ELM327._SUPPORTED_PROTOCOLS[strProtoNo](r0100)
+                    return True
+
+        logger.error("ELM Protocol not found!")
+        return False
+
+    async def __loadCmds(self):
+        """
+        Queries for available PIDs and sets their support status (see OBD2Connector.__loadCmds()).
+        """
+
+        logger.info("Querying for supported commands...")
+        for cmdPID in self.CMDS.getPIDCmds():
+            if not self.isCmdUsable(cmdPID):
+                continue
+
+            response = await self.query(cmdPID)
+            if response.isNull():
+                logger.warning("No valid data for PID listing command: %s" % cmdPID)
+                continue
+
+            for iIndex, bBit in enumerate(response.value):
+                if bBit:
+                    iMode = cmdPID.mode
+                    iPID = cmdPID.pid + iIndex + 1
+                    if self.CMDS.hasPID(iMode, iPID):
+                        self.listCommandsSupported.add(self.CMDS[iMode][iPID])
+                    if iMode == 1 and self.CMDS.hasPID(2, iPID):
+                        self.listCommandsSupported.add(self.CMDS[2][iPID])
+
+        logger.info("Finished querying with %d commands supported." % len(self.listCommandsSupported))
+
+    async def close(self):
+        """
+        Stop streaming, reset the interface, and close the port.
+        """
+
+        self.stop()
+        self.listCommandsSupported = set()
+        if self.__reader is not None and self.__strStatus != ConnectionStatus.NONE:
+            logger.info("Closing connection")
+            async with self.__lock:
+                self.__write(b"AT Z")
+        self.__closeTransport()
+
+    #
+    # Status
+    #
+
+    def status(self):
+        return self.__strStatus
+
+    def isConnected(self):
+        return self.__strStatus == ConnectionStatus.VEHICLE
+
+    def getProtocolName(self):
+        return self.__objProtocol.ELM_NAME
+
+    def getProtocolID(self):
+        return self.__objProtocol.ELM_ID
+
+    def getPortName(self):
+        return self.__strPortName
+
+    def isCmdSupported(self, cmd:Command):
+        return cmd in self.listCommandsSupported
+
+    def isCmdUsable(self, cmd:Command, bWarn=True):
+        """
+        Is a command usable without using force?
+        """
+
+        if not self.isCmdSupported(cmd):
+            if bWarn:
+                logger.warning("Command [%s] is NOT supported!" % str(cmd))
+            return False
+        if cmd.mode == 6 and self.getProtocolID() not in OBD2Connector.CAN_PROTOCOL_IDS:
+            if bWarn:
+                logger.warning("Mode 6 commands are ONLY supported over CAN protocols!")
+            return False
+        return True
+
+    #
+    # Queries
+    #
+
+    def __buildCmdString(self, bytesKey, bytesCmd:bytes, bFast:bool = True):
+        """
+        Assemble the appropriate command string (see OBD2Connector.__buildCmdString()).
+        """
+
+        if self.bFast and bFast and (bytesKey in self.__dictFrameCounts):
+            bytesCmd += OBD2Connector.getFrameCountSuffix(self.__dictFrameCounts[bytesKey])
+        # NOTE: Never repeat while a resync is pending (see __resync())
+        if self.bFast and not self.__bResync and self.__baLastCommand and (bytesCmd == self.__baLastCommand):
+            bytesCmd = b""
+        return bytesCmd
+
+    async def __request(self, bytesKey, bytesFull:bytes, header:bytes, bFast:bool):
+        """
+        Set the header, send a command, and parse the response as one request.
+        """
+
+        async with self.__lock:
+            await self.__setHeaderLocked(header)
+            bytesCmd = self.__buildCmdString(bytesKey, bytesFull, bFast)
+            messages = await self.__sendAndParseLocked(bytesCmd)
+
+        if messages and bytesKey not in self.__dictFrameCounts:
+            self.__dictFrameCounts[bytesKey] = sum([len(msg.listFrames) for msg in messages])
+        if not messages:
+            logger.warning("No valid OBD Messages returned!")
+        return messages
+
+    async def query(self, cmd:Command, bForce=False) -> Response:
+        """
+        Send command to the vehicle with protection against unsupported commands.
+        """
+
+        if self.__strStatus == ConnectionStatus.NONE:
+            logger.warning("Unconnected: No connection available!")
+            return Response()
+        if not bForce and not self.isCmdUsable(cmd):
+            logger.warning("Unsupported command: %s" % str(cmd))
+            return Response()
+
+        logger.info("Sending command: %s" % str(cmd))
+        messages = await self.__request(cmd, cmd.bsCmdID, cmd.bsHeader, cmd.bFast)
+        return cmd(messages)
+
+    async def query_many(self, cmds:list[Command], bForce=False) -> dict[Command, Response]:
+        """
+        Send commands to the vehicle, batching Mode 1 PIDs on CAN (see OBD2Connector.query_many()).
+
+        Return a dict of Response objects keyed by Command.
+        """
+
+        dictResponses : dict[Command, Response] = {}
+        dictBatches : dict[bytes, list[Command]] = {}
+        for cmd in cmds:
+            if cmd in dictResponses:
+                continue
+            if not bForce and not self.isCmdUsable(cmd, False):
+                dictResponses[cmd] = Response()
+            elif OBD2Connector.isBatchable(cmd, self.getProtocolID()):
+                listBatch = dictBatches.setdefault(cmd.bsHeader, [])
+                if cmd not in listBatch:
+                    listBatch.append(cmd)
+            else:
+                dictResponses[cmd] = await self.query(cmd, bForce=True)
+
+        for listBatch in dictBatches.values():
+            for iIndex in range(0, len(listBatch), OBD2Connector.MAX_PIDS_PER_QUERY):
+                listCmds = listBatch[iIndex : iIndex + OBD2Connector.MAX_PIDS_PER_QUERY]
+                if len(listCmds) == 1:
+                    dictResponses[ listCmds[0] ] = await self.query(listCmds[0], bForce=True)
+                    continue
+                bytesBatch = OBD2Connector.buildBatchCmd(listCmds)
+                messages = await self.__request(bytesBatch, bytesBatch, listCmds[0].bsHeader,
+                                                all(cmd.bFast for cmd in listCmds))
+                dictMessages = OBD2Connector.splitBatchMessages(listCmds, messages)
+                for cmd in listCmds:
+                    dictResponses[cmd] = cmd(dictMessages[cmd])
+
+        return dictResponses
+
+    #
+    # Watched Streams
+    #
+
+    def watch(self, cmd:Command, fRate:float = None, iPriority:int = 0, bForce:bool = False):
+        """
+        Poll a command continuously at a target rate (Hz) and priority (see CommandScheduler).
+
+        The latest response is available from latest(). Polling starts with start().
+        """
+
+        if not bForce and not self.isCmdUsable(cmd, False):
+            return
+        self.__scheduler.add(cmd, fRate, iPriority, time.monotonic())
+        self.__dictResponses.setdefault(cmd, Response())
+        self.__eventWake.set()
+
+    def unwatch(self, cmd:Command):
+        self.__scheduler.remove(cmd)
+        self.__dictResponses.pop(cmd, None)
+        for queueStream in self.__dictStreams.pop(cmd, []):
+            if queueStream.full():
+                queueStream.get_nowait()  # ...drop the oldest
+            queueStream.put_nowait(None)  # ...end the stream
+
+    def latest(self, cmd:Command) -> Response:
+        """
+        Return the latest response of a watched command.
+        """
+
+        return self.__dictResponses.get(cmd) or Response()
+
+    def getRates(self) -> dict:
+        return self.__scheduler.getRates()
+
+    async def stream(self, cmd:Command, fRate:float = None, iPriority:int = 0, iQueueSize:int = 16):
+        """
+        Watch a command and iterate over its responses.
+
+        A slow consumer loses the oldest responses, not the polling rate. The stream ends when the
+        command is unwatched. Use contextlib.aclosing() to stop watching on an early break.
+            async with contextlib.aclosing(conn.stream(cmd, fRate=10)) as responses:
+                async for response in responses:
+                    ...
+        """
+
+        queueStream = asyncio.Queue(iQueueSize)
+        self.watch(cmd, fRate, iPriority, bForce=True)
+        self.__dictStreams.setdefault(cmd, []).append(queueStream)
+        self.start()
+        try:
+            while True:
+                response = await queueStream.get()
+                if response is None:
+                    return
+                yield response
+        finally:
+            listStreams = self.__dictStreams.get(cmd)
+            if listStreams is not None and queueStream in listStreams:
+                listStreams.remove(queueStream)
+                if len(listStreams) == 0:
+                    self.unwatch(cmd)
+
+    def start(self):
+        """
+        Start the polling task for the watched commands.
+        """
+
+        if self.__taskPoll is None or self.__taskPoll.done():
+            self.__taskPoll = asyncio.get_running_loop().create_task(self.__poll())
+
+    def stop(self):
+        """
+        Stop the polling task. A request in flight is abandoned and drained by the next request.
+        """
+
+        if self.__taskPoll is not None:
+            self.__taskPoll.cancel()
+            self.__taskPoll = None
+
+    async def __poll(self):
+        while self.isConnected():
+            fNow = time.monotonic()
+            listCmds = self.__scheduler.popDue(OBD2Connector.MAX_PIDS_PER_QUERY, fNow)
+            if not listCmds:
+                fWait = self.__scheduler.getWait(fNow)
+                self.__eventWake.clear()
+                try:
+                    await asyncio.wait_for(self.__eventWake.wait(), 0.25 if fWait is None else min(fWait, 0.25))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            dictResponses = await self.query_many(listCmds, bForce=True)
+            self.__scheduler.complete(listCmds, time.monotonic())
+
+            for cmd, response in dictResponses.items():
+                if cmd not in self.__dictResponses:
+                    continue # ...unwatched while in flight
+                self.__dictResponses[cmd] = response
+                for queueStream in self.__dictStreams.get(cmd, []):
+                    if queueStream.full():
+                        queueStream.get_nowait()  # ...drop the oldest
+                    queueStream.put_nowait(response)
+
+        logger.info("Polling task ended because the device disconnected")
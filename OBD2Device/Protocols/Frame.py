@@ -29,10 +29,14 @@
 
 class Frame(object):
     # A Frame represents a single parsed line of OBD output
+    #
+    # Frames are created for every response line, so they are slotted (no per object dict).
 
-    def __init__(self, strRaw : str):
+    __slots__ = ("strRaw", "baData", "iPriority", "iAddrMode", "iRxID", "iTxID", "iType", "iOrder", "iDataLen")
+
+    def __init__(self, strRaw : str, baData = None):
         self.strRaw : str = strRaw
-        self.baData = bytearray()
+        self.baData = baData if baData is not None else bytearray()  # ...a buffer slice (memoryview) when parsed
         self.iPriority :int = None
         self.iAddrMode : int = None
         self.iRxID : int = None
@@ -0,0 +1,129 @@
+############################################################################
+#
+# Python Onboard Diagnostics II Advanced
+#
+# ISOTP.py
+#
+# Copyright 2021-2023 Keven L. Ates (atescomp@gmail.com)
+#
+# This file is part of the Onboard Diagnostics II Advanced (pyOBDA) system.
+#
+# pyOBDA is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# pyOBDA is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyOBDA; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+############################################################################
+
+import logging
+
+from .Frame import Frame
+from .Message import Message
+
+logger = logging.getLogger(__name__)
+
+
+#
+# Class ISOTPReassembler
+#
+# ISO 15765-2 (ISO-TP) reassembly state machine for parsed CAN frames.
+#
+# Frames are fed one at a time in arrival order. Each transmitter (TxID) has
+# its own reassembly state, so interleaved responses from several ECUs are
+# reassembled independently:
+#   Single Frame (SF)      - returns its message at once
+#   First Frame (FF)       - allocates the message buffer from the FF length
+#                            and copies the FF data
+#   Consecutive Frame (CF) - must carry the next sequence number (1, 2, ...
+#                            0xF, 0x0, 0x1, ...); its data is copied into the
+#                            buffer and the message is returned when the
+#                            buffer is full
+# A CF out of sequence, a CF without a FF or a new FF before the last message
+# completed drops the incomplete message.
+#
+# The returned messages have their frames and data set. The caller tags the
+# ECU (see Protocol.mapECU).
+
+class ISOTPReassembler(object):
+    FRAME_TYPE_SF = 0x00 # ...single frame
+    FRAME_TYPE_FF = 0x10 # ...first frame of multi-frame message
+    FRAME_TYPE_CF = 0x20 # ...consecutive frame(s) of multi-frame message
+
+    def __init__(self):
+        # Reassembly state per TxID: [ frames, buffer, fill index, next sequence number ]
+        self.__dictStreams : dict[int, list] = {}
+
+    def feed(self, frame : Frame) -> Message:
+        # Feed the next frame
+        #
+        # Return the completed message or None.
+
+        if frame.iType == self.FRAME_TYPE_SF:
+            if frame.iTxID in self.__dictStreams:
+                logger.debug("ISO-TP: Single Frame interrupted a MultiFrame. Dropping the MultiFrame...")
+                del self.__dictStreams[frame.iTxID]
+
+            # Extract the data ignoring the PCI byte and any data after
+            #   the length marker...
+            message = Message( [frame] )
+            message.baData = bytearray( frame.baData[ 1:(1 + frame.iDataLen) ] )
+            return message
+
+        if frame.iType == self.FRAME_TYPE_FF:
+            if frame.iTxID in self.__dictStreams:
+                logger.debug("ISO-TP: Multiple frames marked First. Dropping the earlier MultiFrame...")
+
+            # Preallocate the message data from the First Frame length and
+            #   skip the First Frame PCI two bytes...
+            baBuffer = bytearray(frame.iDataLen)
+            viewData = frame.baData[2:2 + frame.iDataLen]
+            baBuffer[ :len(viewData) ] = viewData
+            self.__dictStreams[frame.iTxID] = [ [frame], baBuffer, len(viewData), 1 ]
+            return self.__complete(frame.iTxID)
+
+        # Otherwise, a Consecutive Frame...
+        listStream = self.__dictStreams.get(frame.iTxID)
+        if listStream is None:
+            logger.debug("ISO-TP: Consecutive Frame without a First Frame. Dropping...")
+            return None
+
+        listFrames, baBuffer, iFill, iNext = listStream
+        if frame.iOrder != iNext:
+            logger.debug("ISO-TP: Consecutive Frame out of sequence (%X, expected %X). Dropping the MultiFrame..." %
+                         (frame.iOrder, iNext))
+            del self.__dictStreams[frame.iTxID]
+            return None
+
+        # Copy the data, skipping the Consecutive Frame PCI byte, up to the message length...
+        viewData = frame.baData[1:1 + len(baBuffer) - iFill]
+        baBuffer[ iFill:(iFill + len(viewData)) ] = viewData
+        listFrames.append(frame)
+        listStream[2] = iFill + len(viewData)
+        listStream[3] = (iNext + 1) & 0x0F  # ...the sequence number wraps from 0xF to 0x0
+        return self.__complete(frame.iTxID)
+
+    def __complete(self, iTxID : int) -> Message:
+        listFrames, baBuffer, iFill, _ = self.__dictStreams[iTxID]
+        if iFill < len(baBuffer):
+            return None
+
+        del self.__dictStreams[iTxID]
+        message = Message(listFrames)
+        message.baData = baBuffer
+        return message
+
+    def isPending(self) -> bool:
+        # Is any message incomplete?
+        return bool(self.__dictStreams)
+
+    def reset(self):
+        # Drop all incomplete messages
+        self.__dictStreams = {}
@@ -27,7 +27,6 @@
 ############################################################################
 
 import logging
-from binascii import unhexlify
 
 from .Protocol import Protocol
 from .Frame import Frame
@@ -58,14 +57,8 @@ class LegacyProtocol(Protocol):
         Protocol.__init__(self, listRespLines)
 
     def parseFrameData(self, frame : Frame):
-        strRaw = frame.strRaw
-
-        # If Frame has odd size...
-        if len(strRaw) & 1:
-            logger.debug("Protocol: Frame has odd length. Dropping...")
-            return False
-
-        baRaw = bytearray( unhexlify(strRaw) )
+        # NOTE: Frames with odd size were dropped (see PAD_ODD_FRAMES)
+        baRaw = frame.baData
 
         # If Frame is too short...
         if len(baRaw) < 6:
@@ -83,6 +76,7 @@ class LegacyProtocol(Protocol):
         # ck = checksum byte
 
         # Exclude header and trailing checksum (handled by ELM adapter)
+        # NOTE: The data is a slice of the same buffer
         frame.baData = baRaw[3:-1]
 
         # read header information
@@ -100,7 +94,7 @@ class LegacyProtocol(Protocol):
 
         # Are the frame responses for the same Mode (SID)?
         if len(frames) > 1:
-            if not all( [ iMode == frame.data[0] for frame in frames[1:] ] ):
+            if not all( [ iMode == frame.baData[0] for frame in frames[1:] ] ):
                 logger.debug("Protocol: Frames from multiple commands. Dropping...")
                 return False
 
@@ -136,7 +130,7 @@ class LegacyProtocol(Protocol):
                 # 48 6B 10 41 00 BE 7F B8 13 ck
                 #          [      Data     ]
 
-                message.baData = frames[0].baData
+                message.baData = bytearray(frames[0].baData)
 
             else: # len(frames) > 1:
                 # Generic multiline requests have an Order byte
@@ -158,7 +152,7 @@ class LegacyProtocol(Protocol):
                 frames = sorted( frames, key = lambda frame: frame.baData[2] )
 
                 # Is the data contiguous?
-                listIndices : list[int] = [ frame.data[2] for frame in frames ]
+                listIndices : list[int] = [ frame.baData[2] for frame in frames ]
                 if not self.isContiguousInts(listIndices, 1, len(frames)):
                     logger.debug("Protocol: MultiFrame has missing frames. Dropping...")
                     return False
@@ -166,8 +160,9 @@ class LegacyProtocol(Protocol):
                 #
                 # Accumulate ordered data from each frame...
                 #
-                frames[0].baData.pop(2)  # ...remove the Order byte from the First Frame
-                message.baData = frames[0].baData # ...preserve the First Frame's Mode and PID bytes
+                # Preserve the First Frame's Mode and PID bytes and remove its Order byte...
+                message.baData = bytearray(frames[0].baData[:2])
+                message.baData += frames[0].baData[3:]
 
                 # Add the data from the remaining frames...
                 for frame in frames[1:]:
@@ -34,6 +34,10 @@ from .ECU import ECU
 
 class Message(object):
     # A Message represents a fully parsed OBD message of one or more Frames
+    #
+    # Messages are created for every response, so they are slotted (no per object dict).
+
+    __slots__ = ("listFrames", "iECU", "baData")
 
     def __init__(self, listFrames : list[Frame]):
         self.listFrames = listFrames
@@ -52,7 +56,8 @@ class Message(object):
 
     def raw(self) -> str:
         # Get the original raw input string from the adapter
-        return "\n".join([frame.strRaw for frame in self.listFrames])
+        # NOTE: Parsed frames may have dropped their raw strings (see Protocol.KEEP_RAW)
+        return "\n".join([frame.strRaw for frame in self.listFrames if frame.strRaw is not None])
 
     def isParsed(self):
         # Is message parsed?
@@ -60,9 +65,10 @@ class Message(object):
 
     def __eq__(self, other):
         if isinstance(other, Message):
-            for attr in ["frames", "ecu", "data"]:
-                if getattr(self, attr) != getattr(other, attr):
-                    return False
-            return True
+            return (
+                self.iECU == other.iECU and
+                self.baData == other.baData and
+                [frame.strRaw for frame in self.listFrames] == [frame.strRaw for frame in other.listFrames]
+            )
         else:
             return False
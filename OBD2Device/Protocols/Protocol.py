@@ -49,6 +49,10 @@ logger = logging.getLogger(__name__)
 #
 # Protocols are called ( __call__ ) with a list of response strings
 # and return a list of Messages.
+#
+# All frame lines of a response are converted to bytes at once into a
+# single buffer. Each Frame's data references its slice of the buffer
+# (a memoryview) and each Message copies its assembled data once.
 
 class Protocol(object):
     #
@@ -64,6 +68,17 @@ class Protocol(object):
     TX_ID_ENGINE : int       = None
     TX_ID_TRANSMISSION : int = None
 
+    # Frames with an odd number of hex digits are padded with a leading zero
+    # (for CAN 11 bit headers) or dropped...
+    PAD_ODD_FRAMES : bool = False
+
+    # Keep the raw strings of parsed OBD frames (see Message.raw())?
+    # NOTE: Set False to save memory when many responses are retained (recordings).
+    #       Non-OBD lines (ELM responses such as "OK") always keep their raw strings.
+    KEEP_RAW : bool = True
+
+    _SET_HEX = Utility._SET_HEX
+
     def __init__(self, listRespLines : list[str]):
         #
         # Construct a Protocol Object
@@ -109,10 +124,21 @@ class Protocol(object):
         #       so sort them into two lists.
         linesOBD : list[str] = []
         linesNonOBD : list[str] = []
+        listHex : list[str] = []  # ...the (padded) hex digits of each OBD line
 
+        setHex = self._SET_HEX
         for strLine in listRespLines:
             strLineCondensed = strLine.replace(' ', '')
-            if Utility.isHex(strLineCondensed):
+            if setHex.issuperset(strLineCondensed):
+                # Handle odd size frames...
+                # NOTE: To convert to bytes, an even number of digits is required (2 per byte)
+                if len(strLineCondensed) & 1:
+                    if not self.PAD_ODD_FRAMES:
+                        logger.debug("Protocol: Frame has odd length. Dropping...")
+                        continue
+                    listHex.append("0" + strLineCondensed)
+                else:
+                    listHex.append(strLineCondensed)
                 linesOBD.append(strLineCondensed)
             else:
                 linesNonOBD.append(strLine)  # ...original, un-scrubbed line
@@ -121,37 +147,43 @@ class Protocol(object):
         # Handle Valid OBD Lines
         #
 
-        # Parse each frame (each line)...
+        # Convert all the frame lines at once and slice each frame's raw bytes from the buffer...
         frames : list[Frame] = []
-        for strLine in linesOBD:
-
-            frame = Frame(strLine)
-
-            # Subclass function to parse the lines into Frames...
-            # NOTE: Drop frames that couldn't be parsed.
-            if self.parseFrameData(frame):
-                frames.append(frame)
+        if linesOBD:
+            viewBuffer = memoryview( bytes.fromhex( "".join(listHex) ) )
+            bKeepRaw = self.KEEP_RAW
+            iStart = 0
+            for strLine, strHex in zip(linesOBD, listHex):
+                iEnd = iStart + ( len(strHex) >> 1 )
+                frame = Frame(strLine if bKeepRaw else None, viewBuffer[iStart:iEnd])
+                iStart = iEnd
+
+                # Subclass function to parse the lines into Frames...
+                # NOTE: Drop frames that couldn't be parsed.
+                if self.parseFrameData(frame):
+                    frames.append(frame)
 
         # Group frames by transmitting ECU...
         framesByECU : dict[ int, list[Frame] ] = {}
         for frame in frames:
-            if frame.iTxID not in framesByECU:
+            listFrames = framesByECU.get(frame.iTxID)
+            if listFrames is None:
                 framesByECU[frame.iTxID] = [frame]
             else:
-                framesByECU[frame.iTxID].append(frame)
+                listFrames.append(frame)
 
         # Parse frames into whole messages...
         messages : list[Message] = []
-        for iECU in sorted(framesByECU.keys()):
+        mapECU = self.mapECU
+        for iECU in ( sorted(framesByECU) if len(framesByECU) > 1 else framesByECU ):
 
-            # Create new message object with a copy of the raw data and frames
-            #   addressed for this ecu...
+            # Create new message object with the frames addressed for this ecu...
             message = Message( framesByECU[iECU] )
 
             # Subclass function to assemble frames into Messages...
             if self.parseMessage(message):
                 # Mark the appropriate ECU ID...
-                message.iECU = self.mapECU.get(iECU, ECU.UNKNOWN)
+                message.iECU = mapECU.get(iECU, ECU.UNKNOWN)
                 messages.append(message)
 
         #
@@ -165,6 +197,24 @@ class Protocol(object):
 
         return messages
 
+    def parseLine(self, strLine : str) -> Frame:
+        # Parse a single response line into a Frame (for streaming, see __call__)
+        #
+        # Return the Frame or None for non-OBD lines and frames that couldn't be parsed.
+
+        strLineCondensed = strLine.replace(' ', '')
+        if not strLineCondensed or not self._SET_HEX.issuperset(strLineCondensed):
+            return None
+
+        strHex = strLineCondensed
+        if len(strHex) & 1:
+            if not self.PAD_ODD_FRAMES:
+                return None
+            strHex = "0" + strHex
+
+        frame = Frame(strLineCondensed if self.KEEP_RAW else None, memoryview( bytes.fromhex(strHex) ))
+        return frame if self.parseFrameData(frame) else None
+
     def constructECUMap(self, messages : list[Message]):
         # Given a list of messages from different ECUs (in response to the 0100 PID listing command),
         #   associate each TxID to an ECU ID constant
@@ -210,7 +260,7 @@ class Protocol(object):
                 iTxID = None
 
                 for message in messages:
-                    iBits = BitArray(message.data).countSet()
+                    iBits = BitArray(message.baData).countSet()
 
                     if iBits > iBestBits:
                         iBestBits = iBits
@@ -223,6 +273,7 @@ class Protocol(object):
                 if message.TxID not in self.mapECU:
                     self.mapECU[message.TxID] = ECU.UNKNOWN
 
+    @staticmethod
     def isContiguousInts(listInts : list[int], iStart : int, iEnd : int):
         # Is a list of integers consecutive?
         if not listInts:
@@ -242,7 +293,9 @@ class Protocol(object):
     def parseFrameData(self, frame : Frame):
         # OVERRIDE in subclass for each protocol
         #
-        # Receive a Frame object preloaded with the raw string line from the vehicle.
+        # Receive a Frame object preloaded with the raw string line from the vehicle and
+        # its raw bytes (a memoryview, header included) as the frame data.
+        # Set the frame data to the (sliced) data portion.
         #
         # Return a boolean. If fatal errors were found, this function should return False
         # and the Frame will be dropped.
@@ -0,0 +1,200 @@
+############################################################################
+#
+# Python Onboard Diagnostics II Advanced
+#
+# QueryTimer.py
+#
+# Copyright 2021-2023 Keven L. Ates (atescomp@gmail.com)
+#
+# This file is part of the Onboard Diagnostics II Advanced (pyOBDA) system.
+#
+# pyOBDA is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# pyOBDA is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyOBDA; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+############################################################################
+
+import threading
+from bisect import bisect_left
+from time import perf_counter_ns
+
+
+class QueryTimer:
+    """
+    Per-stage timing of the query pipeline, aggregated into per-command histograms.
+
+    A query is timed between begin() and end(). Each mark() adds the time since the previous mark
+    to a stage:
+        header - the OBD2Connector header switch ("AT SH")
+        write  - the ELM327 port write and flush
+        wait   - waiting for the first response byte (adapter and ECU latency)
+        read   - reading the rest of the response up to the prompt
+        parse  - protocol parsing of the response lines into messages
+        decode - command decoding of the messages into a response
+    The "total" stage is the whole query.
+
+    Marks outside a timed query (or while held) are ignored, so the ELM327 and the connector mark
+    unconditionally once a timer is set. Timing is off when no timer is set (the default), which
+    costs a single "is None" test per stage.
+
+    Timed queries are tracked per thread, so one timer can serve several threads.
+    """
+
+    STAGES = ("header", "write", "wait", "read", "parse", "decode", "total")
+
+    # Histogram bucket upper bounds (seconds); the last bucket is everything slower...
+    BOUNDS = (
+        0.00005, 0.0001, 0.0002, 0.0005,
+        0.001, 0.002, 0.005, 0.01, 0.02, 0.05,
+        0.1, 0.2, 0.5, 1.0, 2.0, 5.0,
+    )
+    __BOUNDS_NS = tuple( int(fBound * 1e9) for fBound in BOUNDS )
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.__dictKeys : dict = {}  # key = command key (str), value = dict of stage to [count, total, min, max, buckets]
+
+    def begin(self, strKey:str):
+        """
+        Start timing a query for the command key (the command name).
+        """
+
+        local = self.__local
+        local.strKey = strKey
+        local.bHold = False
+        local.dictStages = {}
+        local.iStart = local.iLast = perf_counter_ns()
+
+    def hold(self):
+        """
+        Ignore marks (from nested requests) until the next release().
+        """
+
+        self.__local.bHold = True
+
+    def release(self, strStage:str):
+        """
+        Add the time held to a stage and accept marks again.
+        """
+
+        local = self.__local
+        local.bHold = False
+        self.mark(strStage)
+
+    def mark(self, strStage:str):
+        """
+        Add the time since the previous mark to a stage.
+        """
+
+        local = self.__local
+        if getattr(local, "dictStages", None) is None or local.bHold:
+            return  # ...not timing a query
+        iNow = perf_counter_ns()
+        local.dictStages[strStage] = local.dictStages.get(strStage, 0) + iNow - local.iLast
+        local.iLast = iNow
+
+    def end(self):
+        """
+        Finish timing the query and add its stages to the command's histograms.
+        """
+
+        local = self.__local
+        dictStages = getattr(local, "dictStages", None)
+        if dictStages is None:
+            return
+        dictStages["total"] = perf_counter_ns() - local.iStart
+        local.dictStages = None
+
+        with self.__lock:
+            dictKey = self.__dictKeys.setdefault(local.strKey, {})
+            for strStage, iTime in dictStages.items():
+                listStage = dictKey.get(strStage)
+                if listStage is None:
+                    listStage = dictKey[strStage] = [ 0, 0, iTime, iTime, [0] * ( len(self.BOUNDS) + 1 ) ]
+                listStage[0] += 1
+                listStage[1] += iTime
+                if iTime < listStage[2]:
+                    listStage[2] = iTime
+                if iTime > listStage[3]:
+                    listStage[3] = iTime
+                listStage[4][ bisect_left(self.__BOUNDS_NS, iTime) ] += 1
+
+    def reset(self):
+        with self.__lock:
+            self.__dictKeys = {}
+
+    @classmethod
+    def __getPercentile(cls, listBuckets:list, iCount:int, fPercent:float, fMax:float) -> float:
+        """
+        Estimate a percentile as the upper bound of the bucket holding it.
+        """
+
+        iTarget = fPercent / 100.0 * iCount
+        iSeen = 0
+        for iIndex, iBucket in enumerate(listBuckets):
+            iSeen += iBucket
+            if iSeen >= iTarget and iBucket:
+                return min(cls.BOUNDS[iIndex], fMax) if iIndex < len(cls.BOUNDS) else fMax
+        return fMax
+
+    def getStats(self) -> dict:
+        """
+        Return the stage statistics of each command key.
+
+        Return a dict keyed by command key of dicts keyed by stage with the keys:
+            iCount, fTotal, fMean, fMin, fMax, fP50, fP95, fP99 (seconds), and
+            listBuckets (counts per BOUNDS bucket, plus one for slower)
+        The percentiles are estimated from the histogram buckets.
+        """
+
+        dictStats = {}
+        with self.__lock:
+            for strKey, dictKey in self.__dictKeys.items():
+                dictStats[strKey] = {}
+                for strStage in self.STAGES:
+                    listStage = dictKey.get(strStage)
+                    if listStage is None:
+                        continue
+                    iCount, iTotal, iMin, iMax, listBuckets = listStage
+                    fMax = iMax / 1e9
+                    dictStats[strKey][strStage] = {
+                        "iCount"      : iCount,
+                        "fTotal"      : iTotal / 1e9,
+                        "fMean"       : iTotal / iCount / 1e9,
+                        "fMin"        : iMin / 1e9,
+                        "fMax"        : fMax,
+                        "fP50"        : self.__getPercentile(listBuckets, iCount, 50, fMax),
+                        "fP95"        : self.__getPercentile(listBuckets, iCount, 95, fMax),
+                        "fP99"        : self.__getPercentile(listBuckets, iCount, 99, fMax),
+                        "listBuckets" : list(listBuckets),
+                    }
+        return dictStats
+
+    def getReport(self) -> list[str]:
+        """
+        Return a text table of the mean stage times (milliseconds) per command, slowest first.
+        """
+
+        dictStats = self.getStats()
+        listKeys = sorted(dictStats, key=lambda strKey: -dictStats[strKey].get("total", {}).get("fMean", 0.0))
+
+        listReport = [ "%-28s %6s" % ("Command", "Count") + "".join( [ " %8s" % strStage for strStage in self.STAGES ] ) ]
+        for strKey in listKeys:
+            dictKey = dictStats[strKey]
+            iCount = dictKey.get("total", {}).get("iCount", 0)
+            strLine = "%-28s %6d" % (strKey[:28], iCount)
+            for strStage in self.STAGES:
+                dictStage = dictKey.get(strStage)
+                strLine += ( " %8.3f" % (dictStage["fMean"] * 1000.0) ) if dictStage else " %8s" % "-"
+            listReport.append(strLine)
+        return listReport
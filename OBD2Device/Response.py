@@ -34,17 +34,46 @@ from .UnitAndScale import Unit
 # Response class for OBD2 Commands
 
 class Response:
+    # Responses are created for every query and may be retained in large numbers (recordings, streams),
+    # so they are slotted (no per object dict).
+
+    __slots__ = ("command", "messages", "__value", "raw", "spec", "time")
 
     def __init__(self, command=None, messages=None):
         self.command = command
         self.messages = messages if messages else []
-        self.value = None
+        self.__value = None
+        self.raw = None   # ...plain number when decoded by a linear spec (see setRaw())
+        self.spec = None  # ...the linear spec that decoded the raw number
         self.time = time.time()
 
+    def setRaw(self, raw, spec):
+        """
+        Set a plain decoded number and its linear spec. The Pint Quantity is built on the first value access.
+        """
+
+        self.raw = raw
+        self.spec = spec
+        self.__value = None
+
+    @property
+    def value(self):
+        if self.__value is None and self.raw is not None:
+            self.__value = self.spec.quantity(self.raw)
+        return self.__value
+
+    @value.setter
+    def value(self, value):
+        self.__value = value
+        self.raw = None
+        self.spec = None
+
     @property
     def unit(self):
         # for backwards compatibility
         #from Device import Unit  # local import to avoid cyclic-dependency
+        if self.spec is not None:
+            return self.spec.strUnit  # ...no need to build the Quantity
         if isinstance(self.value, Unit.Quantity):
             return str(self.value.u)
         elif self.value is None:
@@ -53,7 +82,7 @@ class Response:
             return str(type(self.value))
 
     def isNull(self):
-        return (not self.messages) or (self.value == None)
+        return (not self.messages) or (self.raw is None and self.value == None)
 
     def __str__(self):
         return str(self.value)
@@ -26,7 +26,9 @@
 ############################################################################
 
 
+import json
 import logging
+import os
 import string
 
 logger = logging.getLogger(__name__)
@@ -37,6 +39,8 @@ class Utility:
     The Utility Class is a placeholder class for class methods used elsewhere.
     """
 
+    _SET_HEX = frozenset(string.hexdigits)
+
     @classmethod
     def convertBEBytesToInt(cls, baBytes: bytearray) -> int:
         """
@@ -76,10 +80,49 @@ class Utility:
             iValue = iValue - (1 << iBitCount)
         return iValue
 
+    @classmethod
+    def getConfigPath(cls) -> str:
+        """
+        Return the application configuration directory (~/.config/pyobda).
+        """
+
+        return os.path.join(os.path.expanduser("~"), ".config", "pyobda")
+
+    @classmethod
+    def readJSON(cls, strFile: str) -> dict:
+        """
+        Read a JSON object from a file. Return an empty dict if the file is missing or unreadable.
+        """
+
+        try:
+            with open(strFile, "r") as fileJSON:
+                dictJSON = json.load(fileJSON)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as err:
+            logger.warning("Unreadable file %s (%s). Ignoring..." % (strFile, err))
+            return {}
+        return dictJSON if isinstance(dictJSON, dict) else {}
+
+    @classmethod
+    def writeJSON(cls, strFile: str, dictJSON: dict):
+        """
+        Write a JSON object to a file atomically (write a temporary file, then replace).
+        """
+
+        try:
+            os.makedirs(os.path.dirname(strFile), exist_ok=True)
+            strTemp = strFile + ".tmp"
+            with open(strTemp, "w") as fileJSON:
+                json.dump(dictJSON, fileJSON, indent=1)
+            os.replace(strTemp, strFile)
+        except OSError as err:
+            logger.warning("File %s not written: %s" % (strFile, err))
+
     @classmethod
     def isHex(cls, strHex: str):
         """
         Does a string represent a hex value?
         """
 
-        return all( [strChar in string.hexdigits for strChar in strHex] )
+        return cls._SET_HEX.issuperset(strHex)
@@ -28,6 +28,7 @@ import wx
 import time
 from typing import Callable
 
+import AppSettings
 from Connection import Connection
 from EventHandler import EventHandler
 from EventDebug import EventDebug
@@ -61,6 +62,13 @@ class OBD2Port :
 
         self.cmds = CommandList()
 
+        # Response cache for the slowly changing PIDs...
+        self.dictCacheTTL = {
+            self.cmds[strName] : fTTL for strName, fTTL in connection.CACHE.items()
+                if strName in self.cmds and fTTL > 0.0
+        }
+        self.dictCache = {}  # ...command: ( expiry time, response )
+
         self.port = \
             OBD2Connector(
                 strPort        = connection.PORTNAME,
@@ -82,6 +90,10 @@ class OBD2Port :
             wx.PostEvent(self.events, EventDebug([1, "ERROR: Cannot connect to interface"]))
             return
 
+        if AppSettings.DEBUG_TIMING :
+            self.port.enableTiming()
+            wx.PostEvent(self.events, EventDebug([2, "Query timing enabled"]))
+
         self.bConnected = True
         wx.PostEvent(self.events, EventDebug([1, "Successfully opened interface"]))
         wx.PostEvent(self.events, EventDebug([1, "Connecting to ECU..." ]))
@@ -127,7 +139,30 @@ class OBD2Port :
         self.port = None
         self.bConnected = False
 
+    def __getCached(self, command):
+        # Return the cached response of a command or None...
+        tupCached = self.dictCache.get(command)
+        if tupCached is None:
+            return None
+        if time.monotonic() >= tupCached[0]:
+            del self.dictCache[command]
+            return None
+        return tupCached[1]
+
+    def __setCached(self, command, response):
+        fTTL = self.dictCacheTTL.get(command)
+        if fTTL and not response.isNull():
+            self.dictCache[command] = ( time.monotonic() + fTTL, response )
+
+    def clearCache(self):
+        self.dictCache = {}
+
     def __processCommand(self, command):
+        response = self.__getCached(command)
+        if response is not None:
+            wx.PostEvent(self.events, EventDebug([3, "Cached: " + str(command) + " = " + str(response.value)]))
+            return response
+
         response = Response()
         if self.port :
             wx.PostEvent(self.events, EventDebug([3, "Command: " + str(command)]))
@@ -136,10 +171,37 @@ class OBD2Port :
                 wx.PostEvent(self.events, EventDebug([3, "WARNING: No data!"]))
             else :
                 wx.PostEvent(self.events, EventDebug([3, "Results: " + str(response.value)]))
+                self.__setCached(command, response)
         else :
             wx.PostEvent(self.events, EventDebug([3, "ERROR: No port!"]))
         return response
 
+    def __processCommands(self, commands) -> dict:
+        dictResponses = {}
+        listQuery = []
+        for command in commands :
+            response = self.__getCached(command)
+            if response is None :
+                listQuery.append(command)
+            else :
+                dictResponses[command] = response
+        if not listQuery :
+            return dictResponses
+
+        if self.port :
+            wx.PostEvent(self.events, EventDebug([3, "Commands: " + ", ".join( [ str(command) for command in listQuery ] )]))
+            dictQueried = self.port.query_many(listQuery)
+            for command, response in dictQueried.items() :
+                if ( response.isNull() ) :
+                    wx.PostEvent(self.events, EventDebug([3, "WARNING: No data for " + str(command) + "!"]))
+                else :
+                    wx.PostEvent(self.events, EventDebug([3, "Results: " + str(command) + " = " + str(response.value)]))
+                    self.__setCached(command, response)
+            dictResponses.update(dictQueried)
+        else :
+            wx.PostEvent(self.events, EventDebug([3, "ERROR: No port!"]))
+        return dictResponses
+
 
     def getSensorInfo(self, iSensorIndex):
         """
@@ -159,6 +221,21 @@ class OBD2Port :
         response = self.__processCommand(sensor.cmd)
         return (sensor.strTableDesc, response, sensor.strUnit)
 
+    def getSensorInfos(self, iSensorGroup, listSensorIndices):
+        """
+        Return the tabular sensor responses for a sensor group and a list of sensor indices.
+
+        The sensor commands are queried together so they can be batched into fewer requests.
+        Return a dict of 3-tuples (see getSensorInfo()) keyed by sensor index.
+        """
+        listSensors : list[Sensor] = [ SensorManager.SENSORS[iSensorGroup][iSensorIndex] for iSensorIndex in listSensorIndices ]
+        dictResponses = self.__processCommands( [ sensor.cmd for sensor in listSensors ] )
+        dictSensorInfos = {}
+        for iSensorIndex, sensor in zip(listSensorIndices, listSensors) :
+            response = dictResponses.get(sensor.cmd, Response())
+            dictSensorInfos[iSensorIndex] = (sensor.strTableDesc, response, sensor.strUnit)
+        return dictSensorInfos
+
 
     def getStatusTests(self) -> list[str]:
         statusRes = self.getSensorInfo(0, 1)[1]  # ...Status Info Response
@@ -221,8 +298,20 @@ class OBD2Port :
 
         response = self.__processCommand(self.cmds.CLEAR_DTC)
         # NOTE: Error message already from __processCommand()
+
+        # The status (DTC count, MIL, readiness) and freeze frame data were reset...
+        self.clearCache()
         return response
 
+    def getTimingReport(self) -> list[str]:
+        """
+        Return the query stage timing table lines (empty when timing is off).
+        """
+
+        if self.port :
+            return self.port.getTimingReport()
+        return []
+
     #def logSensor(self, indexSensor, strFilename):
     #    file = open(strFilename, "w")
     #    start_time = time.time()
@@ -24,7 +24,8 @@
 ############################################################################
 
 class Sensor:
-    def __init__(self, strSensorTableDesc, cmd, strSensorUnit):
+    def __init__(self, strSensorTableDesc, cmd, strSensorUnit, fRate = None):
         self.strTableDesc = strSensorTableDesc
         self.cmd = cmd
         self.strUnit = strSensorUnit
+        self.fRate = fRate  # ...target polling rate (Hz), None = the Connection DELAY rate
@@ -34,6 +34,9 @@ class SensorManager:
     SENSOR_GROUP_B = 2
     SENSOR_GROUP_C = 3
 
+    # Target polling rate (Hz) of the key gauges...
+    GAUGE_RATE = 10.0
+
     # NOTE: See https://en.wikipedia.org/wiki/OBD-II_PIDs
     SENSORS = [
     #
@@ -44,7 +47,7 @@ class SensorManager:
         Sensor("    Status Since Clear DTC", CMDS.STATUS, ""),                          # 01  special
         Sensor("          Freeze Frame DTC", CMDS.FREEZE_DTC, ""),                      # 02  special
         Sensor("        Fuel System Status", CMDS.FUEL_STATUS, ""),                     # 03  (1st sys str, 2nd sys str)
-        Sensor(" Calc'ed Engine Load Value", CMDS.ENGINE_LOAD, "%"),                    # 04  percent
+        Sensor(" Calc'ed Engine Load Value", CMDS.ENGINE_LOAD, "%", GAUGE_RATE),        # 04  percent
         Sensor("       Coolant Temperature", CMDS.COOLANT_TEMP, "degC"),                # 05  degC, degF
         Sensor("    Short Term Fuel Trim 1", CMDS.SHORT_FUEL_TRIM_1, "%"),              # 06  percent
         Sensor("     Long Term Fuel Trim 1", CMDS.LONG_FUEL_TRIM_1, "%"),               # 07  percent
@@ -52,12 +55,12 @@ class SensorManager:
         Sensor("     Long Term Fuel Trim 2", CMDS.LONG_FUEL_TRIM_2, "%"),               # 09  percent
         Sensor("             Fuel Pressure", CMDS.FUEL_PRESSURE, "kPa"),                # 0A  kilopascal, psi
         Sensor("  Intake Manifold Pressure", CMDS.INTAKE_PRESSURE, "kPa"),              # 0B  kilopascal, psi
-        Sensor("                Engine RPM", CMDS.RPM, "rpm"),                          # 0C  rpm
-        Sensor("             Vehicle Speed", CMDS.SPEED, "kph"),                        # 0D  kph, mph
+        Sensor("                Engine RPM", CMDS.RPM, "rpm", GAUGE_RATE),              # 0C  rpm
+        Sensor("             Vehicle Speed", CMDS.SPEED, "kph", GAUGE_RATE),            # 0D  kph, mph
         Sensor("            Timing Advance", CMDS.TIMING_ADVANCE, "degree"),            # 0E  degree
         Sensor("    Intake Air Temperature", CMDS.INTAKE_TEMP, "degC"),                 # 0F  degC, degF
-        Sensor("  Mass Air Flow Rate (MAF)", CMDS.MAF, "gps"),                          # 10  gps (grams/sec), lb/min
-        Sensor("         Throttle Position", CMDS.THROTTLE_POS, "%"),                   # 11  percent
+        Sensor("  Mass Air Flow Rate (MAF)", CMDS.MAF, "gps", GAUGE_RATE),              # 10  gps (grams/sec), lb/min
+        Sensor("         Throttle Position", CMDS.THROTTLE_POS, "%", GAUGE_RATE),       # 11  percent
         Sensor("      Secondary Air Status", CMDS.AIR_STATUS, ""),                      # 12  str
         Sensor("        O2 Sensors Present", CMDS.O2_SENSORS, ""),                      # 13  special
         Sensor("          O2 Sensor: 1 - 1", CMDS.O2_B1S1, "volt"),                     # 14  volt
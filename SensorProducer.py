@@ -35,10 +35,11 @@ from SensorManager import SensorManager
 from EventHandler import EventHandler
 from EventDebug import EventDebug
 from EventDTC import EventDTC
-from EventSensor import EventSensor
+from EventSensorBatch import EventSensorBatch
 from EventConnection import EventConnection
 from EventTest import EventTest
 from OBD2Device.Codes import Codes
+from OBD2Device.CommandScheduler import CommandScheduler
 
 class ThreadCommands:
     Null       =  0 # ...Do Nothing
@@ -49,8 +50,17 @@ class ThreadCommands:
 class SensorProducer(threading.Thread):
     """
     The Sensor Producer Class to produce sensor managers.
+
+    The Sensor Page is polled by a rate scheduler: each active sensor has a target rate (the sensor's own
+    rate or the Connection DELAY rate) and the due sensors are queried together, back to back while the
+    bus keeps up. The achieved rate of each sensor is shown in its "Rate (Hz)" column. The other pages
+    are polled once per DELAY (1.0 sec min).
     """
 
+    # The most (fractional) seconds to sleep on the Sensor Page, so page changes and thread commands
+    # are still seen promptly...
+    SENSOR_WAIT_MAX = 0.1
+
     def __init__(self, connection: Connection, notebook: wx.Notebook, events: EventHandler, funcSetTestIgnition: Callable):
         super().__init__()
         self.connection = Connection(connection) # ...copy
@@ -62,6 +72,11 @@ class SensorProducer(threading.Thread):
         self.iSensorListLen = len(SensorManager.SENSORS)
         self.supported = [0] * self.iSensorListLen
         self.active = [[]] * self.iSensorListLen
+        self.listShown = [ {} for _ in range(self.iSensorListLen) ]  # ...per page, (row, column): value last posted
+
+        self.scheduler = CommandScheduler()
+        self.tupScheduled = None  # ...( sensor page, active sensor indices ) in the scheduler
+        self.dictScheduled = {}   # ...scheduled command: sensor index
 
         self.iThreadControl = ThreadCommands.Null
         self.iCurrSensorsPage = 0 # ...starting sensors page
@@ -120,11 +135,29 @@ class SensorProducer(threading.Thread):
                 if self.iCurrSensorsPage > 0 :
                     iStartSensors = 1
 
-                for iIndex in range(iStartSensors, len(self.active[self.iCurrSensorsPage])):
-                    if self.active[self.iCurrSensorsPage][iIndex]:
-                        tupSensorInfo = self.PORT.getSensorInfo(self.iCurrSensorsPage, iIndex)
-                        listResponse = [self.iCurrSensorsPage, iIndex, 2, "%s (%s)" % (tupSensorInfo[1], tupSensorInfo[2])]
-                        wx.PostEvent( self.events, EventSensor(listResponse) )
+                iSensorPage = self.iCurrSensorsPage
+                listIndices = [
+                    iIndex for iIndex in range(iStartSensors, len(self.active[iSensorPage]))
+                        if self.active[iSensorPage][iIndex]
+                ]
+                self.setSchedule(iSensorPage, listIndices)
+
+                # Query the due sensors together so the port can batch them...
+                listDue = self.scheduler.popDue( len(listIndices), time.monotonic() )
+                if listDue:
+                    listDueIndices = [ self.dictScheduled[cmd] for cmd in listDue ]
+                    dictSensorInfos = self.PORT.getSensorInfos(iSensorPage, listDueIndices)
+                    self.scheduler.complete( listDue, time.monotonic() )
+                    dictRates = self.scheduler.getRates()
+
+                    # Post the changed values and rates as one batch per sweep...
+                    listRows = []
+                    for iIndex, tupSensorInfo in dictSensorInfos.items():
+                        fAchieved = dictRates[ SensorManager.SENSORS[iSensorPage][iIndex].cmd ][1]
+                        self.addRow( listRows, iSensorPage, iIndex, 2, "%s (%s)" % (tupSensorInfo[1], tupSensorInfo[2]) )
+                        self.addRow( listRows, iSensorPage, iIndex, 3, "%.1f" % fAchieved if fAchieved else "" )
+                    if listRows:
+                        wx.PostEvent( self.events, EventSensorBatch( [iSensorPage, listRows] ) )
 
             elif stateCurr == 3:  # ...DTC Page
                 if statePrev != stateCurr :
@@ -157,6 +190,9 @@ class SensorProducer(threading.Thread):
             elif stateCurr == 4:  # ...Trace (Debug) Page
                 if statePrev != stateCurr :
                     wx.PostEvent( self.events, EventDebug( [2, "Trace Page..."] ) )
+                    # Show the query stage timings (milliseconds) collected so far...
+                    for strLine in self.PORT.getTimingReport():
+                        wx.PostEvent( self.events, EventDebug( [1, strLine] ) )
                 # View the trace log...
 
             else: # ...everything else
@@ -167,8 +203,51 @@ class SensorProducer(threading.Thread):
             if self.iThreadControl == ThreadCommands.Disconnect:  # ...end thread
                 break
 
-            # Delay the loop iteration based on the Connection configured DELAY...
-            time.sleep(self.connection.DELAY if self.connection.DELAY > 1.0 else 1.0)
+            # Delay the loop iteration...
+            if stateCurr == 2:
+                # ...until the next sensor is due (none when the bus is behind)
+                fWait = self.scheduler.getWait( time.monotonic() )
+                if fWait is None or fWait > self.SENSOR_WAIT_MAX:
+                    fWait = self.SENSOR_WAIT_MAX
+                if fWait > 0.0:
+                    time.sleep(fWait)
+            else:
+                # ...based on the Connection configured DELAY
+                time.sleep(self.connection.DELAY if self.connection.DELAY > 1.0 else 1.0)
+
+    def addRow(self, listRows: list, iSensorPage: int, iIndex: int, iColumn: int, strValue: str):
+        # Add a sensor page cell to a batch when its value changed...
+        dictShown = self.listShown[iSensorPage]
+        if dictShown.get( (iIndex, iColumn) ) != strValue:
+            dictShown[ (iIndex, iColumn) ] = strValue
+            listRows.append( [iIndex, iColumn, strValue] )
+
+    def setSchedule(self, iSensorPage: int, listIndices: list[int]):
+        # Schedule the active sensors of the sensor page (when changed)...
+        tupScheduled = ( iSensorPage, tuple(listIndices) )
+        if tupScheduled == self.tupScheduled:
+            return
+
+        # Clear the rates of the sensors no longer polled...
+        if self.tupScheduled is not None:
+            iPrevPage, tupPrevIndices = self.tupScheduled
+            listRows = []
+            for iIndex in tupPrevIndices:
+                if iPrevPage != iSensorPage or iIndex not in listIndices:
+                    self.addRow(listRows, iPrevPage, iIndex, 3, "")
+            if listRows:
+                wx.PostEvent( self.events, EventSensorBatch( [iPrevPage, listRows] ) )
+
+        fDefaultRate = (1.0 / self.connection.DELAY) if self.connection.DELAY > 0.0 else 1.0
+        fNow = time.monotonic()
+        self.scheduler.clear()
+        self.dictScheduled = {}
+        for iIndex in listIndices:
+            sensor = SensorManager.SENSORS[iSensorPage][iIndex]
+            # Gauges with their own rate go first when several sensors are due...
+            self.scheduler.add(sensor.cmd, sensor.fRate or fDefaultRate, 1 if sensor.fRate else 0, fNow)
+            self.dictScheduled[sensor.cmd] = iIndex
+        self.tupScheduled = tupScheduled
 
     def initCommunication(self):
         self.PORT = OBD2Port(self.connection, self.events, self.getSensorPage, self.setTestIgnition)
@@ -187,13 +266,12 @@ class SensorProducer(threading.Thread):
                 self.supported[iSensorGroup] = response.value  # ...Supported PIDs
             self.active[iSensorGroup] = []
 
+            listRows = []
             for iIndex, bSupport in enumerate(self.supported[iSensorGroup]) :
                 self.active[iSensorGroup].append(bSupport)
-
-                if bSupport :
-                    wx.PostEvent( self.events, EventSensor([iSensorGroup, iIndex, 0, AppSettings.CHAR_CHECK] ) )
-                else:
-                    wx.PostEvent( self.events, EventSensor([iSensorGroup, iIndex, 0, AppSettings.CHAR_BALLOTX] ) )
+                listRows.append( [iIndex, 0, AppSettings.CHAR_CHECK if bSupport else AppSettings.CHAR_BALLOTX] )
+            if listRows:
+                wx.PostEvent( self.events, EventSensorBatch( [iSensorGroup, listRows] ) )
 
         wx.PostEvent( self.events, EventDebug( [3, "  Sensors marked for support..."] ) )
 
@@ -305,8 +305,10 @@ class UIFrame(wx.Frame):
             self.listctrlSensors[iSensorGroup].InsertColumn(0, "Supported", format=wx.LIST_FORMAT_CENTER, width=100)
             self.listctrlSensors[iSensorGroup].InsertColumn(1, "Sensor", format=wx.LIST_FORMAT_RIGHT, width=250)
             self.listctrlSensors[iSensorGroup].InsertColumn(2, "Value")
+            self.listctrlSensors[iSensorGroup].InsertColumn(3, "Rate (Hz)", format=wx.LIST_FORMAT_RIGHT, width=100)
+            self.listctrlSensors[iSensorGroup].setResizeColumn(3)  # ...auto-size the Value column (1 based)
             for sensor in SensorManager.SENSORS[iSensorGroup] :
-                self.listctrlSensors[iSensorGroup].Append([AppSettings.CHAR_QMARK, sensor.strTableDesc, ""])
+                self.listctrlSensors[iSensorGroup].Append([AppSettings.CHAR_QMARK, sensor.strTableDesc, "", ""])
             self.listctrlSensors[iSensorGroup].Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.onToggleSensor, id=self.idSensors[iSensorGroup])
 
             self.panelSensors[iSensorGroup].Bind(wx.EVT_SIZE, OnPanelResize)
@@ -331,7 +333,7 @@ class UIFrame(wx.Frame):
         posDTC = wx.Point(0, HOFFSET_LIST)
         #styleDTC = ( wx.LC_REPORT | wx.SUNKEN_BORDER | wx.LC_HRULES | wx.LC_SINGLE_SEL )
         styleDTC = ( wx.LC_REPORT | wx.SUNKEN_BORDER | wx.LC_SINGLE_SEL )
-        self.listctrlDTC = ListCtrl(self.panelDTC, self.idDTC, pos=posDTC, style=styleDTC)
+        self.listctrlDTC = ListCtrl(self.panelDTC, self.idDTC, pos=posDTC, style=styleDTC, iCapacity=AppSettings.DTC_ROWS)
         self.events.setDTC(self.listctrlDTC)
         self.listctrlDTC.SetBackgroundColour('BLACK')
         self.listctrlDTC.SetForegroundColour('WHITE')
@@ -353,11 +355,25 @@ class UIFrame(wx.Frame):
         self.notebook.AddPage(self.panelDTC, "DTC")
 
     def buildTracePage(self):
+        HOFFSET_LIST = 30 # ...offset from the top of panel (space for the filter)
         self.panelTrace = wx.Panel(self.notebook, wx.ID_ANY)
+        self.textTraceLevel = wx.StaticText(self.panelTrace, wx.ID_ANY, "Show Levels:", wx.Point(6, 6))
+        self.choiceTraceLevel = wx.Choice(
+            self.panelTrace, wx.ID_ANY, wx.Point(100, 0),
+            choices=[ "0 - " + str(iLevel) for iLevel in range(0, 6) ]
+        )
+        self.choiceTraceLevel.SetSelection(5)
+        self.buttonClearTrace = wx.Button(self.panelTrace, wx.ID_ANY, "Clear Trace", wx.Point(200, 0))
+
+        # Bind functions to the filter and button actions...
+        self.panelTrace.Bind(wx.EVT_CHOICE, self.onTraceLevel, self.choiceTraceLevel)
+        self.panelTrace.Bind(wx.EVT_BUTTON, self.onClearTrace, self.buttonClearTrace)
+
         self.idTrace = wx.NewIdRef(count=1)
+        posTrace = wx.Point(0, HOFFSET_LIST)
         styleTrace = ( wx.LC_REPORT | wx.SUNKEN_BORDER )
 
-        self.listctrlTrace = ListCtrl(self.panelTrace, self.idTrace, style=styleTrace)
+        self.listctrlTrace = ListCtrl(self.panelTrace, self.idTrace, pos=posTrace, style=styleTrace, iCapacity=AppSettings.TRACE_ROWS)
         self.events.setDebug(self.listctrlTrace)
         self.listctrlTrace.SetBackgroundColour('BLACK')
         self.listctrlTrace.SetForegroundColour('WHITE')
@@ -371,12 +387,23 @@ class UIFrame(wx.Frame):
             self.panelTrace.SetSize(evt.GetSize())
             self.listctrlTrace.SetSize(evt.GetSize())
             w, h = self.GetClientSize()
-            self.listctrlTrace.SetSize(0, 0, w, h - 29)
+            self.listctrlTrace.SetSize(0, HOFFSET_LIST, w, h - 59)
         ####################################################################
         self.panelTrace.Bind(wx.EVT_SIZE, OnPanelResize)
 
         self.notebook.AddPage(self.panelTrace, "Trace")
 
+    def onTraceLevel(self, event):
+        # Show the trace rows up to the selected level...
+        iLevel = self.choiceTraceLevel.GetSelection()
+        if iLevel >= 5:
+            self.listctrlTrace.setFilter(None)
+        else:
+            self.listctrlTrace.setFilter( lambda listRow: int(listRow[0]) <= iLevel )
+
+    def onClearTrace(self, event):
+        self.listctrlTrace.DeleteAllItems()
+
     def onToggleSensor(self, event):
         iIndex = event.GetIndex()
         if self.sensorProducer != None and self.sensorProducer.supported[iIndex] : # ...is Changable?